@@ -15,6 +15,7 @@ Users should only access these methods indirectly through a ``Session`` or
 ``SessionInterface`` instance.
 """
 import json
+import time
 from typing import Dict
 
 import requests
@@ -25,6 +26,9 @@ from pydent.exceptions import TridentJSONDataIncomplete
 from pydent.exceptions import TridentLoginError
 from pydent.exceptions import TridentRequestError
 from pydent.exceptions import TridentTimeoutError
+from pydent.hooks import Hooks
+from pydent.hooks import REQUEST_END
+from pydent.hooks import REQUEST_START
 from pydent.utils import logger
 from pydent.utils import pprint_data
 from pydent.utils import url_build
@@ -64,6 +68,7 @@ class AqHTTP:
         self.log = logger(name="AqHTTP@{}".format(aquarium_url))  #: the logger
         self._using_requests = True  #: if False, any HTTP requests will throw and error
         self.num_requests = 0  #: number of requests counter
+        self.hooks = Hooks()  #: telemetry hooks (see :mod:`pydent.hooks`)
 
     def on(self):
         """Turn on requests. When requests are off, this causes.
@@ -252,14 +257,55 @@ class AqHTTP:
             self._disallow_null_in_json(kwargs["json"])
 
         self.num_requests += 1
-        response = requests.request(
-            method, url, timeout=timeout, cookies=self.cookies, **kwargs
-        )
+        if self.hooks.enabled:
+            response = self._hooked_request(method, path, url, timeout, **kwargs)
+        else:
+            response = requests.request(
+                method, url, timeout=timeout, cookies=self.cookies, **kwargs
+            )
 
         self.log.info(self._format_response_info(response))
         self._dispatch_response(response)
         return self._response_to_json(response)
 
+    def _hooked_request(
+        self, method: str, path: str, url: str, timeout: int, **kwargs
+    ) -> requests.Response:
+        """Performs a http request, emitting the `request_start` and
+        `request_end` events to the hooks."""
+        json_data = kwargs.get("json", None)
+        model = None
+        if isinstance(json_data, dict):
+            model = json_data.get("model", None)
+        self.hooks.emit(
+            REQUEST_START, dict(method=method.upper(), path=path, model=model)
+        )
+        response = None
+        error = None
+        start = time.perf_counter()
+        try:
+            response = requests.request(
+                method, url, timeout=timeout, cookies=self.cookies, **kwargs
+            )
+            return response
+        except Exception as e:
+            error = e.__class__.__name__
+            raise
+        finally:
+            data = dict(
+                method=method.upper(),
+                path=path,
+                model=model,
+                status=None,
+                num_bytes=0,
+                seconds=time.perf_counter() - start,
+                error=error,
+            )
+            if response is not None:
+                data["status"] = response.status_code
+                data["num_bytes"] = len(response.content or b"")
+            self.hooks.emit(REQUEST_END, data)
+
     def _response_to_json(self, response: requests.Response) -> dict:
         """Turns :class:`requests.Request` instance into a json.
 
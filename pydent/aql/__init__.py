@@ -10,13 +10,19 @@ Validated JSON Schemas (https://json-schema.org/)
 Check out the :ref:`JSON Schema page <json_schema>` for more information.
 """
 import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime
 from datetime import timedelta
+from functools import lru_cache
 from os.path import abspath
 from os.path import dirname
 from os.path import join
 from typing import Dict
+from typing import Generator
 from typing import List
 from typing import Union
 
@@ -24,11 +30,16 @@ import jsonschema
 
 from pydent.base import ModelBase
 from pydent.exceptions import AquariumQueryLanguageValidationError
+from pydent.hooks import Hooks
+from pydent.hooks import REQUEST_END
+from pydent.interfaces import QueryInterface
 from pydent.relationships import HasMany
 from pydent.relationships import HasOne
 from pydent.relationships import JSON
 from pydent.relationships import Raw
 from pydent.sessionabc import SessionABC
+from pydent.utils.async_requests import asyncfunc
+from pydent.utils.async_requests import chunkify
 
 aql_schema_filepath = join(abspath(dirname(__file__)), "aql.schema.json")
 with open(aql_schema_filepath, "r") as f:
@@ -63,9 +74,22 @@ class QueryBuilder:
     class Lte(Op):
         op = "<="
 
+    class In(Op):
+        op = "IN"
+
+    @staticmethod
+    def _format_value(v):
+        if isinstance(v, int) and not isinstance(v, bool):
+            return str(v)
+        return '"{}"'.format(v)
+
     @classmethod
     def _parse_key_val(cls, k, v):
-        if issubclass(v.__class__, cls.Op):
+        if isinstance(v, cls.In):
+            return "{} {} ({})".format(
+                k, v.op, ", ".join(cls._format_value(_v) for _v in v.v)
+            )
+        elif issubclass(v.__class__, cls.Op):
             return '{} {} "{}"'.format(k, v.op, v.v)
         else:
             return '{} {} "{}"'.format(k, cls.Eq.op, v)
@@ -150,64 +174,432 @@ def _check_depreciated_query_key(data):
         )
 
 
-def _aql(session, data, model=None):
-    # parse query
+class AQLNode:
+    """A subquery in the query plan of an AQL document.
+
+    Each relationship key of a subquery becomes a child node. A child node
+    only needs to return the column its parent filters by (`column`), so
+    the models of intermediate nodes are never loaded.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        data: Dict,
+        key: str = None,
+        field=None,
+        depth: int = 0,
+    ):
+        """Initializes a node.
+
+        :param model_name: name of the model to query
+        :param data: the AQL (sub)document of the node
+        :param key: the relationship key of the parent query, if any
+        :param field: the relationship field of the parent model, if any
+        :param depth: depth of the node in the plan
+        """
+        self.model_name = model_name
+        self.data = data
+        self.key = key
+        self.field = field
+        self.depth = depth
+        self.children = []
+        self.query = {}
+        self.resolved_query = None
+        self.results = None
+        self.stats = None
+
+    @property
+    def column(self) -> Union[str, None]:
+        """The column of this node's results that the parent filters by."""
+        if self.field is None:
+            return None
+        if issubclass(self.field.__class__, HasMany):
+            return self.field.ref
+        return self.field.attr
+
+    @property
+    def parent_column(self) -> Union[str, None]:
+        """The column of the parent that is filtered by this node's
+        results."""
+        if self.field is None:
+            return None
+        if issubclass(self.field.__class__, HasMany):
+            return self.field.attr
+        return self.field.ref
+
+    @property
+    def options(self) -> Dict:
+        opts = {"reverse": True}
+        opts.update(deepcopy(self.data[QUERY_KEY].get(OPTIONS_KEY, {})))
+        return opts
+
+    @property
+    def page_size(self) -> Union[int, None]:
+        return self.data[QUERY_KEY].get(OPTIONS_KEY, {}).get("pageSize", None)
+
+    def walk(self):
+        """Iterate over this node and all its descendents."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def levels(self) -> List[List["AQLNode"]]:
+        """Return the nodes of the plan grouped by depth, deepest first.
+
+        Nodes of the same level do not depend on each other.
+        """
+        levels = {}
+        for node in self.walk():
+            levels.setdefault(node.depth, []).append(node)
+        return [levels[depth] for depth in sorted(levels, reverse=True)]
+
+    def to_dict(self) -> Dict:
+        """Return the subquery tree of this node as a dictionary.
+
+        The resolved query and the statistics of each node are included
+        once the plan has been run.
+        """
+        data = {
+            "model": self.model_name,
+            "key": self.key,
+            "column": self.column,
+            "parent_column": self.parent_column,
+            "filters": {
+                k: deepcopy(self.data[QUERY_KEY][k])
+                for k in self.query
+                if k in self.data[QUERY_KEY]
+            },
+            "options": self.options,
+        }
+        if self.resolved_query is not None:
+            data["query"] = self.resolved_query
+        if self.stats is not None:
+            data["stats"] = dict(self.stats)
+        data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+    def __repr__(self):
+        return "<{} model={} key={} depth={}>".format(
+            self.__class__.__name__, self.model_name, self.key, self.depth
+        )
+
+
+def plan_aql(session, data, model=None, key=None, field=None, depth=0) -> AQLNode:
+    """Build the query plan of an AQL document.
+
+    :param session: Aquarium session instance
+    :param data: the AQL document
+    :param model: name of the model, if not provided in the document
+    :return: the root node of the query plan
+    """
     _check_depreciated_query_key(data)
     model_name = data.get(MODEL_KEY, model)
-    interface = getattr(session, model_name)
-    new_query = {}
+    model_class = getattr(session, model_name).model
+    node = AQLNode(model_name, data, key=key, field=field, depth=depth)
 
     for k in data[QUERY_KEY]:
         if k.startswith("__") and k.endswith("__"):
             continue
 
-        field = interface.model.fields.get(k, None)
+        field = model_class.fields.get(k, None)
         if field is None or isinstance(field, Raw) or isinstance(field, JSON):
-            new_query[k] = parse_value(data[QUERY_KEY][k])
+            node.query[k] = parse_value(data[QUERY_KEY][k])
+        elif issubclass(field.__class__, (HasMany, HasOne)):
+            node.children.append(
+                plan_aql(
+                    session,
+                    data[QUERY_KEY][k],
+                    model=field.nested,
+                    key=k,
+                    field=field,
+                    depth=depth + 1,
+                )
+            )
         else:
-            models = _aql(session, data[QUERY_KEY][k], model=field.nested)
-            if issubclass(field.__class__, HasMany):
-                new_query[field.attr] = [getattr(m, field.ref) for m in models]
-            elif issubclass(field.__class__, HasOne):
-                new_query[field.ref] = [getattr(m, field.attr) for m in models]
-            else:
-                raise ValueError("Field '{}' not supported".format(field.__class__))
+            raise ValueError("Field '{}' not supported".format(field.__class__))
+    return node
+
+
+def _unique(values: list) -> list:
+    unique = []
+    seen = set()
+    for v in values:
+        if v not in seen:
+            seen.add(v)
+            unique.append(v)
+    return unique
+
+
+def _resolve_query(node: AQLNode, max_ids: int) -> Union[Dict, str, None]:
+    """Return the `where` criteria of the node using the results of its
+    children, or None if the node cannot match any model."""
+    query = dict(node.query)
+    for child in node.children:
+        ids = _unique(child.results)
+        if not ids:
+            return None
+        query[child.parent_column] = ids
+
+    use_sql = False
+    for k, v in query.items():
+        if issubclass(type(v), QueryBuilder.Op):
+            use_sql = True
+        elif isinstance(v, list) and len(v) > max_ids:
+            use_sql = True
+            query[k] = [
+                QueryBuilder.In(chunk)
+                for chunk in chunkify([_v for _v in v if _v is not None], max_ids)
+            ]
+    if use_sql:
+        query = QueryBuilder.sql(query)
+    node.resolved_query = query
+    return query
+
+
+class AQLProfiler:
+    """Records the requests made by each node of an AQL plan.
+
+    While the profiler is active, it is registered to the `request_end` event
+    of the session hooks, and the requests are recorded to the node being run
+    by the current thread, so sibling nodes run concurrently are recorded
+    separately. The payload bytes are the size of the response bodies.
+    """
 
-    # make options
-    opts = {"reverse": True}
-    page_size = None
-    if OPTIONS_KEY in data[QUERY_KEY]:
-        if "pageSize" in data[QUERY_KEY][OPTIONS_KEY]:
-            page_size = data[QUERY_KEY][OPTIONS_KEY].get("pageSize", None)
-        opts.update(deepcopy(data[QUERY_KEY][OPTIONS_KEY]))
+    def __init__(self, hooks: Hooks):
+        self.hooks = hooks
+        self._local = threading.local()
 
-    for k, v in new_query.items():
-        if issubclass(type(v), QueryBuilder.Op):
-            new_query = QueryBuilder.sql(new_query)
-            break
+    @staticmethod
+    def new_stats() -> Dict:
+        return dict(
+            seconds=0.0, num_requests=0, num_rows=0, num_bytes=0, served_by=None
+        )
 
-    returned_models = interface.where(new_query, opts=opts, page_size=page_size)
+    def __call__(self, event: str, data: Dict):
+        stats = getattr(self._local, "stats", None)
+        if stats is not None:
+            stats["num_requests"] += 1
+            stats["num_bytes"] += data["num_bytes"]
+
+    @contextmanager
+    def record(self, stats: Dict):
+        """Record the requests of the current thread to `stats`."""
+        self._local.stats = stats
+        start = time.time()
+        try:
+            yield stats
+        finally:
+            stats["seconds"] += time.time() - start
+            self._local.stats = None
+
+    def __enter__(self):
+        self.hooks.register(self, events=[REQUEST_END])
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.hooks.unregister(self)
+
+
+@contextmanager
+def _record(profiler: Union[AQLProfiler, None], node: AQLNode):
+    if profiler is None:
+        yield
+    else:
+        node.stats = profiler.new_stats()
+        with profiler.record(node.stats):
+            yield
+
+
+def _run_subquery(session, node: AQLNode, max_ids: int, profiler=None):
+    """Run the query of an intermediate node, returning only the column
+    needed by its parent."""
+    with _record(profiler, node):
+        query = _resolve_query(node, max_ids)
+        if query is None:
+            return []
+        interface = session.model_interface(node.model_name, QueryInterface)
+        interface._do_load = False
+        rows = interface.where(query, opts=node.options, page_size=node.page_size)
+        if profiler is not None:
+            node.stats.update(num_rows=len(rows), served_by="server")
+    return [row.get(node.column, None) for row in rows]
+
+
+def _run_plan(session, root: AQLNode, max_ids: int, max_workers: int, profiler=None):
+    """Run the intermediate nodes of the plan, level by level. Sibling nodes
+    of the same level are run concurrently."""
+    for level in root.levels():
+        nodes = [node for node in level if node is not root]
+        if not nodes:
+            continue
+        if len(nodes) == 1:
+            results = [_run_subquery(session, nodes[0], max_ids, profiler)]
+        else:
+            results = asyncfunc(
+                _run_subquery,
+                [(session, node, max_ids, profiler) for node in nodes],
+                progress_bar=False,
+                max_workers=max_workers,
+            )
+        for node, result in zip(nodes, results):
+            node.results = result
+
+
+MAX_IDS = 1000
+"""Maximum number of ids in a single `IN` clause. Longer lists of ids
+are sent as a SQL string of several `IN` clauses."""
+
+
+def _aql(
+    session,
+    data,
+    model=None,
+    max_ids: int = None,
+    max_workers: int = None,
+    profiler: AQLProfiler = None,
+    strategy: str = "client",
+):
+    if max_ids is None:
+        max_ids = MAX_IDS
+    root = plan_aql(session, data, model=model)
+    _run_plan(session, root, max_ids, max_workers, profiler)
+
+    with _record(profiler, root):
+        query = _resolve_query(root, max_ids)
+        if query is None:
+            returned_models = []
+        else:
+            interface = getattr(session, root.model_name)
+            returned_models = interface.where(
+                query, opts=root.options, page_size=root.page_size
+            )
+    if profiler is not None:
+        root.stats["num_rows"] = len(returned_models)
+        if query is not None:
+            root.stats["served_by"] = _served_by(root.stats)
 
     # return models
+    return_stats = None
     if "__return__" in data[QUERY_KEY]:
-        session.browser.get(returned_models, data[QUERY_KEY]["__return__"])
+        relations = data[QUERY_KEY]["__return__"]
+        if profiler is None:
+            _retrieve_return(session, returned_models, relations, strategy)
+        else:
+            return_stats = profiler.new_stats()
+            with profiler.record(return_stats):
+                _retrieve_return(session, returned_models, relations, strategy)
+            return_stats["served_by"] = _served_by(return_stats)
     if data.get("__json__", None) is not None:
-        dump_params = dict(include_uri=True, include_model_type=True)
-        if isinstance(data["__json__"], dict):
-            dump_params.update(data["__json__"])
-        return [m.dump(**dump_params) for m in returned_models]
+        dump_params = _dump_params(data)
+        results = [m.dump(**dump_params) for m in returned_models]
     else:
-        return returned_models
+        results = returned_models
+
+    if profiler is not None:
+        return {
+            "results": results,
+            "plan": root.to_dict(),
+            "__return__": return_stats,
+        }
+    return results
+
+
+def _retrieve_return(
+    session, models: List[ModelBase], relations, strategy: str = "client"
+):
+    """Retrieve the `__return__` relations of the models using the retrieve
+    strategy (see :meth:`Browser.recursive_retrieve
+    <pydent.browser.Browser.recursive_retrieve>`)."""
+    session.browser.recursive_retrieve(models, relations, strategy=strategy)
+
+
+def _dump_params(data: Dict) -> Dict:
+    dump_params = dict(include_uri=True, include_model_type=True)
+    if isinstance(data.get("__json__", None), dict):
+        dump_params.update(data["__json__"])
+    return dump_params
+
+
+def _served_by(stats: Dict) -> str:
+    """Return whether the server or the Browser cache served a query."""
+    if stats["num_requests"]:
+        return "server"
+    return "browser"
+
+
+@lru_cache(maxsize=None)
+def aql_validator():
+    """Return the validator for the AQL schema. The validator is compiled once,
+    on first use."""
+    validator_class = jsonschema.validators.validator_for(aql_schema)
+    validator_class.check_schema(aql_schema)
+    return validator_class(aql_schema)
+
+
+class _ValidationCache:
+    """A bounded cache of the keys of AQL documents that passed validation."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data: Dict) -> Union[str, None]:
+        try:
+            return json.dumps(data, sort_keys=True)
+        except TypeError:
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return True
+            return False
+
+    def add(self, key: str):
+        with self._lock:
+            self._keys[key] = True
+            self._keys.move_to_end(key)
+            if len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+_validation_cache = _ValidationCache()
 
 
 def validate_aql(data):
-    validate_with_schema(
-        data, aql_schema, reraise_as=AquariumQueryLanguageValidationError
-    )
+    """Validate an AQL document using the precompiled AQL schema validator.
+    Documents that have passed validation are cached and are not validated
+    again.
+
+    :param data: the AQL document
+    :return: None
+    :raises AquariumQueryLanguageValidationError: if the document is invalid
+    """
+    key = _validation_cache.key(data)
+    if key is not None and key in _validation_cache:
+        return
+    error = jsonschema.exceptions.best_match(aql_validator().iter_errors(data))
+    if error is not None:
+        raise AquariumQueryLanguageValidationError(str(error)) from error
+    if key is not None:
+        _validation_cache.add(key)
 
 
 def aql(
-    session: SessionABC, data: Dict, use_cache: bool = False
+    session: SessionABC,
+    data: Dict,
+    use_cache: bool = False,
+    explain: bool = False,
+    profile: bool = False,
+    strategy: str = "client",
 ) -> Union[List[ModelBase], Dict]:
     """Perform a complex query a complex JSON query object.
 
@@ -216,11 +608,134 @@ def aql(
     .. versionadded:: 0.1.5a16
     .. versionchanged:: 0.1.5a23 `query` key now changed to `__query__`
 
+    With `explain=True`, the query is not run and the subquery tree of the
+    query plan is returned instead. With `profile=True`, the query is run and
+    a dictionary of the `results`, the subquery tree (`plan`) and the
+    statistics of the `__return__` retrieval is returned. The statistics of
+    each node are its time in seconds, number of requests, number of rows,
+    payload bytes and whether it was served by the 'server' or the 'browser'
+    cache.
+
     :param session: Aquarium session instance
     :param data: data query
-    :param use_cache: whether to inherit the cache from the provided session (default: False)
+    :param use_cache: whether to inherit the cache from the provided session
+        (default: False)
+    :param explain: if True, return the query plan without running the query
+    :param profile: if True, return the results along with the profiled
+        query plan
+    :param strategy: the strategy used to retrieve the `__return__`
+        relations, either 'client' (default) or 'include', which uses a
+        single server-side include where the relationships allow it
     :return:
     """
     validate_aql(data)
+    if explain:
+        return plan_aql(session, data).to_dict()
+    with session.with_cache(using_models=use_cache) as sess:
+        if profile:
+            with AQLProfiler(sess.hooks) as profiler:
+                return _aql(sess, data, profiler=profiler, strategy=strategy)
+        return _aql(sess, data, strategy=strategy)
+
+
+DEFAULT_PAGE_SIZE = 1000
+"""Default number of models per page of a streamed AQL query."""
+
+
+def iter_aql(
+    session: SessionABC,
+    data: Dict,
+    page_size: int = None,
+    use_cache: bool = False,
+    strategy: str = "client",
+) -> Generator[Dict, None, None]:
+    """Run an AQL query and yield the dumped results one by one.
+
+    Results are loaded page by page, so only a single page of models (and
+    the models of its `__return__` relations) is held in memory at a time.
+    Results are dumped using the `__json__` parameters of the query, if any.
+
+    .. code-block:: python
+
+        for record in iter_aql(session, query, page_size=500):
+            print(record["id"])
+
+    :param session: Aquarium session instance
+    :param data: data query
+    :param page_size: number of models per page (default: the `pageSize`
+        option of the query or DEFAULT_PAGE_SIZE)
+    :param use_cache: whether to inherit the cache from the provided session
+        (default: False). If True, the cache is kept between pages.
+    :param strategy: the strategy used to retrieve the `__return__`
+        relations (see :func:`aql`)
+    :return: generator of dumped models
+    """
+    validate_aql(data)
+    dump_params = _dump_params(data)
     with session.with_cache(using_models=use_cache) as sess:
-        return _aql(sess, data)
+        root = plan_aql(sess, data)
+        _run_plan(sess, root, MAX_IDS, None)
+        query = _resolve_query(root, MAX_IDS)
+        if query is None:
+            return
+        if page_size is None:
+            page_size = root.page_size or DEFAULT_PAGE_SIZE
+
+        interface = sess.model_interface(root.model_name, QueryInterface)
+        for models in interface.pagination(query, page_size, opts=root.options):
+            if "__return__" in data[QUERY_KEY]:
+                relations = data[QUERY_KEY]["__return__"]
+                _retrieve_return(sess, models, relations, strategy)
+            for m in models:
+                yield m.dump(**dump_params)
+            if not use_cache:
+                sess.browser.clear()
+
+
+def aql_to_ndjson(
+    session: SessionABC,
+    data: Dict,
+    out,
+    page_size: int = None,
+    use_cache: bool = False,
+    strategy: str = "client",
+) -> int:
+    """Run an AQL query and write the dumped results as newline-delimited
+    JSON (one JSON object per line).
+
+    :param session: Aquarium session instance
+    :param data: data query
+    :param out: a filepath, a file-like object with a `write` method or a
+        socket
+    :param page_size: number of models per page (see :func:`iter_aql`)
+    :param use_cache: whether to inherit the cache from the provided session
+    :param strategy: the strategy used to retrieve the `__return__`
+        relations (see :func:`aql`)
+    :return: the number of records written
+    """
+    if isinstance(out, str):
+        with open(out, "w") as f:
+            return aql_to_ndjson(
+                session,
+                data,
+                f,
+                page_size=page_size,
+                use_cache=use_cache,
+                strategy=strategy,
+            )
+
+    if hasattr(out, "write"):
+        write = out.write
+    else:
+
+        def write(line):
+            out.sendall(line.encode("utf-8"))
+
+    num_records = 0
+    records = iter_aql(
+        session, data, page_size=page_size, use_cache=use_cache, strategy=strategy
+    )
+    for record in records:
+        write(json.dumps(record) + "\n")
+        num_records += 1
+    return num_records
@@ -102,6 +102,7 @@ from pydent.aql import aql_schema
 from pydent.base import ModelBase
 from pydent.base import ModelRegistry
 from pydent.browser import Browser
+from pydent.hooks import Hooks
 from pydent.interfaces import BrowserInterface
 from pydent.interfaces import QueryInterface
 from pydent.interfaces import QueryInterfaceABC
@@ -109,6 +110,7 @@ from pydent.interfaces import SessionInterface
 from pydent.interfaces import UtilityInterface
 from pydent.inventory_updater import save_inventory
 from pydent.models import __all__ as allmodels
+from pydent.request_tracker import RequestTracker
 from pydent.sessionabc import SessionABC
 
 
@@ -208,7 +210,8 @@ class AqSession(SessionABC):
         # get model interface from model class
         model_interface = self.interface_class(model_name, self._aqhttp, self)
 
-        # set interface to session attribute (e.g. session.Sample calls Sample model interface)
+        # set interface to session attribute
+        # (e.g. session.Sample calls Sample model interface)
         setattr(self, model_name, model_interface)
 
     def set_timeout(self, timeout_in_seconds: int):
@@ -220,6 +223,12 @@ class AqSession(SessionABC):
         """Returns the aquarium_url for this session."""
         return self._aqhttp.aquarium_url
 
+    @property
+    def hooks(self) -> Hooks:
+        """Returns the telemetry hooks of the requests and browser of this
+        session (see :mod:`pydent.hooks`)."""
+        return self._aqhttp.hooks
+
     @property
     def login(self) -> str:
         """Logs into aquarium, generating the necessary headers to perform
@@ -385,6 +394,25 @@ class AqSession(SessionABC):
             using_verbose=verbose,
         )
 
+    def track_requests(self, threshold: int = None) -> RequestTracker:
+        """Return a context manager that records the requests made by this
+        session, grouped by model class, relationship and callsite, and flags
+        relationship callbacks made many times from the same line (N+1
+        patterns).
+
+        .. code-block:: python
+
+            with session.track_requests() as tracker:
+                for op in plan.operations:
+                    op.field_values
+            print(tracker.report())
+
+        :param threshold: minimum number of callbacks from the same line to
+            flag as an N+1 pattern
+        :return: the request tracker
+        """
+        return RequestTracker(self, threshold=threshold)
+
     @staticmethod
     def _swap_sessions(from_session, to_session):
         """Moves models from one session to another."""
@@ -399,7 +427,14 @@ class AqSession(SessionABC):
     def query_schema(cls) -> Dict:
         return aql_schema
 
-    def query(self, data: Dict, use_cache: bool = False) -> List[ModelBase]:
+    def query(
+        self,
+        data: Dict,
+        use_cache: bool = False,
+        explain: bool = False,
+        profile: bool = False,
+        strategy: str = "client",
+    ) -> Union[List[ModelBase], Dict]:
         """Perform a complex query a complex JSON query object.
 
         Check out the :ref:`JSON Schema page <json_schema>` for more information.
@@ -444,10 +479,24 @@ class AqSession(SessionABC):
         :param data: data query
         :param use_cache: whether to inherit the cache from the provided session
             (default: False)
+        :param explain: if True, return the query plan without running the
+            query (see :func:`aql <pydent.aql.aql>`)
+        :param profile: if True, return the results along with the profiled
+            query plan (see :func:`aql <pydent.aql.aql>`)
+        :param strategy: the strategy used to retrieve the `__return__`
+            relations, 'client' (default) or 'include' (see
+            :func:`aql <pydent.aql.aql>`)
         :return: list of models fitting the query
         :raises: AquariumQueryLanguageValidationError if input data is invalid.
         """
-        return aql(self, data, use_cache=use_cache)
+        return aql(
+            self,
+            data,
+            use_cache=use_cache,
+            explain=explain,
+            profile=profile,
+            strategy=strategy,
+        )
 
     def __getattr__(self, item):
         if item not in self.__dict__:
@@ -60,6 +60,7 @@ from pydent.interfaces import QueryInterface
 from pydent.marshaller import fields
 from pydent.marshaller import ModelRegistry
 from pydent.marshaller import SchemaModel
+from pydent.marshaller.descriptors import Placeholders
 from pydent.sessionabc import SessionABC
 from pydent.utils import url_build
 
@@ -490,7 +491,7 @@ class ModelBase(SchemaModel):
                 data = model._get_deserialized_data()
                 for key in model.get_relationships():
                     val = data.get(key, None)
-                    if val is None:
+                    if val is None or val is Placeholders.LAZY:
                         continue
                     elif isinstance(val, list):
                         cls._flatten_deserialized_data(val, memo)
@@ -16,6 +16,7 @@ from pprint import pformat
 from typing import Callable
 from typing import Dict
 from typing import List
+from typing import Tuple
 from typing import Union
 
 import networkx as nx
@@ -24,6 +25,12 @@ from pydent import models as pydent_models
 from pydent.base import ModelBase
 from pydent.exceptions import ForbiddenRequestError
 from pydent.exceptions import TridentBaseException
+from pydent.exceptions import TridentRequestError
+from pydent.hooks import CACHE_HIT
+from pydent.hooks import CACHE_MISS
+from pydent.hooks import CACHE_SIZE
+from pydent.hooks import Hooks
+from pydent.hooks import RETRIEVE
 from pydent.interfaces import QueryInterface
 from pydent.interfaces import QueryInterfaceABC
 from pydent.marshaller import ModelRegistry
@@ -55,6 +62,16 @@ class Browser(QueryInterfaceABC):
         "HasManyThrough",
         "HasManyGeneric",
     ]
+    INCLUDE_RELATION_TYPES = [
+        "HasOne",
+        "HasMany",
+        "HasManyThrough",
+        "HasManyGeneric",
+    ]
+    INCLUDE_CALLBACKS = [
+        ModelBase.find_callback.__name__,
+        ModelBase.where_callback.__name__,
+    ]
 
     def __init__(self, session: SessionABC, inherit_models: bool = False):
         """Instantiates a new browser from a AqSession instance.
@@ -78,6 +95,11 @@ class Browser(QueryInterfaceABC):
         if session.browser and inherit_models:
             self.update_cache(session.browser.models)
 
+    @property
+    def hooks(self) -> Hooks:
+        """The telemetry hooks of the session (see :mod:`pydent.hooks`)."""
+        return self.session.hooks
+
     @property
     def model_name(self):
         return self.model.__name__
@@ -427,6 +449,11 @@ class Browser(QueryInterfaceABC):
                 vars(cached_model).update(vars(model))
             else:
                 model_cache_dict[mid] = model
+        hooks = self.hooks
+        if hooks.enabled:
+            hooks.emit(
+                CACHE_SIZE, dict(model=modelname, num_models=len(model_cache_dict))
+            )
         return [model_cache_dict[mid] for mid in modeldict]
 
     def _group_models_and_update_cache(self, models):
@@ -450,9 +477,15 @@ class Browser(QueryInterfaceABC):
             return self.cached_where({"id": id}, model_class)
         cached_models = self.model_cache.get(model_class, {})
         found_model = cached_models.get(id, None)
+        hooks = self.hooks
         if found_model is None:
             found_model = self.interface(model_class).find(id)
+            if hooks.enabled:
+                num_models = 0 if found_model is None else 1
+                hooks.emit(CACHE_MISS, dict(model=model_class, num_models=num_models))
         else:
+            if hooks.enabled:
+                hooks.emit(CACHE_HIT, dict(model=model_class, num_models=1))
             self.log.info(
                 "CACHE found {} model with id={} in cache".format(model_class, id)
             )
@@ -510,11 +543,17 @@ class Browser(QueryInterfaceABC):
                 )
             )
 
+            hooks = self.hooks
+            if hooks.enabled and found_dict:
+                hooks.emit(CACHE_HIT, dict(model=model, num_models=len(found_dict)))
+
             # TODO: this code may be sketchy... here {'id': []}, really means we found
             #       all of the models..
             if primary_key in remaining_query and not remaining_query[primary_key]:
                 return list(found_dict.values())
             server_models = self.interface(model).where(remaining_query, opts=opts)
+            if hooks.enabled:
+                hooks.emit(CACHE_MISS, dict(model=model, num_models=len(server_models)))
 
         models_dict = OrderedDict({s.id: s for s in server_models})
         models_dict.update(found_dict)
@@ -698,6 +737,10 @@ class Browser(QueryInterfaceABC):
         )
 
         if not retrieved_models:
+            if relation.QUERY_TYPE == "query":
+                # mark the relationship as retrieved to avoid lazy requests
+                for model in models:
+                    setattr(model, relationship_name, [] if relation.many else None)
             return []
 
         if relation.QUERY_TYPE == "query":
@@ -906,6 +949,16 @@ class Browser(QueryInterfaceABC):
             no_refresh = []
 
         if needs_refresh:
+            hooks = self.hooks
+            if hooks.enabled:
+                hooks.emit(
+                    RETRIEVE,
+                    dict(
+                        model=models[0].__class__.__name__,
+                        relationship=relationship_name,
+                        batch_size=len(needs_refresh),
+                    ),
+                )
             if hasattr(relation, "through_model_attr"):
                 found_models = self._retrieve_has_many_through(
                     needs_refresh, relationship_name, strict=strict
@@ -936,6 +989,7 @@ class Browser(QueryInterfaceABC):
         relations: Union[str, List[BaseRelationship], Dict],
         strict: bool = True,
         force_refresh: bool = False,
+        strategy: str = "client",
     ):
         """Efficiently retrieve a model relationship recursively from an
         iterable. The relations_dict iterable may be either a list or a
@@ -968,10 +1022,23 @@ class Browser(QueryInterfaceABC):
         :param strict: wither to ignore database inconsistencies
         :param force_refresh:
         :type force_refresh: bool
+        :param strategy: either 'client', which makes a query per relation, or
+            'include', which retrieves as much of the relations as possible
+            using a single server-side include (see :meth:`include_retrieve`)
+        :type strategy: str
         :return: dictionary of all models retrieved grouped by the attribute \
             name that retrieved them.
         :rtype: dictionary
         """
+        if strategy == "include":
+            return self.include_retrieve(
+                models, relations, strict=strict, force_refresh=force_refresh
+            )
+        elif strategy != "client":
+            raise BrowserException(
+                "Retrieve strategy '{}' not recognized. Select from 'client' or "
+                "'include'".format(strategy)
+            )
         self.log.info("RETRIEVE recursively retrieving {}".format(relations))
         if isinstance(relations, str):
             self.log.info('RETRIEVE retrieving "{}"'.format(relations))
@@ -1016,6 +1083,264 @@ class Browser(QueryInterfaceABC):
                 )
             )
 
+    @staticmethod
+    def _relations_dict(relations: Union[str, List, Dict, None]) -> Dict:
+        """Normalize a relation tree into a dictionary."""
+        if not relations:
+            return {}
+        if isinstance(relations, str):
+            return {relations: {}}
+        if isinstance(relations, dict):
+            return dict(relations)
+        return {r: {} for r in relations}
+
+    def can_include(self, model_class: Union[str, type], relationship_name: str):
+        """Return whether a relationship can be retrieved using a server-side
+        include. This is the case for relationships that correspond to a
+        server association, which are those using the default callbacks.
+
+        :param model_class: the model class or its name
+        :param relationship_name: name of the relationship
+        :return: True if the relationship can be included
+        """
+        if isinstance(model_class, str):
+            model_class = ModelRegistry.get_model(model_class)
+        relation = model_class.get_relationships().get(relationship_name, None)
+        return (
+            relation is not None
+            and relation.__class__.__name__ in self.INCLUDE_RELATION_TYPES
+            and relation.callback in self.INCLUDE_CALLBACKS
+        )
+
+    def server_include(
+        self, model_class: Union[str, type], relations: Union[str, List, Dict]
+    ) -> Dict:
+        """Translate a relation tree into a server-side include. Relations that
+        cannot be included, and the relations below them, are omitted.
+
+        .. code-block:: python
+
+            browser.server_include("Plan", {"operations": {"field_values": "sample"}})
+            # {"operations": {"include": {"field_values": {"include": {"sample": {}}}}}}
+
+        :param model_class: the model class or its name
+        :param relations: the relation tree
+        :return: the include
+        """
+        if isinstance(model_class, str):
+            model_class = ModelRegistry.get_model(model_class)
+        include = {}
+        for name, sub_relations in self._relations_dict(relations).items():
+            if self.can_include(model_class, name):
+                relation = model_class.get_relationships()[name]
+                sub_include = self.server_include(relation.nested, sub_relations)
+                if sub_include:
+                    include[name] = {"include": sub_include}
+                else:
+                    include[name] = {}
+        return include
+
+    def _include(self, models: List[ModelBase], include: Dict) -> bool:
+        """Retrieve the included relations of the models using a single
+        query. Returns False if the server did not return the models."""
+        model_class = models[0].__class__.__name__
+        ids = list({m.id for m in models})
+        try:
+            fetched = self.interface(model_class).where({"id": ids}, include=include)
+        except TridentRequestError as e:
+            self.log.error("RETRIEVE include {} failed: {}".format(include, e))
+            return False
+        if not fetched:
+            return False
+        self.log.info(
+            "RETRIEVE retrieved {num} {cls} models using include {include}".format(
+                num=len(fetched), cls=model_class, include=include
+            )
+        )
+
+        fetched_by_id = {m.id: m for m in fetched}
+        pairs = [
+            (model, fetched_by_id[model.id])
+            for model in models
+            if model.id in fetched_by_id
+        ]
+        self._assign_included(pairs, include)
+        return True
+
+    def _assign_included(self, pairs: List[Tuple[ModelBase, ModelBase]], include):
+        """Set the included relations of the fetched models on the models.
+
+        The related models of each level are added to the cache, and the
+        cached instances are assigned, so that the relationships share the
+        browser's instances. The next level is assigned from the cached
+        instances.
+
+        :param pairs: list of (model, fetched model) tuples
+        :param include: the include of the fetched models (see
+            :meth:`server_include`)
+        """
+        for name, sub_include in include.items():
+            nested = sub_include.get("include", None)
+            assigned = []
+            fetched = []
+            for model, fetched_model in pairs:
+                if not fetched_model.is_deserialized(name):
+                    continue
+                val = getattr(fetched_model, name)
+                if val is None:
+                    setattr(model, name, None)
+                    continue
+                many = isinstance(val, list)
+                vals = val if many else [val]
+                assigned.append((model, many, len(vals)))
+                fetched += vals
+            if not fetched:
+                continue
+            self.update_cache(fetched, recursive=False)
+            cached = [
+                self.model_cache[m.__class__.__name__][m._primary_key] for m in fetched
+            ]
+            i = 0
+            for model, many, num in assigned:
+                vals = cached[i : i + num]
+                setattr(model, name, vals if many else vals[0])
+                i += num
+            if nested:
+                self._assign_included(list(zip(cached, fetched)), nested)
+
+    def include_retrieve(
+        self,
+        models: List[ModelBase],
+        relations: Union[str, List, Dict],
+        strict: bool = True,
+        force_refresh: bool = False,
+    ) -> Dict[str, List[ModelBase]]:
+        """Retrieve a relation tree using a server-side include. The
+        relations that can be included (see :meth:`can_include`) are
+        retrieved with a single query. Other relations, or all relations if
+        the server rejects the include, are retrieved as in
+        :meth:`recursive_retrieve`.
+
+        .. code-block:: python
+
+            # a single query for the operations, field values and samples
+            browser.include_retrieve(plans, {"operations": {"field_values": "sample"}})
+
+        :param models: models to retrieve from
+        :param relations: the relation tree
+        :param strict: wither to ignore database inconsistencies
+        :param force_refresh: if True, retrieve relations that have already
+            been retrieved
+        :return: dictionary of all models retrieved grouped by the attribute
+            name that retrieved them.
+        """
+        relations = self._relations_dict(relations)
+        if not models:
+            return {name: [] for name in relations}
+
+        include = self.server_include(models[0].__class__, relations)
+        if include:
+            if force_refresh:
+                needs_refresh = models
+            else:
+                needs_refresh = [
+                    m for m in models if not all(m.is_deserialized(n) for n in include)
+                ]
+            if needs_refresh and not self._include(needs_refresh, include):
+                include = {}
+
+        models_by_attr = {}
+        for name, sub_relations in relations.items():
+            # included relations are already fresh and are only retrieved
+            # again if the server did not return them
+            refresh = force_refresh and name not in include
+            found = self.retrieve(models, name, strict=strict, force_refresh=refresh)
+            models_by_attr.setdefault(name, [])
+            models_by_attr[name] += found
+            if sub_relations and found:
+                _models_by_attr = self.include_retrieve(
+                    found,
+                    sub_relations,
+                    strict=strict,
+                    force_refresh=refresh,
+                )
+                for attr, _models in _models_by_attr.items():
+                    models_by_attr.setdefault(attr, [])
+                    models_by_attr[attr] += _models
+        return models_by_attr
+
+    def retrieve_collections(
+        self,
+        collections: List[ModelBase],
+        samples: bool = True,
+        data_associations: bool = True,
+        strict: bool = True,
+        force_refresh: bool = False,
+    ) -> Dict[str, List[ModelBase]]:
+        """Retrieve the part associations, parts and, optionally, the samples
+        and data associations of the parts for many collections. This uses a
+        fixed number of queries regardless of the number of collections, after
+        which the collection matrices (e.g. `sample_matrix`, `part_matrix` and
+        `data_matrix`) are built without additional requests.
+
+        .. code-block:: python
+
+            collections = browser.where({"object_type_id": ot.id}, "Collection")
+            browser.retrieve_collections(collections)
+            for c in collections:
+                print(c.sample_matrix)
+
+        :param collections: list of collections
+        :param samples: whether to retrieve the samples of the parts
+        :param data_associations: whether to retrieve the data associations of
+            the parts
+        :param strict: wither to ignore database inconsistencies
+        :param force_refresh: if True, retrieve relationships that have already
+            been retrieved
+        :return: dictionary of all models retrieved grouped by the attribute
+            name that retrieved them.
+        """
+        part_relations = {}
+        if samples:
+            part_relations["sample"] = {}
+        if data_associations:
+            part_relations["data_associations"] = {}
+        return self.recursive_retrieve(
+            collections,
+            {"part_associations": {"part": part_relations}},
+            strict=strict,
+            force_refresh=force_refresh,
+        )
+
+    def retrieve_data_associations(
+        self, models: List[ModelBase], force_refresh: bool = False
+    ) -> List[ModelBase]:
+        """Retrieve the data associations of many models. Models may be of
+        different classes, in which case one query is made per model class.
+        Models that are not saved are ignored.
+
+        .. code-block:: python
+
+            browser.retrieve_data_associations(operations + items)
+            for item in items:
+                print(item.data_associations)
+
+        :param models: list of models with data associations
+        :param force_refresh: if True, retrieve data associations that have
+            already been retrieved
+        :return: list of data associations retrieved
+        """
+        models_by_class = {}
+        for model in models:
+            if model.id is not None:
+                models_by_class.setdefault(model.__class__.__name__, []).append(model)
+        associations = []
+        for class_models in models_by_class.values():
+            associations += self.retrieve(
+                class_models, "data_associations", force_refresh=force_refresh
+            )
+        return associations
+
     @classmethod
     def sample_network(
         cls,
@@ -0,0 +1,200 @@
+"""Concurrent downloads of :class:`Upload <pydent.models.Upload>` files.
+
+.. code-block:: python
+
+    manager = DownloadManager(session, max_workers=8)
+    filepaths = manager.download(uploads, outdir="data")
+    print(manager.metrics)
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+from typing import List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pydent.base import ModelBase
+from pydent.exceptions import AquariumModelNotFound
+from pydent.sessionabc import SessionABC
+from pydent.utils.async_requests import asyncfunc
+
+
+class DownloadManager:
+    """Downloads the files of many uploads concurrently.
+
+    The expiring urls of all uploads are resolved using a single query.
+    Files are then streamed to disk in chunks over a shared pool of
+    connections, so at most `max_workers * chunk_size` bytes are held in
+    memory. Files that already exist with the expected size are skipped and
+    partially downloaded files are resumed.
+    """
+
+    def __init__(
+        self,
+        session: SessionABC,
+        max_workers: int = 4,
+        chunk_size: int = 2**20,
+        timeout: int = None,
+    ):
+        """Initializes a download manager.
+
+        :param session: the session used to resolve upload urls
+        :param max_workers: maximum number of concurrent downloads
+        :param chunk_size: number of bytes to read and write at a time
+        :param timeout: timeout in seconds of each download request
+        """
+        self.session = session
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        self.num_downloaded = 0
+        self.num_resumed = 0
+        self.num_skipped = 0
+        self.num_bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def metrics(self) -> dict:
+        """Return the download metrics since the last :meth:`reset_metrics`.
+
+        :return: dictionary of the number of files downloaded, resumed and
+            skipped, the number of bytes downloaded, the total time in seconds
+            and the throughput in bytes per second
+        """
+        bytes_per_second = 0.0
+        if self.seconds:
+            bytes_per_second = self.num_bytes / self.seconds
+        return dict(
+            num_downloaded=self.num_downloaded,
+            num_resumed=self.num_resumed,
+            num_skipped=self.num_skipped,
+            num_bytes=self.num_bytes,
+            seconds=self.seconds,
+            bytes_per_second=bytes_per_second,
+        )
+
+    def resolve_urls(self, uploads: List[ModelBase]) -> Dict[int, str]:
+        """Resolve the expiring urls of many uploads using a single query.
+
+        :param uploads: list of saved uploads
+        :return: dictionary of upload ids to urls. Uploads that the server
+            did not return, or returned without a url, are left out.
+        """
+        ids = list({upload.id for upload in uploads})
+        if not ids:
+            return {}
+        resolved = self.session.Upload.where({"id": ids}, methods=["expiring_url"])
+        urls = {}
+        for upload in resolved:
+            url = upload.raw.get("expiring_url", None)
+            if url:
+                urls[upload.id] = url
+        return urls
+
+    @staticmethod
+    def filepath(upload: ModelBase, outdir: str = None) -> str:
+        """Return the default filepath of the upload."""
+        if outdir is None:
+            outdir = "."
+        return os.path.join(outdir, "{}_{}".format(upload.id, upload.upload_file_name))
+
+    @staticmethod
+    def _expected_size(upload: ModelBase):
+        data = upload._get_data()
+        return data.get("upload_file_size", data.get("size", None))
+
+    def _download(self, url: str, filepath: str, size: int = None, resume=True):
+        """Stream the file at the url to the filepath."""
+        headers = {}
+        mode = "wb"
+        if resume and size and os.path.isfile(filepath):
+            existing_size = os.path.getsize(filepath)
+            if 0 < existing_size < size:
+                headers["Range"] = "bytes={}-".format(existing_size)
+
+        with self._http.get(
+            url, stream=True, headers=headers, timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            # the server may ignore the range and send the whole file
+            resumed = "Range" in headers and response.status_code == 206
+            if resumed:
+                mode = "ab"
+            num_bytes = 0
+            with open(filepath, mode) as out_file:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        out_file.write(chunk)
+                        num_bytes += len(chunk)
+        with self._lock:
+            self.num_downloaded += 1
+            self.num_resumed += int(resumed)
+            self.num_bytes += num_bytes
+
+    def download(
+        self,
+        uploads: List[ModelBase],
+        outdir: str = None,
+        overwrite: bool = True,
+        skip_existing: bool = None,
+        resume: bool = True,
+    ) -> List[str]:
+        """Download the files of many uploads.
+
+        :param uploads: list of saved uploads
+        :param outdir: path of the output directory (default is current directory)
+        :param overwrite: if False, existing files are never downloaded again
+        :param skip_existing: if True, existing files with the expected size are
+            not downloaded again (default is `not overwrite`, so existing files
+            are downloaded again when overwriting)
+        :param resume: if True, files smaller than the expected size are resumed
+        :return: list of filepaths in the order of `uploads`
+        :raises AquariumModelNotFound: if the urls of some uploads could not
+            be resolved. The files of the other uploads are downloaded first.
+        """
+        if skip_existing is None:
+            skip_existing = not overwrite
+        start = time.time()
+        filepaths = [self.filepath(upload, outdir) for upload in uploads]
+        to_download = {}
+        for upload, filepath in zip(uploads, filepaths):
+            size = self._expected_size(upload)
+            if os.path.isfile(filepath):
+                if not overwrite or (
+                    skip_existing
+                    and size is not None
+                    and os.path.getsize(filepath) == size
+                ):
+                    self.num_skipped += 1
+                    continue
+            to_download[filepath] = (upload, size)
+
+        urls = self.resolve_urls([upload for upload, _ in to_download.values()])
+        args = []
+        missing = []
+        for filepath, (upload, size) in to_download.items():
+            if upload.id in urls:
+                args.append((urls[upload.id], filepath, size, resume))
+            else:
+                missing.append(upload.id)
+        asyncfunc(
+            self._download, args, progress_bar=False, max_workers=self.max_workers
+        )
+        self.seconds += time.time() - start
+        if missing:
+            raise AquariumModelNotFound(
+                "Could not resolve the urls of Uploads {}. The files of the other "
+                "uploads were downloaded.".format(sorted(set(missing)))
+            )
+        return filepaths
@@ -0,0 +1,350 @@
+"""Telemetry hooks for requests and the browser cache.
+
+Hooks are callables registered to a session and called with the name and
+data of each event. Events are only built if a hook is registered, so
+unregistered sessions pay a single attribute check per request.
+
+.. code-block:: python
+
+    from pydent.hooks import MetricsAggregator
+
+    metrics = MetricsAggregator()
+    session.hooks.register(metrics)
+
+    session.Sample.last(10)
+
+    print(metrics.summary())
+    print(metrics.to_prometheus())
+
+Events
+------
+
+=================  ========================================================
+event              data
+=================  ========================================================
+`request_start`    method, path, model
+`request_end`      method, path, model, status, num_bytes, seconds, error
+`cache_hit`        model, num_models
+`cache_miss`       model, num_models
+`cache_size`       model, num_models
+`retrieve`         model, relationship, batch_size
+=================  ========================================================
+
+`model` is the model name of JSON queries (e.g. 'Sample'), or None. `status`
+is None and `error` is the name of the exception class if the request raised
+before a response was received. `cache_miss` counts the
+models returned by the server when the cache could not serve a query.
+"""
+
+import bisect
+import threading
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+REQUEST_START = "request_start"
+REQUEST_END = "request_end"
+CACHE_HIT = "cache_hit"
+CACHE_MISS = "cache_miss"
+CACHE_SIZE = "cache_size"
+RETRIEVE = "retrieve"
+EVENTS = (REQUEST_START, REQUEST_END, CACHE_HIT, CACHE_MISS, CACHE_SIZE, RETRIEVE)
+
+
+class HookException(Exception):
+    """Generic hook exception."""
+
+
+class Hooks:
+    """A registry of hooks called on telemetry events."""
+
+    def __init__(self):
+        self._hooks = {}
+        self.enabled = False  #: whether any hook is registered
+
+    def register(self, hook: Callable, events: List[str] = None) -> Callable:
+        """Register a hook.
+
+        :param hook: callable called with the name and the data dictionary of
+            each event
+        :param events: names of the events to call the hook on (default all)
+        :return: the hook
+        """
+        if events is None:
+            events = EVENTS
+        for event in events:
+            if event not in EVENTS:
+                raise HookException(
+                    "Event '{}' not recognized. Select from {}".format(event, EVENTS)
+                )
+            self._hooks.setdefault(event, []).append(hook)
+        self.enabled = True
+        return hook
+
+    def unregister(self, hook: Callable):
+        """Unregister a hook from all events."""
+        for event in list(self._hooks):
+            hooks = [h for h in self._hooks[event] if h is not hook]
+            if hooks:
+                self._hooks[event] = hooks
+            else:
+                del self._hooks[event]
+        self.enabled = bool(self._hooks)
+
+    def emit(self, event: str, data: Dict):
+        """Call the hooks registered to the event."""
+        for hook in self._hooks.get(event, ()):
+            hook(event, data)
+
+
+class Histogram:
+    """A histogram of observations over fixed buckets.
+
+    Percentiles are estimated by linear interpolation within the bucket
+    containing the percentile, as done by Prometheus' `histogram_quantile`.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[int]:
+        counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0 to 100) of the observations.
+
+        :param q: the percentile
+        :return: the estimated percentile or None if nothing was observed.
+            Percentiles beyond the last bucket return the last bucket bound.
+        """
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        lower = 0.0
+        previous = 0
+        for upper, total in zip(self.buckets, self.cumulative_counts()):
+            if total >= rank and total > previous:
+                return lower + (upper - lower) * (rank - previous) / (total - previous)
+            lower = upper
+            previous = total
+        return self.buckets[-1]
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+"""Buckets (in seconds) of the request latency histograms."""
+
+BATCH_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+"""Buckets of the retrieve batch size histograms."""
+
+PERCENTILES = (50, 90, 99)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, **extra) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join('{}="{}"'.format(k, _escape(v)) for k, v in pairs) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+class MetricsAggregator:
+    """A hook that aggregates events in memory.
+
+    Counts and sizes are aggregated as counters, the cache sizes as gauges,
+    and the request latencies and retrieve batch sizes as histograms. The
+    metrics are exported in the Prometheus text exposition format by
+    :meth:`to_prometheus`.
+    """
+
+    PREFIX = "pydent"
+
+    # name: (type, help, label names)
+    METRICS = dict(
+        requests_total=(
+            "counter",
+            "Number of requests made to the Aquarium server.",
+            ("method", "status"),
+        ),
+        request_errors_total=(
+            "counter",
+            "Number of requests that raised before a response was received.",
+            ("method", "error"),
+        ),
+        response_bytes_total=(
+            "counter",
+            "Number of bytes received from the Aquarium server.",
+            ("method",),
+        ),
+        request_duration_seconds=(
+            "histogram",
+            "Latency of requests made to the Aquarium server.",
+            ("method",),
+        ),
+        cache_hits_total=(
+            "counter",
+            "Number of models found in the browser cache.",
+            ("model",),
+        ),
+        cache_misses_total=(
+            "counter",
+            "Number of models requested from the server by the browser.",
+            ("model",),
+        ),
+        cache_models=(
+            "gauge",
+            "Number of models in the browser cache.",
+            ("model",),
+        ),
+        retrieve_batch_size=(
+            "histogram",
+            "Number of models whose relationship is retrieved at once.",
+            ("model", "relationship"),
+        ),
+    )
+
+    def __init__(self, latency_buckets=None, batch_buckets=None):
+        """Initializes an aggregator.
+
+        :param latency_buckets: buckets in seconds of the request latency
+            histograms (default :data:`LATENCY_BUCKETS`)
+        :param batch_buckets: buckets of the retrieve batch size histograms
+            (default :data:`BATCH_BUCKETS`)
+        """
+        if latency_buckets is None:
+            latency_buckets = LATENCY_BUCKETS
+        if batch_buckets is None:
+            batch_buckets = BATCH_BUCKETS
+        self.buckets = dict(
+            request_duration_seconds=tuple(latency_buckets),
+            retrieve_batch_size=tuple(batch_buckets),
+        )
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.metrics = {name: {} for name in self.METRICS}
+
+    def _inc(self, name: str, labels: Tuple, value=1):
+        values = self.metrics[name]
+        values[labels] = values.get(labels, 0) + value
+
+    def _observe(self, name: str, labels: Tuple, value: float):
+        values = self.metrics[name]
+        histogram = values.get(labels, None)
+        if histogram is None:
+            histogram = values.setdefault(labels, Histogram(self.buckets[name]))
+        histogram.observe(value)
+
+    def __call__(self, event: str, data: Dict):
+        with self._lock:
+            if event == REQUEST_END:
+                method = data["method"]
+                if data["error"] is not None:
+                    self._inc("request_errors_total", (method, data["error"]))
+                else:
+                    self._inc("requests_total", (method, data["status"]))
+                self._inc("response_bytes_total", (method,), data["num_bytes"])
+                self._observe("request_duration_seconds", (method,), data["seconds"])
+            elif event == CACHE_HIT:
+                self._inc("cache_hits_total", (data["model"],), data["num_models"])
+            elif event == CACHE_MISS:
+                self._inc("cache_misses_total", (data["model"],), data["num_models"])
+            elif event == CACHE_SIZE:
+                self.metrics["cache_models"][(data["model"],)] = data["num_models"]
+            elif event == RETRIEVE:
+                labels = (data["model"], data["relationship"])
+                self._observe("retrieve_batch_size", labels, data["batch_size"])
+
+    def summary(self) -> Dict:
+        """Return the aggregated metrics as a dictionary.
+
+        :return: dictionary of metric names to lists of dictionaries of
+            labels and values. Histograms are summarized by their count, sum
+            and 50th, 90th and 99th percentiles.
+        """
+        summary = {}
+        with self._lock:
+            for name, (kind, _, label_names) in self.METRICS.items():
+                rows = []
+                for labels, value in sorted(self.metrics[name].items(), key=str):
+                    row = dict(zip(label_names, labels))
+                    if kind == "histogram":
+                        row.update(count=value.count, sum=value.sum)
+                        for q in PERCENTILES:
+                            row["p{}".format(q)] = value.percentile(q)
+                    else:
+                        row["value"] = value
+                    rows.append(row)
+                summary[name] = rows
+        return summary
+
+    def to_prometheus(self) -> str:
+        """Export the aggregated metrics in the Prometheus text exposition
+        format."""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, label_names) in self.METRICS.items():
+                values = self.metrics[name]
+                if not values:
+                    continue
+                metric = "{}_{}".format(self.PREFIX, name)
+                lines.append("# HELP {} {}".format(metric, help_text))
+                lines.append("# TYPE {} {}".format(metric, kind))
+                for labels, value in sorted(values.items(), key=str):
+                    if kind == "histogram":
+                        bounds = list(value.buckets) + [float("inf")]
+                        for bound, total in zip(bounds, value.cumulative_counts()):
+                            lines.append(
+                                "{}_bucket{} {}".format(
+                                    metric,
+                                    _labels(
+                                        label_names, labels, le=_format_value(bound)
+                                    ),
+                                    total,
+                                )
+                            )
+                        lines.append(
+                            "{}_sum{} {}".format(
+                                metric, _labels(label_names, labels), value.sum
+                            )
+                        )
+                        lines.append(
+                            "{}_count{} {}".format(
+                                metric, _labels(label_names, labels), value.count
+                            )
+                        )
+                    else:
+                        lines.append(
+                            "{}{} {}".format(
+                                metric, _labels(label_names, labels), value
+                            )
+                        )
+        if not lines:
+            return ""
+        return "\n".join(lines) + "\n"
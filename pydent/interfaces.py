@@ -34,12 +34,16 @@ from abc import abstractmethod
 from typing import Generator
 from typing import List
 from typing import Union
+from warnings import warn
 
 from inflection import pluralize
 from inflection import underscore
 
+from .exceptions import AquariumModelError
 from .exceptions import TridentRequestError
 from .utils import url_build
+from .utils.async_requests import asyncfunc
+from .utils.async_requests import chunkify
 from pydent.marshaller.base import SchemaModel
 from pydent.marshaller.registry import ModelRegistry
 
@@ -227,7 +231,103 @@ class UtilityInterface(CRUDInterface):
             s.reload(data)
         return samples
 
-    def create_items(self, items):
+    def merge_samples(self, samples, chunk_size: int = 100) -> List[bool]:
+        """Merge samples by name.
+
+        Existing samples with the same names are found using a single query.
+        New samples are created in chunks of `chunk_size` using
+        :meth:`create_samples`. Samples with the same name and sample type as
+        an existing sample are merged into the existing sample. New samples
+        that share a name and sample type within `samples` are created once
+        and later duplicates are merged into the first one. The merged
+        samples and the samples that already have an id are updated using
+        :meth:`update_samples`.
+
+        :param samples: list of samples to merge
+        :param chunk_size: number of new samples to create per request
+        :return: list of booleans in the same order as `samples`. True if the
+            sample was merged into an existing sample or into a duplicate
+            earlier in `samples`, False if it was created or saved.
+        :raises AquariumModelError: if a sample with the same name but a
+            different sample type exists on the server or in `samples`.
+        """
+        samples = list(samples)
+        names = list({s.name for s in samples if not s.id})
+        existing = {}
+        if names:
+            for s in self.session.Sample.where({"name": names}):
+                existing.setdefault(s.name, []).append(s)
+
+        saved_samples = []
+        new_samples = {}
+        merged = []
+        duplicates = []
+        for sample in samples:
+            if sample.id:
+                saved_samples.append(sample)
+                continue
+            matches = existing.get(sample.name, [])
+            match = None
+            for s in matches:
+                if s.sample_type_id == sample.sample_type_id:
+                    match = s
+                    break
+            if match is not None:
+                merged.append((sample, match))
+                continue
+            if not matches and sample.name in new_samples:
+                matches = [new_samples[sample.name]]
+                if matches[0].sample_type_id == sample.sample_type_id:
+                    duplicates.append((sample, matches[0]))
+                    continue
+            if matches:
+                raise AquariumModelError(
+                    "Cannot merge Sample '{}' (sample_type_id={}) since a sample with"
+                    " the same name but sample_type_id={} already exists.".format(
+                        sample.name, sample.sample_type_id, matches[0].sample_type_id
+                    )
+                )
+            sample.is_savable(do_raise=True)
+            new_samples[sample.name] = sample
+
+        for sample, first in duplicates:
+            first.update_properties(sample.properties)
+            first.description = sample.description
+            first.project = sample.project
+        for chunk in chunkify(list(new_samples.values()), chunk_size):
+            self.create_samples(chunk)
+        for sample, first in duplicates:
+            sample.reload(first.dump())
+        for sample, match in merged:
+            match.update_properties(sample.properties)
+            match.description = sample.description
+            match.project = sample.project
+        self.update_samples(saved_samples + [match for _, match in merged])
+        for sample, match in merged:
+            sample.reload(match.dump())
+
+        merged_ids = {id(sample) for sample, _ in merged + duplicates}
+        return [id(sample) in merged_ids for sample in samples]
+
+    def create_items(
+        self, items, chunk_size: int = 10, max_workers: int = 4, load: bool = False
+    ):
+        """Creates new items on the server using 'items/make'.
+
+        Aquarium has no endpoint to create many items at once, so one request
+        is made per item. Items are grouped by their (sample, object_type), and
+        the groups are created concurrently in chunks of `chunk_size`, with at
+        most `max_workers` requests at a time.
+
+        :param items: list of new items
+        :param chunk_size: maximum number of items created by a single worker
+        :param max_workers: maximum number of concurrent requests
+        :param load: if True, reload the items with the server responses and
+            return the items
+        :return: the list of 'items/make' responses, or the list of created
+            items if `load` is True, in the same order as 'items'
+        """
+
         def sid(i):
             if i.sample_id:
                 return i.sample_id
@@ -238,9 +338,35 @@ class UtilityInterface(CRUDInterface):
                 return i.object_type_id
             return i.object_type.id
 
-        return [
-            self.aqhttp.get("items/make/{}/{}".format(sid(i), otid(i))) for i in items
-        ]
+        items = list(items)
+        groups = {}
+        for index, item in enumerate(items):
+            groups.setdefault((sid(item), otid(item)), []).append(index)
+
+        def make(key, indices):
+            url = "items/make/{}/{}".format(*key)
+            return [(index, self.aqhttp.get(url)) for index in indices]
+
+        tasks = []
+        for key, indices in groups.items():
+            for chunk in chunkify(indices, chunk_size):
+                tasks.append((key, chunk))
+        if len(tasks) > 1:
+            results = asyncfunc(
+                make, tasks, progress_bar=False, max_workers=max_workers
+            )
+        else:
+            results = [make(*task) for task in tasks]
+
+        responses = [None] * len(items)
+        for chunk_results in results:
+            for index, result in chunk_results:
+                responses[index] = result
+        if not load:
+            return responses
+        for item, result in zip(items, responses):
+            item.reload(result["item"])
+        return items
 
     def update_operation_type(self, operation_type):
         """Creates a field type for an existing operation type"""
@@ -315,6 +441,102 @@ class UtilityInterface(CRUDInterface):
     # Save/Update
     ##############################
 
+    def update_samples(self, samples, max_workers: int = 4):
+        """Updates existing samples and their field values on the server.
+
+        Aquarium has no endpoint to update many records at once: 'json/save'
+        saves a single record and 'browser/create_samples' only creates new
+        samples. The field values are therefore saved with one request each,
+        concurrently, followed by one request per sample. The field values on
+        the server that no longer belong to a sample are found using a single
+        query and are detached from their sample.
+
+        :param samples: list of saved samples
+        :param max_workers: maximum number of concurrent requests
+        :return: the list of updated samples
+        :raises AquariumModelError: if a sample is missing required properties
+        """
+        samples = list(samples)
+        if not samples:
+            return samples
+        for sample in samples:
+            sample.is_savable(do_raise=True)
+
+        def save_all(models, save):
+            asyncfunc(
+                save,
+                [(m,) for m in models],
+                progress_bar=False,
+                max_workers=max_workers,
+            )
+
+        field_values = [fv for sample in samples for fv in sample.field_values]
+        save_all(field_values, lambda fv: fv.save())
+
+        fv_ids = {fv.id for fv in field_values}
+        server_fvs = self.session.FieldValue.where(
+            dict(parent_id=[sample.id for sample in samples], parent_class="Sample")
+        )
+        to_remove = [fv for fv in server_fvs if fv.id not in fv_ids]
+        if to_remove:
+            warn(
+                "Trident tried to save a Sample, but it required FieldValues to be"
+                " deleted."
+            )
+            for fv in to_remove:
+                fv.parent_id = None
+            save_all(to_remove, lambda fv: fv.save())
+
+        save_all(
+            samples,
+            lambda sample: sample.reload(self.json_save("Sample", sample.dump())),
+        )
+        return samples
+
+    def save_data_associations(self, model_key_values, max_workers: int = 4):
+        """Creates or updates the data associations of many models.
+
+        Existing data associations of the models are retrieved using one
+        query per model class, after which the new and updated associations
+        are saved concurrently. Models that are not saved are associated
+        without making requests.
+
+        .. code-block:: python
+
+            session.utils.save_data_associations(
+                [(item, "concentration", 10) for item in items]
+            )
+
+        :param model_key_values: list of (model, key, value) tuples
+        :param max_workers: maximum number of concurrent requests
+        :return: list of data associations in the order of `model_key_values`
+        """
+        model_key_values = list(model_key_values)
+        self.session.browser.retrieve_data_associations(
+            [model for model, _, _ in model_key_values]
+        )
+        associations = []
+        to_save = {}
+        for model, key, value in model_key_values:
+            if not model.id:
+                associations.append(model.associate(key, value, save=False))
+                continue
+            association = model.get_data_association(key)
+            if association is None:
+                association = model._make_association(key, value, model)
+                model.append_to_many("data_associations", association)
+            else:
+                association.value = value
+            to_save[id(association)] = association
+            associations.append(association)
+        asyncfunc(
+            lambda association: association.save(),
+            [(a,) for a in to_save.values()],
+            progress_bar=False,
+            max_workers=max_workers,
+        )
+        return associations
+
     def update_code(self, code):
         """Updates code for a operation_type."""
         controller = underscore(pluralize(code.parent_class))
@@ -330,6 +552,32 @@ class UtilityInterface(CRUDInterface):
                 "Unable to update code object {}".format(code_data), result
             )
 
+    def save_wire(self, wire):
+        """Creates or updates a wire between two saved field values."""
+        wire_data = {
+            "from_id": wire.source.id,
+            "to_id": wire.destination.id,
+            "active": wire.active,
+        }
+        if wire.id:
+            wire_data["id"] = wire.id
+        result = self.json_save("Wire", wire_data)
+        if result and "id" in result:
+            wire.id = result["id"]
+            wire.from_id = result.get("from_id", wire_data["from_id"])
+            wire.to_id = result.get("to_id", wire_data["to_id"])
+        return wire
+
+    ##############################
+    # Delete
+    ##############################
+
+    def delete_wire(self, wire):
+        """Permanently deletes a wire on the Aquarium server."""
+        if wire.id is None:
+            return
+        return self.json_delete("Wire", {"id": wire.id})
+
     ##############################
     # Misc
     ##############################
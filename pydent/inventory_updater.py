@@ -1,15 +1,21 @@
+import time
+from typing import Callable
 from typing import Iterable
 from typing import List
 from typing import Union
 
 import networkx as nx
 
+from pydent.base import ModelBase
+from pydent.browser import Browser
 from pydent.exceptions import TridentBaseException
 from pydent.models import Collection
 from pydent.models import Item
 from pydent.models import Plan
 from pydent.models import Sample
 from pydent.sessionabc import SessionABC
+from pydent.utils.async_requests import asyncfunc
+from pydent.utils.async_requests import chunkify
 
 
 VALID_INVENTORY_TYPES = [Sample, Item, Plan, Collection]
@@ -42,37 +48,93 @@ def is_inventory_type(m):
     return False
 
 
-def _handle_sample(
-    g: nx.DiGraph, m: InventoryType, to_visit: List[InventoryType], visited: List[str]
-):
+def _retrieve(browser: Browser, models: List[ModelBase], relationship_name: str):
+    """Retrieve a relationship for all saved models that have not yet
+    deserialized it, using one :meth:`Browser.retrieve` per model class.
+
+    Unsaved models are skipped, as their relationships are resolved when they
+    are accessed.
+    """
+    groups = {}
+    for m in models:
+        if m is not None and m.id is not None:
+            if not m.is_deserialized(relationship_name):
+                groups.setdefault(m.__class__, []).append(m)
+    for group in groups.values():
+        browser.retrieve(group, relationship_name)
+
+
+def _prefetch(browser: Browser, models: List[InventoryType]):
+    """Retrieve the relationships needed to visit the list of models."""
+    items = [m for m in models if isinstance(m, Item)]
+    collections = [m for m in models if isinstance(m, Collection)]
+    plans = [m for m in models if isinstance(m, Plan)]
+
+    _retrieve(browser, items, "object_type")
+    parts = [
+        m
+        for m in items
+        if m.id is not None and m.object_type is not None and m.object_type.rows
+    ]
+    _retrieve(browser, parts, "part_associations")
+    _retrieve(
+        browser, [pa for m in parts for pa in m.part_associations or []], "collection"
+    )
+
+    _retrieve(browser, collections, "part_associations")
+    part_associations = [pa for m in collections for pa in m.part_associations or []]
+    _retrieve(browser, part_associations, "part")
+    _retrieve(
+        browser,
+        [pa.part for pa in part_associations if pa.is_deserialized("part")],
+        "sample",
+    )
+
+    _retrieve(browser, plans, "operations")
+    operations = [op for m in plans for op in m.operations or []]
+    _retrieve(browser, operations, "field_values")
+    field_values = [fv for op in operations for fv in op.field_values or []]
+    _retrieve(browser, field_values, "sample")
+    _retrieve(browser, field_values, "item")
+
+
+def _containing_collection(item: Item) -> Union[Collection, None]:
+    if item.id is not None and item.is_deserialized("part_associations"):
+        if not item.is_part or len(item.part_associations) != 1:
+            return None
+        return item.part_associations[0].collection
+    return item.containing_collection
+
+
+def _handle_sample(g: nx.DiGraph, m: Sample, to_visit: List[InventoryType]):
     if m.is_deserialized("field_values"):
         for fv in m.field_values:
-            if fv.is_deserialized("sample"):
+            if fv.is_deserialized("sample") and fv.sample is not None:
                 add_edge(g, m, fv.sample)
-                if to_node(fv.sample) not in visited:
-                    to_visit.append(fv.sample)
+                to_visit.append(fv.sample)
     elif m.is_deserialized("items"):
         for item in m.items:
-            if to_node(item) not in visited:
-                to_visit.append(item)
+            to_visit.append(item)
 
 
-def _handle_collection(g, m, to_visit):
-    for pa in m.part_associations:
-        if pa.has_unsaved_sample:
+def _handle_collection(g: nx.DiGraph, m: Collection, to_visit: List[InventoryType]):
+    for pa in m.part_associations or []:
+        if pa.has_unsaved_sample():
             add_edge(g, m, pa.part.sample)
             to_visit.append(pa.part.sample)
 
 
-def _handle_item(g, m, to_visit):
-    if m.is_deserialized("sample"):
+def _handle_item(g: nx.DiGraph, m: Item, to_visit: List[InventoryType]):
+    if m.is_deserialized("sample") and m.sample is not None:
         add_edge(g, m, m.sample)
         to_visit.append(m.sample)
     if m.object_type.rows:
-        to_visit.append(m.containing_collection)
+        collection = _containing_collection(m)
+        if collection is not None:
+            to_visit.append(collection)
 
 
-def _handle_plan(g, m, to_visit):
+def _handle_plan(g: nx.DiGraph, m: Plan, to_visit: List[InventoryType]):
     for op in m.operations:
         for fv in op.field_values:
             if fv.sample:
@@ -88,6 +150,10 @@ def models_to_graph(session: SessionABC, models: Iterable[InventoryType]) -> nx.
     """Convert an iterable of inventory models (Item, Sample, Collection, or
     Plans), into a DAG.
 
+    Models are visited breadth first. Before each level is visited, the
+    relationships needed for that level are retrieved using a single
+    :meth:`Browser.retrieve <pydent.browser.Browser.retrieve>` per relationship.
+
     :param session: AqSession
     :param models: list of models
     :return: nx.DiGraph
@@ -102,53 +168,152 @@ def models_to_graph(session: SessionABC, models: Iterable[InventoryType]) -> nx.
 
     # create graph
     graph = nx.DiGraph()
-    with session.with_cache(using_models=True, timeout=60):
+    with session.with_cache(using_models=True, timeout=60) as sess:
         for m in models:
             add_node(graph, m)
 
-        to_visit = models[:]
-        visited = []
-        while to_visit:
-            m = to_visit.pop()
-            if to_node(m) in visited:
-                continue
-            else:
-                visited.append(to_node(m))
-            cls = m.__class__.__name__
-            if isinstance(m, Item):
-                _handle_item(graph, m, to_visit)
-            elif isinstance(m, Sample):
-                _handle_sample(graph, m, to_visit, visited)
-            elif isinstance(m, Collection):
-                _handle_collection(graph, m, to_visit)
-            elif isinstance(m, Plan):
-                _handle_plan(graph, m, to_visit)
-            else:
-                raise TridentBaseException(
-                    "type {} is not a valid inventory type".format(cls)
-                )
+        visited = set()
+        frontier = list(models)
+        while frontier:
+            level = []
+            for m in frontier:
+                node = to_node(m)
+                if node not in visited:
+                    visited.add(node)
+                    level.append(m)
+
+            _prefetch(sess.browser, level)
+
+            frontier = []
+            for m in level:
+                if isinstance(m, Item):
+                    _handle_item(graph, m, frontier)
+                elif isinstance(m, Sample):
+                    _handle_sample(graph, m, frontier)
+                elif isinstance(m, Collection):
+                    _handle_collection(graph, m, frontier)
+                elif isinstance(m, Plan):
+                    _handle_plan(graph, m, frontier)
+                else:
+                    raise TridentBaseException(
+                        "type {} is not a valid inventory type".format(
+                            m.__class__.__name__
+                        )
+                    )
     return graph
 
 
+def dependency_levels(graph: nx.DiGraph) -> List[List[str]]:
+    """Group the nodes of an inventory graph into dependency levels.
+
+    The models of a level only depend on models of previous levels, so the
+    models of a level can be saved independently of each other.
+
+    :param graph: inventory graph (see :func:`models_to_graph`)
+    :return: list of levels of node keys
+    """
+    node_levels = {}
+    levels = []
+    for n in nx.topological_sort(graph.reverse()):
+        level = 1 + max((node_levels[s] for s in graph.successors(n)), default=-1)
+        node_levels[n] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(n)
+    return levels
+
+
+def _save_models(
+    session: SessionABC,
+    models: List[InventoryType],
+    merge_samples: bool,
+    chunk_size: int,
+    max_workers: int,
+):
+    """Save a list of independent models.
+
+    New samples are created (or merged) in chunks of `chunk_size`. All other
+    models are saved individually. Requests are run concurrently.
+    """
+    new_samples = []
+    others = []
+    for model in models:
+        if isinstance(model, Sample):
+            if not merge_samples:
+                model.is_savable(do_raise=True)
+            new_samples.append(model)
+        else:
+            others.append(model)
+
+    def save(model_or_chunk):
+        if not isinstance(model_or_chunk, list):
+            model_or_chunk.save()
+        elif merge_samples:
+            session.utils.merge_samples(model_or_chunk, chunk_size=chunk_size)
+        else:
+            session.utils.create_samples(model_or_chunk)
+
+    tasks = chunkify(new_samples, chunk_size) + others
+    if len(tasks) == 1:
+        save(tasks[0])
+    elif tasks:
+        asyncfunc(
+            save, [(t,) for t in tasks], progress_bar=False, max_workers=max_workers
+        )
+
+
 def save_inventory(
-    session: SessionABC, inventory: List[InventoryType], merge_samples: bool = False
+    session: SessionABC,
+    inventory: List[InventoryType],
+    merge_samples: bool = False,
+    chunk_size: int = 100,
+    max_workers: int = 4,
+    callback: Callable[[dict], None] = None,
 ) -> List[InventoryType]:
     """Saves a list of inventory items to the server.
 
+    Models are saved in dependency levels (see :func:`dependency_levels`). The
+    new samples of a level are created in chunks of `chunk_size`, and the
+    requests of a level are run concurrently.
+
     :param session: the AqSession instance
     :param inventory: list of inventory items
     :param merge_samples: if True, will merge Samples by name if a sample with
-        the same name already exists. See the :method:`merge_sample_by_name` method.
+        the same name already exists. See
+        :meth:`~pydent.interfaces.UtilityInterface.merge_samples`.
+    :param chunk_size: number of new samples to create (or merge) per request
+    :param max_workers: maximum number of concurrent requests
+    :param callback: optional function called after each level is saved, with
+        a dictionary containing the 'level', 'num_levels', 'num_saved',
+        'num_models', 'num_requests' and 'seconds' elapsed.
     :return: list of inventory that was saved.
     """
     graph = models_to_graph(session, inventory)
+    levels = []
+    for level in dependency_levels(graph):
+        models = [graph.nodes[n]["model"] for n in level]
+        levels.append([m for m in models if not m.id])
+    levels = [level for level in levels if level]
+
+    aqhttp = getattr(session, "_aqhttp", None)
+    start_requests = getattr(aqhttp, "num_requests", 0)
+    start_time = time.time()
+    num_models = sum(len(level) for level in levels)
+
     new_inventory = []
-    for n in nx.topological_sort(graph.reverse()):
-        model = graph.nodes[n]["model"]
-        if not model.id:
-            new_inventory.append(model)
-            if merge_samples and isinstance(model, Sample):
-                model.merge()
-            else:
-                model.save()
+    for i, level in enumerate(levels):
+        _save_models(session, level, merge_samples, chunk_size, max_workers)
+        new_inventory += level
+        if callback:
+            num_requests = getattr(aqhttp, "num_requests", 0) - start_requests
+            callback(
+                {
+                    "level": i,
+                    "num_levels": len(levels),
+                    "num_saved": len(new_inventory),
+                    "num_models": num_models,
+                    "num_requests": num_requests,
+                    "seconds": time.time() - start_time,
+                }
+            )
     return new_inventory
@@ -29,6 +29,7 @@ will deserialize JSON data to an object.
     SchemaRegistry
     descriptors
     exceptions
+    lazy_deserialization
     utils
 
 Fields
@@ -53,5 +54,6 @@ from pydent.marshaller import exceptions
 from pydent.marshaller import fields
 from pydent.marshaller.base import add_schema
 from pydent.marshaller.base import SchemaModel
+from pydent.marshaller.descriptors import lazy_deserialization
 from pydent.marshaller.registry import ModelRegistry
 from pydent.marshaller.registry import SchemaRegistry
@@ -9,6 +9,7 @@ from typing import Tuple
 from typing import Union
 
 from pydent.marshaller.descriptors import DataAccessor
+from pydent.marshaller.descriptors import serialize_deferred
 from pydent.marshaller.exceptions import SchemaException
 from pydent.marshaller.exceptions import SchemaModelException
 from pydent.marshaller.fields import Callback
@@ -83,6 +84,7 @@ class SchemaModel(metaclass=ModelRegistry):
 
     def _get_data(self):
         """Return the model's data."""
+        serialize_deferred(self)
         return getattr(self, self.__class__._data_key)
 
     def _get_deserialized_data(self):
@@ -126,6 +128,7 @@ class SchemaModel(metaclass=ModelRegistry):
         :param name: name of the attribute
         :return: None
         """
+        serialize_deferred(self)
         del self._get_deserialized_data()[name]
 
     @classmethod
@@ -1,9 +1,12 @@
 """Data descriptors that provide special behaviors when attributes are
 accessed."""
+import threading
+from contextlib import contextmanager
 from enum import auto
 from enum import Enum
 
 from .exceptions import MarshallerBaseException
+from .registry import ModelRegistry
 
 
 class MarshallingAttributeAccessError(MarshallerBaseException):
@@ -23,6 +26,50 @@ class Placeholders(Enum):
     MARSHALL = auto()  #: MARSHALL accessor holder.
     CALLBACK = auto()  #: CALLBACK accessor holder.
     DEFAULT = auto()  #: DEFAULT accessor holder.
+    LAZY = auto()  #: LAZY accessor holder for nested data not yet deserialized.
+    SERIALIZE = auto()  #: SERIALIZE accessor holder for models not yet serialized.
+
+
+_lazy = threading.local()
+
+
+@contextmanager
+def lazy_deserialization():
+    """Within this context, nested data (dictionaries or lists of
+    dictionaries) set to a relationship is kept as is and deserialized to
+    models the first time the relationship is accessed. Nested data within
+    lazily deserialized models is deserialized lazily as well.
+
+    .. code-block:: python
+
+        with lazy_deserialization():
+            plans = session.Plan.last(100)
+
+        # only the operations of the first plan are deserialized
+        plans[0].operations
+    """
+    previous = getattr(_lazy, "enabled", False)
+    _lazy.enabled = True
+    try:
+        yield
+    finally:
+        _lazy.enabled = previous
+
+
+def serialize_deferred(obj):
+    """Serialize the relationships of the object whose serialization was
+    deferred by :class:`RelationshipAccessor`."""
+    deferred = obj.__dict__.get(ModelRegistry._deferred_key, None)
+    if not deferred:
+        return
+    data = getattr(obj, ModelRegistry._data_key)
+    deserialized = getattr(obj, ModelRegistry._deserialized_key)
+    fields = obj.__class__.model_schema.fields
+    # clear before serializing as related models may refer back to the object
+    names = list(deferred)
+    deferred.clear()
+    for name in names:
+        data[name] = fields[name].serialize(obj, deserialized[name])
 
 
 class DataAccessor:
@@ -210,10 +257,61 @@ class CallbackAccessor(MarshallingAccessor):
 
 class RelationshipAccessor(CallbackAccessor):
     """The descriptor for a :class:`pydent.marshaller.fields.Relationship`
-    field."""
+    field.
+
+    Nested data set within :func:`lazy_deserialization` is deserialized on
+    first access. Models set to the relationship are serialized the next
+    time the data of the owner is requested (see :func:`serialize_deferred`).
+    """
+
+    @staticmethod
+    def _is_nested_data(val):
+        if isinstance(val, dict):
+            return True
+        return isinstance(val, list) and val and isinstance(val[0], dict)
+
+    def __get__(self, obj, objtype):
+        val = self.get_val(obj)
+        if val is Placeholders.LAZY:
+            data = getattr(obj, self.accessor)[self.name]
+            with lazy_deserialization():
+                val = self.field.deserialize(obj, data)
+            getattr(obj, self.deserialized_accessor)[self.name] = val
+        elif val is self.HOLDER:
+            val = self.field.fullfill(obj)
+        return val
+
+    def _is_deserialized(self, val):
+        model = ModelRegistry.models.get(self.field.nested, None)
+        if model is None:
+            return False
+        if self.field.many:
+            return isinstance(val, list) and all(isinstance(v, model) for v in val)
+        return isinstance(val, model)
+
+    def _discard_deferred(self, obj):
+        deferred = obj.__dict__.get(ModelRegistry._deferred_key, None)
+        if deferred:
+            deferred.discard(self.name)
 
     def __set__(self, obj, val):
+        if self._is_deserialized(val):
+            # models are serialized the next time the data is requested
+            deserialized = self.field.deserialize(obj, val)
+            getattr(obj, self.deserialized_accessor)[self.name] = deserialized
+            getattr(obj, self.accessor)[self.name] = Placeholders.SERIALIZE
+            obj.__dict__.setdefault(ModelRegistry._deferred_key, set()).add(self.name)
+            return
+        self._discard_deferred(obj)
+        if getattr(_lazy, "enabled", False) and self._is_nested_data(val):
+            getattr(obj, self.deserialized_accessor)[self.name] = Placeholders.LAZY
+            getattr(obj, self.accessor)[self.name] = val
+            return
         deserialized = self.field.deserialize(obj, val)
         serialized = self.field.serialize(obj, deserialized)
         getattr(obj, self.deserialized_accessor)[self.name] = deserialized
         getattr(obj, self.accessor)[self.name] = serialized
+
+    def __delete__(self, obj):
+        self._discard_deferred(obj)
+        super().__delete__(obj)
@@ -83,6 +83,9 @@ class ModelRegistry(type):
     _deserialized_key = (
         "__deserialized_data"  # the attribute key used to store serialized data
     )
+    _deferred_key = (
+        "__deferred_serialization"  # the attribute key used to store deferred names
+    )
     BASE = "SchemaModel"
 
     def __init__(cls, name, bases, selfdict):
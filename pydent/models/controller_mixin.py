@@ -26,5 +26,5 @@ class ControllerMixin:
         else:
             url = "{}/{}".format(table, controller_method)
 
-        result = self.aqhttp.request("post", url, json=data, params=params)
+        result = self.session._aqhttp.post(url, json_data=data, params=params)
         return result
@@ -1,6 +1,10 @@
 """The create, read, update, destroy (CRUD) mixins used for some models."""
+from copy import deepcopy
+
 from retry import retry
 
+from pydent.marshaller.fields import Callback
+
 
 class CreateMixin:
     def create(self):
@@ -85,3 +89,49 @@ class JSONDeleteMixin:
 
     def _get_delete_json(self):
         return self.dump()
+
+
+class DirtyMixin:
+    """Tracks whether the data of a model has changed since the last call to
+    :meth:`mark_clean`.
+
+    Only plain data is compared. Relationships (e.g. `operation.field_values`)
+    are not part of the comparison. Changes to them can be recorded using
+    :meth:`mark_dirty`.
+    """
+
+    def _get_dirty_data(self):
+        return {
+            k: v
+            for k, v in self._get_data().items()
+            if not issubclass(type(self.fields.get(k, None)), Callback)
+        }
+
+    def mark_clean(self):
+        """Record the current data of the model as its clean state."""
+        self._clean_data = deepcopy(self._get_dirty_data())
+        self._clean_num_changes = self.num_changes
+
+    def mark_dirty(self):
+        """Record a change to the model that is not part of its data, such as a
+        change to one of its relationships."""
+        self._num_changes = self.num_changes + 1
+
+    @property
+    def num_changes(self) -> int:
+        """The number of calls to :meth:`mark_dirty`."""
+        return getattr(self, "_num_changes", 0)
+
+    def is_tracked(self):
+        """Return whether :meth:`mark_clean` has been called for this model."""
+        return getattr(self, "_clean_data", None) is not None
+
+    def is_dirty(self):
+        """Return whether the data of the model has changed since the last call
+        to :meth:`mark_clean`. Models that have never been marked clean are
+        always dirty."""
+        if not self.is_tracked():
+            return True
+        if self._clean_num_changes != self.num_changes:
+            return True
+        return self._clean_data != self._get_dirty_data()
@@ -7,12 +7,12 @@ from typing import Union
 import requests
 
 from pydent.base import ModelBase
+from pydent.download_manager import DownloadManager
 from pydent.marshaller import add_schema
 from pydent.models.crud_mixin import JSONDeleteMixin
 from pydent.models.crud_mixin import JSONSaveMixin
 from pydent.relationships import HasOne
 from pydent.relationships import JSON
-from pydent.utils import make_async
 
 
 # TODO: changing the value of a association (and saving it) shouldn't be difficult
@@ -280,9 +280,9 @@ class Upload(ModelBase):
         return response.raw
 
     @staticmethod
-    @make_async(1)
     def async_download(uploads, outdir=None, overwrite=True):
-        """Asynchronously downloads from list of :class:`Upload` models.
+        """Concurrently downloads from list of :class:`Upload` models using a
+        :class:`DownloadManager <pydent.download_manager.DownloadManager>`.
 
         :param uploads: list of Uploads
         :type uploads: list
@@ -293,7 +293,10 @@ class Upload(ModelBase):
         :return: list of filepaths
         :rtype: list
         """
-        return Upload._download_files(uploads, outdir, overwrite)
+        if not uploads:
+            return []
+        manager = DownloadManager(uploads[0].session)
+        return manager.download(uploads, outdir=outdir, overwrite=overwrite)
 
     @staticmethod
     def _download_files(uploads, outdir, overwrite):
@@ -6,6 +6,7 @@ from pydent.base import ModelBase
 from pydent.exceptions import AquariumModelError
 from pydent.exceptions import TridentDepreciationWarning
 from pydent.marshaller import add_schema
+from pydent.models.crud_mixin import DirtyMixin
 from pydent.models.crud_mixin import JSONDeleteMixin
 from pydent.models.crud_mixin import JSONSaveMixin
 from pydent.models.field_value_mixins import FieldMixin
@@ -177,7 +178,7 @@ class FieldType(FieldMixin, ModelBase):
 
 
 @add_schema
-class FieldValue(FieldMixin, JSONSaveMixin, JSONDeleteMixin, ModelBase):
+class FieldValue(FieldMixin, JSONSaveMixin, JSONDeleteMixin, DirtyMixin, ModelBase):
     """A FieldValue model. One of the more complex models.
 
     .. versionchanged:: 0.1.2     FieldValues no longer
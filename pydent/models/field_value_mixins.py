@@ -115,8 +115,13 @@ class FieldValueInterface:
             self.field_values = []
 
         self.field_values.append(fv)
+        self._field_values_changed()
         return fv
 
+    def _field_values_changed(self):
+        """Called after a field value is added to or removed from the
+        `field_values` list."""
+
     def safe_get_field_type(self, fv):
         """Safely returns the field value's :class:`pydent.models.FieldType`
         from the model.
@@ -313,6 +318,8 @@ class FieldValueInterface:
                 self.new_field_value(name, role, val)
         for fv in to_be_removed:
             self.field_values.remove(fv)
+        if to_be_removed:
+            self._field_values_changed()
         return self
 
     def get_routing(self):
@@ -21,6 +21,7 @@ from pydent.relationships import HasManyGeneric
 from pydent.relationships import HasManyThrough
 from pydent.relationships import HasOne
 from pydent.relationships import Raw
+from pydent.utils.async_requests import asyncfunc
 from pydent.utils.matrix_mapper import IndexType
 from pydent.utils.matrix_mapper import MatrixMapping
 from pydent.utils.matrix_mapper import MatrixMappingFactory
@@ -154,8 +155,7 @@ class Item(DataAssociatorMixin, ItemLocationMixin, ModelBase):
 
     def create(self):
         with DataAssociationSaveContext(self):
-            result = self.session.utils.create_items([self])
-            self.reload(result[0]["item"])
+            self.session.utils.create_items([self], load=True)
         return self
 
     @property
@@ -244,6 +244,229 @@ class PartAssociation(JSONSaveMixin, ModelBase):
         return False
 
 
+class CollectionWriteBuffer:
+    """Records sample assignments and data associations of a saved collection
+    and writes them to the server in batches when the context exits.
+
+    Sample assignments are grouped into a single request per sample id. Data
+    associations of the parts are loaded in a single query and only the
+    associations that change are saved, concurrently. Data associations of
+    locations whose sample is assigned in the same buffer are saved after
+    the parts are created. Use :meth:`Collection.write_buffer` to create a
+    buffer.
+    """
+
+    def __init__(self, collection: "Collection", dry_run=False, max_workers=4):
+        """Initializes a write buffer.
+
+        :param collection: the saved collection
+        :param dry_run: if True, nothing is written when the context exits
+        :param max_workers: maximum number of concurrent requests
+        """
+        self.collection = collection
+        self.dry_run = dry_run
+        self.max_workers = max_workers
+        self.num_requests = 0
+        self.num_unbuffered_requests = 0
+        self._clear()
+
+    def _clear(self):
+        self.samples = {}
+        self.data = {}
+        self.pending_data = {}
+        self._num_sample_calls = 0
+        self._data_calls = {}
+        self._pending_calls = {}
+        self._unloaded_parts = set()
+        self._loaded = False
+
+    def __enter__(self):
+        if not self.collection.id:
+            raise ValueError(
+                "Cannot buffer writes to the Collection since it is not saved."
+            )
+        self.collection._write_buffer = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.collection._write_buffer = None
+        if exc_type or self.dry_run:
+            return
+        self.flush()
+
+    @property
+    def requests_saved(self) -> int:
+        """An estimate of the number of requests saved compared to writing each
+        edit separately.
+
+        The unbuffered count assumes every sample assignment is followed by a
+        refresh and every new data association needs a lazy load of the
+        part's associations, which may differ from the actual requests.
+        """
+        return self.num_unbuffered_requests - self.num_requests
+
+    def assign_sample(self, sample_id: int, pairs: List[Tuple[int, int]]):
+        for r, c in pairs:
+            self.samples[(r, c)] = sample_id
+        self._num_sample_calls += 1
+
+    def remove_sample(self, pairs: List[Tuple[int, int]]):
+        self.assign_sample(None, pairs)
+
+    def is_assigned(self, r: int, c: int) -> bool:
+        """Return whether a sample is assigned to (r, c) in this buffer."""
+        return self.samples.get((r, c), None) is not None
+
+    def associate_pending(self, r: int, c: int, key: str, value: Any):
+        """Record a data association for a location whose part does not exist
+        yet because its sample is assigned in this buffer."""
+        self.pending_data[(r, c, key)] = value
+        self._pending_calls.setdefault((r, c, key), 0)
+        self._pending_calls[(r, c, key)] += 1
+
+    def associate(self, r: int, c: int, part: "Item", key: str, value: Any):
+        if not part.is_deserialized("data_associations"):
+            self._unloaded_parts.add(part.rid)
+        self.data[(part.rid, key)] = (r, c, part, key, value)
+        self._data_calls.setdefault((part.rid, key), 0)
+        self._data_calls[(part.rid, key)] += 1
+
+    def _sample_changes(self) -> List[Tuple[int, int, Any, Any]]:
+        matrix = self.collection.sample_id_matrix
+        changes = []
+        for (r, c), sample_id in self.samples.items():
+            old = matrix[r, c]
+            if old != sample_id:
+                changes.append((r, c, old, sample_id))
+        return changes
+
+    def _data_changes(self) -> List[tuple]:
+        unloaded = {
+            v[2].rid: v[2]
+            for v in self.data.values()
+            if not v[2].is_deserialized("data_associations")
+        }
+        if unloaded:
+            self.collection.session.browser.retrieve(
+                list(unloaded.values()), "data_associations"
+            )
+            self._loaded = True
+        changes = []
+        for r, c, part, key, value in self.data.values():
+            association = part.get_data_association(key)
+            old = None if association is None else association.value
+            if association is None or old != value:
+                changes.append((r, c, part, key, association, old, value))
+        for (r, c, key), value in self.pending_data.items():
+            changes.append((r, c, None, key, None, None, value))
+        return changes
+
+    def _plan(self):
+        sample_changes = self._sample_changes()
+        data_changes = self._data_changes()
+
+        groups = {}
+        for r, c, _, sample_id in sample_changes:
+            groups.setdefault(sample_id, []).append([r, c])
+
+        self.num_requests = (
+            len(groups)
+            + int(bool(groups))
+            + int(self._loaded)
+            + int(bool(self.pending_data))
+            + len(data_changes)
+        )
+        # each assign_sample and remove_sample requires a request and a refresh,
+        # each data association is loaded lazily and created using two requests
+        num_unbuffered = 2 * self._num_sample_calls + len(self._unloaded_parts)
+        for (rid, key), num_calls in self._data_calls.items():
+            part = self.data[(rid, key)][2]
+            if part.get_data_association(key) is None:
+                num_calls += 1
+            num_unbuffered += num_calls
+        num_unbuffered += len({(r, c) for r, c, _ in self._pending_calls})
+        for num_calls in self._pending_calls.values():
+            num_unbuffered += num_calls + 1
+        self.num_unbuffered_requests = num_unbuffered
+        return sample_changes, groups, data_changes
+
+    @staticmethod
+    def _diff(sample_changes, data_changes) -> List[Dict[str, Any]]:
+        diff = []
+        for r, c, old, new in sample_changes:
+            diff.append(dict(row=r, column=c, key="sample_id", old=old, new=new))
+        for r, c, _, key, _, old, new in data_changes:
+            diff.append(dict(row=r, column=c, key=key, old=old, new=new))
+        return diff
+
+    def diff(self) -> List[Dict[str, Any]]:
+        """Return the changes that would be written to the server. Each change
+        is a dictionary with the 'row', 'column', changed 'key' ('sample_id' or
+        the data association key) and the 'old' and 'new' values.
+
+        Sample assignments are compared to the cached sample id matrix. The
+        data associations of parts that have not loaded them are retrieved
+        with a single request (also for dry runs), so that the old values can
+        be compared. They are kept on the parts, so a later :meth:`flush` does
+        not request them again.
+
+        :return: list of changes
+        """
+        sample_changes, _, data_changes = self._plan()
+        return self._diff(sample_changes, data_changes)
+
+    def flush(self):
+        """Write the recorded edits to the server.
+
+        :return: the list of changes written
+        """
+        sample_changes, groups, data_changes = self._plan()
+        diff = self._diff(sample_changes, data_changes)
+        collection = self.collection
+        table = collection.get_tableized_name()
+
+        def sample_request(sample_id, pairs):
+            if sample_id is None:
+                method, data = "delete_selection", {"pairs": pairs}
+            else:
+                method, data = "assign_sample", {"sample_id": sample_id, "pairs": pairs}
+            collection.controller_method(method, table, collection.id, data=data)
+
+        asyncfunc(
+            sample_request,
+            list(groups.items()),
+            progress_bar=False,
+            max_workers=self.max_workers,
+        )
+        collection.session.utils.save_data_associations(
+            [
+                (part, key, value)
+                for _, _, part, key, _, _, value in data_changes
+                if part is not None
+            ],
+            max_workers=self.max_workers,
+        )
+        if groups:
+            collection._reset_mapping()
+            collection.refresh()
+        if self.pending_data:
+            part_matrix = collection.part_matrix
+            model_key_values = []
+            for (r, c, key), value in self.pending_data.items():
+                part = part_matrix[r, c]
+                if part is None:
+                    raise ValueError(
+                        "Cannot set data to ({r},{c}) because the Sample "
+                        "assigned to that location was not created".format(r=r, c=c)
+                    )
+                model_key_values.append((part, key, value))
+            collection.session.utils.save_data_associations(
+                model_key_values, max_workers=self.max_workers
+            )
+        self._clear()
+        return diff
+
+
 @add_schema
 class Collection(
     ItemLocationMixin, DataAssociatorMixin, SaveMixin, ControllerMixin, ModelBase
@@ -416,7 +639,7 @@ class Collection(
     def _get_data_association(assoc):
         if assoc is not None:
             if assoc.part:
-                if assoc.data_associations:
+                if assoc.part.data_associations:
                     return {a.key: a for a in assoc.part.data_associations}
                 else:
                     return {}
@@ -452,6 +675,11 @@ class Collection(
             )
             association.part = part
             self.append_to_many("part_associations", association)
+            data[r][c] = association
+            cache = getattr(self, "_mapping_cache", None)
+            if cache is not None and cache[-1].data is data:
+                # the cached views already include the new association
+                self._mapping_cache = self._mapping_key() + (cache[-1],)
         if isinstance(sample, int):
             part.sample_id = sample
             part.reset_field("sample")
@@ -475,16 +703,51 @@ class Collection(
         if data[r][c]:
             part = data[r][c].part
 
+        buffer = getattr(self, "_write_buffer", None)
+        if not part and buffer is not None and buffer.is_assigned(r, c):
+            for k, v in data_dict.items():
+                buffer.associate_pending(r, c, k, v)
+            return
         if not part:
             raise ValueError(
                 "Cannot set data to ({r},{c}) because "
                 "there is no Sample assigned to that location".format(r=r, c=c)
             )
         for k, v in data_dict.items():
-            part.associate(k, v)
+            if buffer is not None and part.id:
+                buffer.associate(r, c, part, k, v)
+            else:
+                part.associate(k, v)
+
+    def _mapping_key(self):
+        part_associations = self.part_associations
+        return (
+            part_associations,
+            (len(part_associations or []), tuple(self.dimensions)),
+        )
+
+    def _reset_mapping(self):
+        """Clear the cached matrix views of this collection."""
+        self._mapping_cache = None
 
     @property
     def _mapping(self):
+        """The matrix views of this collection.
+
+        The views are cached until :meth:`_reset_mapping` is called or the
+        part associations of the collection are replaced or resized.
+        """
+        part_associations, key = self._mapping_key()
+        cache = getattr(self, "_mapping_cache", None)
+        if cache is not None:
+            cached_part_associations, cached_key, factory = cache
+            if cached_part_associations is part_associations and cached_key == key:
+                return factory
+        factory = self._new_mapping()
+        self._mapping_cache = (part_associations, key, factory)
+        return factory
+
+    def _new_mapping(self):
         factory = MatrixMappingFactory(self.__part_association_matrix())
         default_setter = self._no_setter
         factory.new("part_association", setter=default_setter, getter=None)
@@ -616,8 +879,36 @@ class Collection(
             association.part.save()
             association.part_id = association.part.id
             association.save()
+        self._reset_mapping()
         self.refresh()
 
+    def write_buffer(self, dry_run=False, max_workers=4) -> CollectionWriteBuffer:
+        """Return a context manager that records calls to :meth:`assign_sample`,
+        :meth:`remove_sample`, :meth:`associate_to` and assignments to the
+        `data_matrix`, and writes them to the server in batches when the
+        context exits.
+
+        .. code-block:: python
+
+            with collection.write_buffer() as buffer:
+                collection.assign_sample(1, [(0, 0), (0, 1)])
+                collection.data_matrix[0, :] = {"concentration": 10}
+            print(buffer.requests_saved)
+
+            # show the changes without writing to the server
+            with collection.write_buffer(dry_run=True) as buffer:
+                collection.remove_sample([(0, 0)])
+            print(buffer.diff())
+
+        :param dry_run: if True, nothing is written when the context exits.
+            Note that :meth:`CollectionWriteBuffer.diff` still sends a request
+            to load the data associations of the edited parts, if they were
+            not loaded.
+        :param max_workers: maximum number of concurrent requests
+        :return: the write buffer
+        """
+        return CollectionWriteBuffer(self, dry_run=dry_run, max_workers=max_workers)
+
     def assign_sample(self, sample_id: int, pairs: List[Tuple[int, int]]):
         """Assign sample id to the (row, column) pairs for the collection.
 
@@ -625,12 +916,17 @@ class Collection(
         :param pairs: list of (row, column) tuples
         :return: self
         """
+        buffer = getattr(self, "_write_buffer", None)
+        if buffer is not None:
+            buffer.assign_sample(sample_id, pairs)
+            return self
         self.controller_method(
             "assign_sample",
             self.get_tableized_name(),
             self.id,
             data={"sample_id": sample_id, "pairs": pairs},
         )
+        self._reset_mapping()
         self.refresh()
         return self
 
@@ -641,12 +937,17 @@ class Collection(
         :param pairs: list of (row, column) tuples
         :return: self
         """
+        buffer = getattr(self, "_write_buffer", None)
+        if buffer is not None:
+            buffer.remove_sample(pairs)
+            return self
         self.controller_method(
             "delete_selection",
             self.get_tableized_name(),
             self.id,
             data={"pairs": pairs},
         )
+        self._reset_mapping()
         self.refresh()
         return self
 
@@ -1,5 +1,6 @@
 """Models related to jobs, or operation execution."""
 from pydent.base import ModelBase
+from pydent.download_manager import DownloadManager
 from pydent.marshaller import add_schema
 from pydent.relationships import HasMany
 from pydent.relationships import HasManyThrough
@@ -27,6 +28,21 @@ class Job(ModelBase):
         http = self.session._aqhttp
         return http.get("krill/uploads?job={}".format(self.id))["uploads"]
 
+    def download_files(self, outdir=None, overwrite=True, **kwargs):
+        """Downloads all uploads of the job concurrently using a
+        :class:`DownloadManager <pydent.download_manager.DownloadManager>`.
+
+        :param outdir: output directory for downloaded files
+        :param overwrite: whether to overwrite files if they exist
+        :param kwargs: additional arguments for the download manager
+            (e.g. `max_workers` or `chunk_size`)
+        :return: list of filepaths
+        """
+        uploads = [self.session.Upload.load(data) for data in self.uploads]
+        return DownloadManager(self.session, **kwargs).download(
+            uploads, outdir=outdir, overwrite=overwrite
+        )
+
     @property
     def start_time(self):
         return self.state[0]["time"]
@@ -2,6 +2,7 @@
 from pydent.base import ModelBase
 from pydent.exceptions import AquariumModelError
 from pydent.marshaller import add_schema
+from pydent.models.crud_mixin import DirtyMixin
 from pydent.models.crud_mixin import SaveMixin
 from pydent.models.data_associations import DataAssociatorMixin
 from pydent.models.field_value_mixins import FieldTypeInterface
@@ -17,7 +18,7 @@ from pydent.utils import filter_list
 
 
 @add_schema
-class Operation(FieldValueInterface, DataAssociatorMixin, ModelBase):
+class Operation(FieldValueInterface, DataAssociatorMixin, DirtyMixin, ModelBase):
     """A Operation model."""
 
     fields = dict(
@@ -94,6 +95,9 @@ class Operation(FieldValueInterface, DataAssociatorMixin, ModelBase):
                 self.new_field_value_from_field_type(field_type)
         return self
 
+    def _field_values_changed(self):
+        self.mark_dirty()
+
     def field_value_array(self, name, role):
         """Returns :class:`FieldValue` array with name and role."""
         return filter_list(self.get_field_value_array(name, role))
@@ -3,12 +3,13 @@ import json
 from warnings import warn
 
 from pydent.base import ModelBase
+from pydent.download_manager import DownloadManager
 from pydent.exceptions import AquariumModelError
 from pydent.marshaller import add_schema
 from pydent.models.crud_mixin import DeleteMixin
+from pydent.models.crud_mixin import DirtyMixin
 from pydent.models.crud_mixin import SaveMixin
 from pydent.models.data_associations import DataAssociatorMixin
-from pydent.models.data_associations import Upload
 from pydent.models.field_value import FieldValue
 from pydent.relationships import HasMany
 from pydent.relationships import HasManyGeneric
@@ -20,7 +21,7 @@ from pydent.relationships import Raw
 
 
 @add_schema
-class Plan(DataAssociatorMixin, SaveMixin, DeleteMixin, ModelBase):
+class Plan(DataAssociatorMixin, SaveMixin, DeleteMixin, DirtyMixin, ModelBase):
     """A Plan model."""
 
     fields = dict(
@@ -187,12 +188,29 @@ class Plan(DataAssociatorMixin, SaveMixin, DeleteMixin, ModelBase):
         return result
 
     def all_data_associations(self):
-        das = self.data_associations
-        for operation in self.operations:
-            das += operation.data_associations
-            for field_value in operation.field_values:
+        """Return the data associations of the plan, its operations and the
+        items of its field values. Field values, items and data associations
+        are retrieved using a fixed number of queries.
+
+        :return: list of data associations
+        """
+        browser = self.session.browser
+        operations = self.operations or []
+        field_values = browser.retrieve(operations, "field_values")
+        browser.retrieve(
+            [fv for fv in field_values if fv.child_item_id is not None], "item"
+        )
+        items = [
+            fv.item for op in operations for fv in op.field_values or [] if fv.item
+        ]
+        browser.retrieve_data_associations([self] + operations + items)
+
+        das = list(self.data_associations or [])
+        for operation in operations:
+            das += operation.data_associations or []
+            for field_value in operation.field_values or []:
                 if field_value.item:
-                    das += field_value.item.data_associations
+                    das += field_value.item.data_associations or []
         return das
 
     @classmethod
@@ -209,32 +227,116 @@ class Plan(DataAssociatorMixin, SaveMixin, DeleteMixin, ModelBase):
 
         return model_interface
 
-    def validate(self, raise_error=True):
+    @staticmethod
+    def _operation_state(op):
+        """Return the field values of the operation along with what is needed
+        to detect changes to them."""
+        field_values = op.field_values
+        return (
+            field_values,
+            len(field_values or []),
+            op.num_changes,
+            frozenset(fv._primary_key for fv in field_values or []),
+        )
+
+    @staticmethod
+    def _operation_unchanged(op, state):
+        field_values, num_field_values, num_changes, _ = state
+        return (
+            op.num_changes == num_changes
+            and op.field_values is field_values
+            and len(field_values or []) == num_field_values
+        )
+
+    def _field_value_keys(self, incremental=False):
+        """Return the field value primary keys of the plan by operation rid,
+        the set of all field value primary keys and the keys of the wires that
+        no longer need to be validated.
+
+        If incremental is True, only the operations that changed since the
+        last successful validation are walked.
+        """
+        last = getattr(self, "_last_validated", None)
+        if not incremental or last is None:
+            states = {op.rid: self._operation_state(op) for op in self.operations or []}
+            fv_keys = set()
+            for state in states.values():
+                fv_keys.update(state[-1])
+            return states, fv_keys, set()
+
+        last_states, fv_keys, validated_wires = last
+        states = {}
+        added = set()
+        removed = set()
+        for op in self.operations or []:
+            state = last_states.get(op.rid, None)
+            if state is None or not self._operation_unchanged(op, state):
+                new_state = self._operation_state(op)
+                if state is not None:
+                    removed.update(state[-1] - new_state[-1])
+                added.update(new_state[-1])
+                state = new_state
+            states[op.rid] = state
+        for rid in last_states.keys() - states.keys():
+            removed.update(last_states[rid][-1])
+        removed.difference_update(added)
+        if removed:
+            fv_keys.difference_update(removed)
+            validated_wires = set()
+        fv_keys.update(added)
+        return states, fv_keys, validated_wires
+
+    def validate(self, raise_error=True, incremental=False):
         """Validates the plan.
 
+        If incremental is True, only the operations that changed since the
+        last successful validation are walked, and the wires validated then
+        are skipped unless a FieldValue has since been removed from the plan.
+        Operations are changed if their `field_values` list is replaced or
+        resized, or if they are marked dirty (as done by the methods of
+        :class:`Operation` that add or remove field values). Field values
+        assigned a new primary key (as happens after the plan is saved) are
+        found by a full validation before an error is reported. Field values
+        replaced in place (e.g. `op.field_values[0] = fv`) are not detected
+        unless the operation is marked dirty, so incremental validation is
+        meant for repeated interactive checks. Saving the plan always runs a
+        full validation.
+
         :param raise_error: If True, raises an AquariumModelException. If false,
             returns the error messages.
         :type raise_error: boolean
+        :param incremental: If True, only validate the operations and wires
+            that have changed since the last successful validation.
+        :type incremental: boolean
         :return: list of error messages
         :rtype: array
         """
         errors = []
 
-        field_values = []
-        for op in self.operations:
-            for fv in op.field_values:
-                field_values.append(fv)
-        fv_keys = [fv._primary_key for fv in field_values]
-        for wire in self.wires:
-            for _fvtype in ["source", "destination"]:
-                field_value = getattr(wire, _fvtype)
-                if field_value._primary_key not in fv_keys:
+        states, fv_keys, validated_wires = self._field_value_keys(incremental)
+
+        wire_keys = set()
+        for wire in self.wires or []:
+            wire_key = (wire.source._primary_key, wire.destination._primary_key)
+            wire_keys.add(wire_key)
+            if wire_key in validated_wires:
+                continue
+            for _fvtype, fv_key in zip(["source", "destination"], wire_key):
+                if fv_key not in fv_keys:
+                    if incremental:
+                        # the cached field value keys may be stale
+                        self._last_validated = None
+                        return self.validate(raise_error=raise_error)
                     msg = (
                         "The FieldValue of a wire Wire(rid={}).{} is missing from the "
                         "list of FieldValues in the plan. Did you forget to add an "
                         "operation to the plan?".format(wire._primary_key, _fvtype)
                     )
                     errors.append(msg)
+        if errors:
+            self._last_validated = None
+        else:
+            self._last_validated = (states, fv_keys, wire_keys)
         if raise_error and errors:
             msg = "\n".join(
                 ["(ErrNo {}) - {}".format(i, e) for i, e in enumerate(errors)]
@@ -259,9 +361,6 @@ class Plan(DataAssociatorMixin, SaveMixin, DeleteMixin, ModelBase):
 
         self.validate(raise_error=True)
 
-        for op in self.operations:
-            op.field_values
-
         json_data = self.dump(
             include={"operations": {"field_values": ["sample", "item"]}}
         )
@@ -270,24 +369,23 @@ class Plan(DataAssociatorMixin, SaveMixin, DeleteMixin, ModelBase):
         wire_dict = {}
         for wire in self.wires:
             wire_data = wire.to_save_json()
-            attributes = [
+            wire_hash = (
                 wire_data["from_id"],
                 wire_data["from"]["rid"],
                 wire_data["to_id"],
                 wire_data["to"]["rid"],
-            ]
-            wire_hash = "*&".join([str(a) for a in attributes])
+            )
             wire_dict[wire_hash] = wire_data
         json_data["wires"] = list(wire_dict.values())
 
         # validate
-        fv_rids = []
+        fv_rids = set()
         fv_id_to_rids = {}
         for op in json_data["operations"]:
             for fv in op["field_values"]:
                 if fv["id"]:
                     fv_id_to_rids[fv["id"]] = fv["rid"]
-                fv_rids.append(fv["rid"])
+                fv_rids.add(fv["rid"])
 
         # fix json rids and ids
         warnings = []
@@ -327,6 +425,89 @@ class Plan(DataAssociatorMixin, SaveMixin, DeleteMixin, ModelBase):
     def _get_update_params(self):
         return {"user_id": self.session.current_user.id}
 
+    @staticmethod
+    def _wire_key(wire):
+        return wire.source.id, wire.destination.id
+
+    def mark_clean(self):
+        """Record the current state of the plan, its operations, field values
+        and wires as clean. Changes made afterwards are returned by
+        :meth:`get_changes`.
+
+        :return: None
+        """
+        super().mark_clean()
+        operation_ids = set()
+        field_value_ids = set()
+        for op in self.operations or []:
+            op.mark_clean()
+            operation_ids.add(op.id)
+            for fv in op.field_values or []:
+                fv.mark_clean()
+                field_value_ids.add(fv.id)
+        wires = {}
+        for wire in self.wires or []:
+            wire.mark_clean()
+            wires.setdefault(self._wire_key(wire), wire)
+        self._clean_structure = (operation_ids, field_value_ids, wires)
+
+    def get_changes(self):
+        """Return the changes made to the plan since the last call to
+        :meth:`mark_clean`.
+
+        Returns None if the changes cannot be saved without a full save of the
+        plan. This is the case if the plan was never marked clean, if the data of
+        the plan or of any of its operations changed, or if operations or field
+        values were added or removed.
+
+        :return: dictionary of the changed 'field_values', the new or changed
+            'wires' and the 'removed_wires', or None
+        :rtype: dict | None
+        """
+        structure = getattr(self, "_clean_structure", None)
+        if structure is None or self.is_dirty():
+            return None
+        clean_operation_ids, clean_field_value_ids, clean_wires = structure
+
+        operation_ids = set()
+        field_value_ids = set()
+        field_values = []
+        for op in self.operations or []:
+            if op.id is None or op.is_dirty():
+                return None
+            operation_ids.add(op.id)
+            for fv in op.field_values or []:
+                if fv.id is None:
+                    return None
+                field_value_ids.add(fv.id)
+                if fv.is_dirty():
+                    field_values.append(fv)
+        if (
+            operation_ids != clean_operation_ids
+            or field_value_ids != clean_field_value_ids
+        ):
+            return None
+
+        wires = {}
+        for wire in self.wires or []:
+            wire_key = self._wire_key(wire)
+            if None in wire_key:
+                return None
+            wires.setdefault(wire_key, wire)
+        changed_wires = [
+            wire
+            for wire_key, wire in wires.items()
+            if wire_key not in clean_wires or wire.is_dirty()
+        ]
+        removed_wires = [
+            wire for wire_key, wire in clean_wires.items() if wire_key not in wires
+        ]
+        return {
+            "field_values": field_values,
+            "wires": changed_wires,
+            "removed_wires": removed_wires,
+        }
+
     def estimate_cost(self):
         """Estimates the cost of the plan on the Aquarium server. This is
         necessary before plan submission.
@@ -358,19 +539,26 @@ class Plan(DataAssociatorMixin, SaveMixin, DeleteMixin, ModelBase):
         """
         return self.session.utils.replan(self.id)
 
-    def download_files(self, outdir=None, overwrite=True):
+    def download_files(self, outdir=None, overwrite=True, **kwargs):
         """Downloads all uploads associated with the plan. Downloads happen
-        ansynchrounously.
+        concurrently using a
+        :class:`DownloadManager <pydent.download_manager.DownloadManager>`.
 
         :param outdir: output directory for downloaded files
         :param overwrite: whether to overwrite files if they exist
-        :return: None
+        :param kwargs: additional arguments for the download manager
+            (e.g. `max_workers` or `chunk_size`)
+        :return: list of filepaths
         """
-        uploads = []
-        for da in self.data_associations:
-            if da.upload is not None:
-                uploads.append(da.upload)
-        return Upload.async_download(uploads, outdir, overwrite)
+        data_associations = self.data_associations or []
+        self.session.browser.retrieve(
+            [da for da in data_associations if getattr(da, "upload_id", None)],
+            "upload",
+        )
+        uploads = [da.upload for da in data_associations if da.upload is not None]
+        return DownloadManager(self.session, **kwargs).download(
+            uploads, outdir=outdir, overwrite=overwrite
+        )
 
 
 @add_schema
@@ -384,7 +572,7 @@ class PlanAssociation(ModelBase):
 
 
 @add_schema
-class Wire(DeleteMixin, ModelBase):
+class Wire(DeleteMixin, DirtyMixin, ModelBase):
     """A Wire model."""
 
     fields = {
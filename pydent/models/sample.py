@@ -3,7 +3,6 @@ import json
 from collections.abc import Sequence
 from typing import List
 from typing import Tuple
-from warnings import warn
 
 from pydent.base import ModelBase
 from pydent.exceptions import AquariumModelError
@@ -178,32 +177,14 @@ class Sample(FieldValueInterface, ModelBase):
             self.create()
 
     def update(self) -> "Sample":
-        """Updates the sample on the server.
+        """Updates the sample on the server. To update many samples, use
+        :meth:`~pydent.interfaces.UtilityInterface.update_samples`.
 
         .. versionchanged:: 0.1.5a17
             Raises `AquariumModelError` if sample is missing required properties
         :return:
         """
-        self.is_savable(do_raise=True)
-        for fv in self.field_values:
-            fv.reload(fv.save())
-
-        new_fvs = self.field_values
-        server_fvs = self.session.FieldValue.where(
-            dict(parent_id=self.id, parent_class="Sample")
-        )
-
-        to_remove = [
-            fv for fv in server_fvs if fv.id not in [_fv.id for _fv in new_fvs]
-        ]
-        if to_remove:
-            warn(
-                "Trident tried to save a Sample, but it required FieldValues to be deleted."
-            )
-            for fv in to_remove:
-                fv.parent_id = None
-                fv.save()
-        self.reload(self.session.utils.json_save("Sample", self.dump()))
+        self.session.utils.update_samples([self])
         return self
 
     def merge(self):
@@ -211,26 +192,12 @@ class Sample(FieldValueInterface, ModelBase):
         sample_type_id is found on the server, update that model and save the
         updated data to the server. Else, create a new sample on the server.
 
-        :param sample: sample to merge.
+        To merge many samples, use
+        :meth:`~pydent.interfaces.UtilityInterface.merge_samples`.
+
         :return: True if merged, False otherwise
         """
-        try:
-            self.save()
-        except Exception as e:
-            existing = self.session.Sample.find_by_name(self.name)
-            if existing:
-                if self.sample_type_id == existing.sample_type_id:
-                    existing.update_properties(self.properties)
-                    existing.description = self.description
-                    existing.project = self.project
-                    existing.save()
-                    self.reload(existing.dump())
-                    return True
-                else:
-                    raise e
-            else:
-                raise e
-        return False
+        return self.session.utils.merge_samples([self])[0]
 
     def available_items(self, object_type_name=None, object_type_id=None):
         query = {"name": object_type_name, "id": object_type_id}
@@ -22,6 +22,7 @@ Classes
 
     Planner
     PlannerLayout
+    PlanTemplate
 
 Exceptions
 ----------
@@ -34,3 +35,4 @@ Exceptions
 from pydent.planner.graph import PlannerLayout
 from pydent.planner.planner import Planner
 from pydent.planner.planner import PlannerException
+from pydent.planner.template import PlanTemplate
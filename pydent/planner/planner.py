@@ -34,9 +34,11 @@ from pydent.models import Sample
 from pydent.models import Wire
 from pydent.planner.graph import PlannerGraph
 from pydent.planner.graph import PlannerLayout
+from pydent.planner.template import PlanTemplate
 from pydent.planner.utils import _id_getter
 from pydent.planner.utils import arr_to_pairs
 from pydent.planner.utils import get_subgraphs
+from pydent.planner.utils import UnionFind
 from pydent.utils import empty_copy
 from pydent.utils import logger
 from pydent.utils import make_async
@@ -146,30 +148,48 @@ class AFTMatcher:
         return matching_afts, matching_inputs, matching_outputs
 
     @staticmethod
+    def _aft_key(field_type: FieldType, aft: AllowableFieldType) -> Tuple:
+        return aft.sample_type_id, aft.object_type_id, field_type.part is True
+
+    @classmethod
+    def _aft_index(cls, field_type: FieldType) -> Dict[Tuple, List[AllowableFieldType]]:
+        """Return the allowable field types of a field type grouped by their
+        (sample_type_id, object_type_id, part) key.
+
+        The index is cached on the field type and rebuilt only if its
+        allowable field types change.
+        """
+        afts = field_type.allowable_field_types or []
+        cached = getattr(field_type, "_aft_index_cache", None)
+        if cached is None or cached[0] is not afts or cached[1] != len(afts):
+            index = {}
+            for aft in afts:
+                index.setdefault(cls._aft_key(field_type, aft), []).append(aft)
+            cached = (afts, len(afts), index)
+            field_type._aft_index_cache = cached
+        return cached[2]
+
+    @classmethod
     def _find_matching_afts(
-        src_ft: FieldType, dest_ft: FieldType
+        cls, src_ft: FieldType, dest_ft: FieldType
     ) -> List[Tuple[AllowableFieldType, AllowableFieldType]]:
-        """Finds matching afts between two FieldTypes."""
-        afts = []
-        src_afts = src_ft.allowable_field_types
-        dest_afts = dest_ft.allowable_field_types
+        """Finds matching afts between two FieldTypes.
 
-        # check whether the field_type handles collections
-        input_handles_collections = dest_ft.part is True
-        output_handles_collections = dest_ft.part is True
-        if input_handles_collections != output_handles_collections:
+        Allowable field types match if they have the same sample type and
+        object type, and both field types handle collections (parts) or both
+        do not.
+        """
+        src_index = cls._aft_index(src_ft)
+        dest_index = cls._aft_index(dest_ft)
+        shared_keys = src_index.keys() & dest_index.keys()
+        if not shared_keys:
             return []
 
-        for dest_aft in dest_afts:
-            for src_aft in src_afts:
-                out_object_type_id = src_aft.object_type_id
-                in_object_type_id = dest_aft.object_type_id
-                out_sample_type_id = src_aft.sample_type_id
-                in_sample_type_id = dest_aft.sample_type_id
-                if (
-                    out_object_type_id == in_object_type_id
-                    and out_sample_type_id == in_sample_type_id
-                ):
+        afts = []
+        for dest_aft in dest_ft.allowable_field_types:
+            key = cls._aft_key(dest_ft, dest_aft)
+            if key in shared_keys:
+                for src_aft in src_index[key]:
                     afts.append((src_aft, dest_aft))
         return afts
 
@@ -218,6 +238,7 @@ class Planner(AFTMatcher):
                         "Could not find plan with id={}".format(plan_id)
                     )
                 self.plan = plan
+                self.plan.mark_clean()
             else:
                 # create a new plan
                 self.plan = self.session.Plan.new()
@@ -321,23 +342,71 @@ class Planner(AFTMatcher):
             )
 
         self.plan.create()
+        self.plan.mark_clean()
 
     # TODO: fix this 'set_timeout' to not be global
-    def save(self):
+    def save(self, differential: bool = True, max_change_ratio: float = 0.5):
         """Saves the Plan to the Aquarium server.
 
+        :param differential: if True, only send the changes made since the
+            plan was last saved or loaded, if possible. See :meth:`update`.
+        :param max_change_ratio: see :meth:`update`
         :return: None
         """
         if not self.plan.id:
             self.create()
         else:
-            self.update()
-
-    def update(self):
-        """Update the plan on Aquarium."""
-        self.plan.save()
+            self.update(differential=differential, max_change_ratio=max_change_ratio)
+
+    def update(self, differential: bool = True, max_change_ratio: float = 0.5):
+        """Update the plan on Aquarium.
+
+        If differential is True and the plan was previously saved or loaded by
+        the planner, only the changed FieldValues and the added, changed or
+        removed Wires are sent to the server. If operations or field values
+        were added or removed, if the plan or its operations changed, or if
+        more than `max_change_ratio` of the field values and wires changed,
+        the full plan is saved instead.
+
+        :param differential: if True, send only the changes, if possible.
+        :param max_change_ratio: maximum fraction of changed field values and
+            wires for which the changes are sent instead of the full plan.
+        :return: the plan
+        """
+        changes = None
+        if differential:
+            changes = self.plan.get_changes()
+        if changes is not None:
+            num_models = len(self.plan.wires or [])
+            for op in self.plan.operations or []:
+                num_models += len(op.field_values or [])
+            num_changes = sum(len(v) for v in changes.values())
+            if num_changes > max_change_ratio * max(num_models, 1):
+                changes = None
+
+        if changes is None:
+            self.logger.debug("saving full plan")
+            self.plan.save()
+        else:
+            self.logger.debug(
+                "saving {} field values, {} wires and removing {} wires".format(
+                    len(changes["field_values"]),
+                    len(changes["wires"]),
+                    len(changes["removed_wires"]),
+                )
+            )
+            self._save_changes(changes)
+        self.plan.mark_clean()
         return self.plan
 
+    def _save_changes(self, changes: Dict[str, List[ModelBase]]):
+        for fv in changes["field_values"]:
+            fv.save(do_reload=False)
+        for wire in changes["removed_wires"]:
+            self.session.utils.delete_wire(wire)
+        for wire in changes["wires"]:
+            self.session.utils.save_wire(wire)
+
     def delete(self):
         """Delete the plan on the Aquarium server. Make an annonymized copy of
         the plan stored in Trident.
@@ -1587,16 +1656,28 @@ class Planner(AFTMatcher):
     def __copy__(self):
         return self.copy()
 
+    def to_template(self) -> PlanTemplate:
+        """Return a compact, reusable template of the plan's operations and
+        wires. See :class:`PlanTemplate <pydent.planner.template.PlanTemplate>`.
+
+        :return: the plan template
+        """
+        return PlanTemplate.from_plan(self.plan)
+
     @staticmethod
-    def combine(plans: List[Plan]) -> "Planner":
+    def combine(plans: List[Union[Plan, "Planner"]]) -> "Planner":
         """Merges a list of plans into a single plan by combining operations
         and wires.
 
-        :param plans: list of Aquarium Plans instances
+        Each distinct plan is converted to a
+        :class:`PlanTemplate <pydent.planner.template.PlanTemplate>` once, from
+        which new anonymous operations and wires are instantiated. Metatypes,
+        samples and items are shared by reference rather than copied.
+
+        :param plans: list of Aquarium Plans or Planner instances
         :return: new Plan
         """
-        copied_plans = [c.copy() for c in plans]
-
+        plans = [getattr(p, "plan", p) for p in plans]
         sessions = {p.session for p in plans}
         if len(sessions) > 1:
             raise PlannerException(
@@ -1604,11 +1685,15 @@ class Planner(AFTMatcher):
             )
         session = sessions.pop()
 
+        templates = {}
         new_plan = Planner(session)
         new_plan.plan.operations = []
-        for p in copied_plans:
-            new_plan.plan.operations += p.plan.operations
-            new_plan.plan.wires += p.plan.wires
+        for p in plans:
+            if id(p) not in templates:
+                templates[id(p)] = PlanTemplate.from_plan(p)
+            operations, wires = templates[id(p)].instantiate(session)
+            new_plan.plan.operations += operations
+            new_plan.plan.wires += wires
         return new_plan
 
     def move_operations(self, ops, to_plan_id, confirm: bool = True):
@@ -1642,60 +1727,81 @@ class Planner(AFTMatcher):
         else:
             print("{}: user canceled".format(result))
 
-    def add_from_template(self, plan: Union[int, Plan, "Planner"]) -> List[Operation]:
+    def add_from_template(
+        self, plan: Union[int, Plan, "Planner", PlanTemplate], num: int = 1
+    ) -> List[Operation]:
         """Add Operation and Wires from the provided template plan to this
         planner.
 
-        :param plan: Plan id (int), Plan instance, or Planner instance
+        :param plan: Plan id (int), Plan instance, Planner instance or a
+            :class:`PlanTemplate <pydent.planner.template.PlanTemplate>`
+        :param num: number of times to add the template
         :return: list of operations that were added from template.
         """
         if isinstance(plan, int):
             plan = self.session.Plan.find(plan)
-            planner = self.__class__(plan)
-        elif isinstance(plan, Plan):
-            planner = self.__class__(plan)
-        template = planner.copy()
-        self.plan.operations += template.operations
-        self.plan.wires += template.wires
-        return template.operations
+        if isinstance(plan, PlanTemplate):
+            template = plan
+        else:
+            template = PlanTemplate.from_plan(getattr(plan, "plan", plan))
+
+        if self.plan.operations is None:
+            self.plan.operations = []
+        if self.plan.wires is None:
+            self.plan.wires = []
+        added = []
+        for _ in range(num):
+            operations, wires = template.instantiate(self.session)
+            self.plan.operations += operations
+            self.plan.wires += wires
+            added += operations
+        return added
 
     def split(self) -> List["Planner"]:
         """Split the plan into several distinct plans, if possible.
 
-        This first convert the plan  to an operation graph, find
-        subgraphs that are not connected to each other,  and create new
-        plans based on these subgraphs. This will return anonymous
+        Operations are grouped into independent components using a
+        union-find over the plan's wires, and wires are bucketed by the
+        component they belong to, in a single pass. This will return anonymous
         copies of all the plans, meaning operations and field_values
         will be anonymized. Sample and items attached to field values
         will remain to avoid re-creating samples and items.
         """
 
-        # copy this plan
+        # copy this plan once
         copied_plan = self.copy()
-
-        # get independent operation graphs
-        layouts = copied_plan.layout.get_independent_graphs()
-
-        # for each independent graph, make a new plan
+        operations = copied_plan.plan.operations or []
+
+        components = UnionFind()
+        ops_by_key = {}
+        fv_to_op_key = {}
+        for op in operations:
+            op_key = _id_getter(op)
+            components.add(op_key)
+            ops_by_key[op_key] = op
+            for fv in op.field_values or []:
+                fv_to_op_key[fv.rid] = op_key
+
+        wire_keys = []
+        for wire in copied_plan.plan.wires or []:
+            from_key = fv_to_op_key.get(wire.source.rid)
+            to_key = fv_to_op_key.get(wire.destination.rid)
+            if from_key is None or to_key is None:
+                continue
+            components.union(from_key, to_key)
+            wire_keys.append((from_key, wire))
+
+        wires_by_component = defaultdict(list)
+        for from_key, wire in wire_keys:
+            wires_by_component[components.find(from_key)].append(wire)
+
+        # for each independent component, make a new plan
         new_plans = []
-        for layout in layouts:
+        for root, op_keys in components.groups().items():
             new_plan = Planner(self.session)
+            new_plan.plan.operations = [ops_by_key[k] for k in op_keys]
+            new_plan.plan.wires = wires_by_component[root]
             new_plans.append(new_plan)
-
-            # copy over the operations
-            opids = list(layout.nxgraph.nodes)
-            ops = [layout.nxgraph.nodes[opid]["operation"] for opid in opids]
-            wires = []
-
-            # copy over relevant wires
-            for wire in copied_plan.plan.wires:
-                to_id = wire.destination.operation._primary_key
-                from_id = getattr(wire, "source").operation._primary_key
-                if to_id in opids or from_id in opids:
-                    wires.append(wire)
-
-            new_plan.plan.operations = ops
-            new_plan.plan.wires = wires
         return new_plans
 
     def __add__(self, other: Plan) -> "Planner":
@@ -0,0 +1,173 @@
+"""Plan templates.
+
+A :class:`PlanTemplate` is a compact, precomputed representation of the
+operation and wire skeleton of a plan. Instantiating a template creates new
+anonymous :class:`Operations <pydent.models.Operation>`,
+:class:`FieldValues <pydent.models.FieldValue>` and
+:class:`Wires <pydent.models.Wire>`, while metatypes (OperationType, FieldType,
+AllowableFieldType, ObjectType) and inventory (Sample, Item) are shared by
+reference with the template plan. This is much cheaper than
+:meth:`Plan.copy <pydent.base.ModelBase.copy>`, which deep copies and
+anonymizes the entire model tree for every copy.
+"""
+
+from typing import List
+from typing import Tuple
+
+from pydent.marshaller.fields import Callback
+from pydent.models import Operation
+from pydent.models import Plan
+from pydent.models import Wire
+from pydent.sessionabc import SessionABC
+
+# (operation index, field value index)
+FieldValueIndex = Tuple[int, int]
+
+
+class PlanTemplate:
+    """A reusable operation and wire skeleton of a plan.
+
+    .. code-block:: python
+
+        template = PlanTemplate.from_plan(planner.plan)
+        for _ in range(96):
+            operations, wires = template.instantiate(session)
+    """
+
+    #: data keys that are never carried over to new instances
+    ANONYMOUS_KEYS = ("id", "rid", "created_at", "updated_at", "parent_id", "user_id")
+
+    #: relationships of operations that are shared by reference
+    SHARED_OPERATION_RELATIONSHIPS = ("operation_type",)
+
+    #: relationships of field values that are shared by reference
+    SHARED_FIELD_VALUE_RELATIONSHIPS = (
+        "field_type",
+        "allowable_field_type",
+        "object_type",
+        "sample",
+        "item",
+    )
+
+    def __init__(
+        self,
+        operations: List[Tuple[dict, dict]],
+        field_values: List[List[Tuple[dict, dict]]],
+        wires: List[Tuple[FieldValueIndex, FieldValueIndex]],
+    ):
+        """Initializes a plan template. Use :meth:`from_plan` to create a
+        template from an existing plan.
+
+        :param operations: list of (data, shared relationships) for each operation
+        :param field_values: list of (data, shared relationships) of the field
+            values for each operation
+        :param wires: list of source and destination field value indices
+        """
+        self.operations = operations
+        self.field_values = field_values
+        self.wires = wires
+
+    @staticmethod
+    def _callback_keys(model_class) -> set:
+        return {
+            name
+            for name, field in model_class.fields.items()
+            if issubclass(type(field), Callback)
+        }
+
+    @classmethod
+    def _compact(cls, model, shared: Tuple[str, ...]) -> Tuple[dict, dict]:
+        """Return the plain data and the shared (already deserialized)
+        relationships of a model."""
+        ignore = cls._callback_keys(model.__class__).union(cls.ANONYMOUS_KEYS)
+        data = {k: v for k, v in model._get_data().items() if k not in ignore}
+        deserialized = model._get_deserialized_data()
+        relationships = {}
+        for name in shared:
+            val = deserialized.get(name, None)
+            if val is not None:
+                relationships[name] = val
+        return data, relationships
+
+    @classmethod
+    def from_plan(cls, plan: Plan) -> "PlanTemplate":
+        """Create a template from the operations and wires of a plan.
+
+        :param plan: the template plan
+        :return: the plan template
+        """
+        operations = []
+        field_values = []
+        fv_index = {}
+        for i, op in enumerate(plan.operations or []):
+            operations.append(cls._compact(op, cls.SHARED_OPERATION_RELATIONSHIPS))
+            op_field_values = []
+            for j, fv in enumerate(op.field_values or []):
+                fv_index[fv.rid] = (i, j)
+                op_field_values.append(
+                    cls._compact(fv, cls.SHARED_FIELD_VALUE_RELATIONSHIPS)
+                )
+            field_values.append(op_field_values)
+
+        wires = []
+        seen = set()
+        for wire in plan.wires or []:
+            if wire.source is None or wire.destination is None:
+                continue
+            src = fv_index.get(wire.source.rid, None)
+            dest = fv_index.get(wire.destination.rid, None)
+            if src is None or dest is None or (src, dest) in seen:
+                continue
+            seen.add((src, dest))
+            wires.append((src, dest))
+        return cls(operations, field_values, wires)
+
+    @staticmethod
+    def _new(session: SessionABC, model_name: str, data: dict, relationships: dict):
+        model = getattr(session, model_name).load(dict(data))
+        for name, val in relationships.items():
+            setattr(model, name, val)
+        return model
+
+    def instantiate(self, session: SessionABC) -> Tuple[List[Operation], List[Wire]]:
+        """Create new anonymous operations and wires from the template.
+
+        :param session: the session to attach the new models to
+        :return: tuple of the new operations and the new wires
+        """
+        operations = []
+        for (op_data, op_relationships), fv_list in zip(
+            self.operations, self.field_values
+        ):
+            op = self._new(session, "Operation", op_data, op_relationships)
+            fvs = []
+            for fv_data, fv_relationships in fv_list:
+                fv = self._new(session, "FieldValue", fv_data, fv_relationships)
+                fv.operation = op
+                fvs.append(fv)
+            op.field_values = fvs
+            operations.append(op)
+
+        wires = []
+        wires_by_fv = {}
+        for (src_i, src_j), (dest_i, dest_j) in self.wires:
+            src = operations[src_i].field_values[src_j]
+            dest = operations[dest_i].field_values[dest_j]
+            wire = session.Wire.new(source=src, destination=dest)
+            wires_by_fv.setdefault((src.rid, "wires_as_source"), []).append(wire)
+            wires_by_fv.setdefault((dest.rid, "wires_as_dest"), []).append(wire)
+            wires.append(wire)
+
+        for op in operations:
+            for fv in op.field_values:
+                for name in ["wires_as_source", "wires_as_dest"]:
+                    setattr(fv, name, wires_by_fv.get((fv.rid, name), []))
+        return operations, wires
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def __repr__(self) -> str:
+        return "<{} operations={} wires={}>".format(
+            self.__class__.__name__, len(self.operations), len(self.wires)
+        )
@@ -45,3 +45,58 @@ def get_subgraphs(graph):
             node_list.remove(n)
         subgraphs.append(graph.subgraph(subgraph.nodes))
     return subgraphs
+
+
+class UnionFind:
+    """Disjoint-set forest with path compression and union by size.
+
+    Used to find connected components (e.g. independent sets of
+    operations in a plan) in a single pass over the edges, without
+    building intermediate graphs.
+    """
+
+    def __init__(self, nodes=None):
+        self.parents = {}
+        self.sizes = {}
+        if nodes:
+            for n in nodes:
+                self.add(n)
+
+    def add(self, node):
+        if node not in self.parents:
+            self.parents[node] = node
+            self.sizes[node] = 1
+
+    def find(self, node):
+        """Return the root of the component containing the node."""
+        self.add(node)
+        root = node
+        while self.parents[root] != root:
+            root = self.parents[root]
+        # compress the path
+        while self.parents[node] != root:
+            self.parents[node], node = root, self.parents[node]
+        return root
+
+    def union(self, node1, node2):
+        """Merge the components of the two nodes, returning the new root."""
+        root1 = self.find(node1)
+        root2 = self.find(node2)
+        if root1 == root2:
+            return root1
+        if self.sizes[root1] < self.sizes[root2]:
+            root1, root2 = root2, root1
+        self.parents[root2] = root1
+        self.sizes[root1] += self.sizes.pop(root2)
+        return root1
+
+    def groups(self):
+        """Return a dictionary of component root to list of nodes, in node
+        insertion order."""
+        groups = {}
+        for n in self.parents:
+            groups.setdefault(self.find(n), []).append(n)
+        return groups
+
+    def __len__(self):
+        return len(self.sizes)
@@ -17,7 +17,9 @@ import inflection
 
 from pydent.base import ModelBase
 from pydent.marshaller import fields
+from pydent.marshaller.descriptors import MarshallingAccessor
 from pydent.marshaller.exceptions import ModelValidationError
+from pydent.request_tracker import track_callback
 
 
 class FieldValidationError(ModelValidationError):
@@ -33,9 +35,30 @@ class Raw(fields.Field):
         )
 
 
+class JSONAccessor(MarshallingAccessor):
+    """Descriptor for a :class:`JSON` field. JSON strings are decoded the first
+    time the attribute is accessed rather than when the model is loaded."""
+
+    def __get__(self, obj, objtype):
+        val = self.get_val(obj)
+        if val is self.HOLDER:
+            val = super().__get__(obj, objtype)
+            getattr(obj, self.deserialized_accessor)[self.name] = val
+        return val
+
+    def __set__(self, obj, val):
+        if isinstance(val, str):
+            getattr(obj, self.accessor)[self.name] = val
+            getattr(obj, self.deserialized_accessor)[self.name] = self.HOLDER
+        else:
+            super().__set__(obj, val)
+
+
 class JSON(Raw):
     """Automatically serializes/deserializes JSON objects."""
 
+    ACCESSOR = JSONAccessor
+
     def _deserialize(self, owner, data):
         if isinstance(data, dict):
             return data
@@ -168,8 +191,13 @@ class BaseRelationship(fields.Relationship):
 
     def fullfill(self, owner, cache=None, extra_args=None, extra_kwargs=None):
         try:
-            return super().fullfill(
-                owner, cache, extra_args=extra_args, extra_kwargs=extra_kwargs
+            return track_callback(
+                super().fullfill,
+                owner,
+                self.data_key,
+                cache,
+                extra_args=extra_args,
+                extra_kwargs=extra_kwargs,
             )
         except fields.RunTimeCallbackAttributeError:
             return BaseRelationshipAccessor.HOLDER
@@ -178,26 +206,29 @@ class BaseRelationship(fields.Relationship):
         """Bundles all of the callback args for the models into a single
         query."""
         args = {}
+        seen = {}
+
+        def add_arg(k, v):
+            if v is not None and v not in seen.setdefault(k, set()):
+                seen[k].add(v)
+                args[k].append(v)
+
         for s in models:
             callback_args = self.get_callback_args(s)[1:]
             if self.QUERY_TYPE == "by_id":
                 args.setdefault(self.attr, [])
                 for x in callback_args:
-                    if x is not None and x not in args[self.attr]:
-                        args[self.attr].append(x)
+                    add_arg(self.attr, x)
             else:
                 for cba in callback_args:
                     for k in cba:
                         args.setdefault(k, [])
-                        arg_arr = args[k]
                         val = cba[k]
-                        if val is not None:
-                            if isinstance(val, list):
-                                for v in val:
-                                    if v not in arg_arr:
-                                        arg_arr.append(v)
-                            elif val not in arg_arr:
-                                arg_arr.append(val)
+                        if isinstance(val, list):
+                            for v in val:
+                                add_arg(k, v)
+                        else:
+                            add_arg(k, val)
         return args
 
 
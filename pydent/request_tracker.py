@@ -0,0 +1,260 @@
+"""Accounting of the requests made to the Aquarium server.
+
+Requests are grouped by the model class and relationship whose callback
+made them (e.g. accessing `operation.field_values` on a model that has not
+retrieved its field values) and by the first line of code outside of
+trident that caused them. Callbacks of the same relationship made many times
+from the same line are flagged as 'N+1' patterns, which are better served by
+retrieving the relationship of all models at once using the
+:class:`Browser <pydent.browser.Browser>`.
+
+.. code-block:: python
+
+    with session.track_requests() as tracker:
+        for op in plan.operations:
+            for fv in op.field_values:
+                print(fv.sample)
+
+    print(tracker.report())
+
+    # the relations to retrieve using the browser
+    for suggestion in tracker.suggestions():
+        print(suggestion["model"], suggestion["relations"])
+"""
+
+import os
+import sys
+import threading
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from pydent.base import ModelBase
+from pydent.hooks import REQUEST_END
+from pydent.sessionabc import SessionABC
+
+N_PLUS_ONE_THRESHOLD = 5
+"""Minimum number of callbacks of a relationship from the same line to flag
+as an N+1 pattern."""
+
+_PYDENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_trackers = []
+"""The active request trackers."""
+
+
+def _callsite() -> str:
+    """Return the first line of code outside of trident in the stack."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename.startswith(_PYDENT_DIR):
+        frame = frame.f_back
+    if frame is None:
+        return None
+    return "{}:{} in {}".format(
+        frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name
+    )
+
+
+def track_callback(fxn, owner: ModelBase, name: str, *args, **kwargs):
+    """Call the relationship callback `fxn` of the owner, recording the
+    requests made by the callback to the active request trackers."""
+    if not _trackers:
+        return fxn(owner, *args, **kwargs)
+    trackers = list(_trackers)
+    tokens = [tracker._start_callback(owner, name) for tracker in trackers]
+    val = None
+    try:
+        val = fxn(owner, *args, **kwargs)
+    finally:
+        for tracker, token in zip(trackers, tokens):
+            tracker._end_callback(token, val)
+    return val
+
+
+class RequestTracker:
+    """Records the requests made by a session, grouped by (model class,
+    relationship, callsite).
+
+    While the tracker is active, it is registered to the `request_end` event
+    of the session hooks, which records the time and response size of each
+    request. Requests made outside of a relationship callback are recorded
+    with the model name of the query and no relationship.
+    """
+
+    def __init__(self, session: SessionABC, threshold: int = None):
+        """Initializes a request tracker.
+
+        :param session: the session to track
+        :param threshold: minimum number of callbacks of a relationship from the
+            same line to flag as an N+1 pattern
+            (default :data:`N_PLUS_ONE_THRESHOLD`)
+        """
+        if threshold is None:
+            threshold = N_PLUS_ONE_THRESHOLD
+        self.session = session
+        self.threshold = threshold
+        self._stats = {}
+        self._paths = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_stats(model: str, relationship: str, callsite: str) -> Dict:
+        return dict(
+            model=model,
+            relationship=relationship,
+            callsite=callsite,
+            path=None,
+            num_callbacks=0,
+            num_requests=0,
+            num_bytes=0,
+            seconds=0.0,
+        )
+
+    def _get_stats(self, key: Tuple) -> Dict:
+        stats = self._stats.get(key, None)
+        if stats is None:
+            stats = self._stats.setdefault(key, self.new_stats(*key))
+        return stats
+
+    def __call__(self, event: str, data: Dict):
+        callback = getattr(self._local, "callback", None)
+        if callback is not None:
+            key = callback["key"]
+            callback["num_requests"] += 1
+        else:
+            key = (data["model"], None, _callsite())
+        with self._lock:
+            stats = self._get_stats(key)
+            stats["num_requests"] += 1
+            stats["num_bytes"] += data["num_bytes"]
+            stats["seconds"] += data["seconds"]
+
+    def _path(self, model: ModelBase) -> Tuple[str, ...]:
+        """Return the chain of relationships that loaded the model."""
+        return self._paths.get(model.rid, (model.__class__.__name__,))
+
+    def _start_callback(self, owner: ModelBase, name: str) -> Dict:
+        callback = dict(
+            key=(owner.__class__.__name__, name, _callsite()),
+            path=self._path(owner) + (name,),
+            num_requests=0,
+            previous=getattr(self._local, "callback", None),
+        )
+        self._local.callback = callback
+        return callback
+
+    def _end_callback(self, callback: Dict, val):
+        self._local.callback = callback["previous"]
+        if not callback["num_requests"]:
+            return
+        with self._lock:
+            stats = self._get_stats(callback["key"])
+            stats["num_callbacks"] += 1
+            if stats["path"] is None:
+                stats["path"] = callback["path"]
+            if not isinstance(val, list):
+                val = [val]
+            for model in val:
+                if isinstance(model, ModelBase):
+                    self._paths[model.rid] = callback["path"]
+
+    @property
+    def records(self) -> List[Dict]:
+        """Return the recorded requests, grouped by model class, relationship
+        and callsite, in order of the number of requests.
+
+        :return: list of dictionaries of the model class name, relationship
+            name (None if the requests were not made by a relationship
+            callback), callsite, number of callbacks, number of requests,
+            number of bytes received and total time in seconds
+        """
+        with self._lock:
+            records = [dict(stats) for stats in self._stats.values()]
+        for record in records:
+            record.pop("path")
+        return sorted(records, key=lambda r: -r["num_requests"])
+
+    @property
+    def num_requests(self) -> int:
+        """Return the total number of recorded requests."""
+        return sum(r["num_requests"] for r in self.records)
+
+    def n_plus_one(self) -> List[Dict]:
+        """Return the records of relationships whose callbacks were made at
+        least `threshold` times from the same line."""
+        return [
+            r
+            for r in self.records
+            if r["relationship"] is not None and r["num_callbacks"] >= self.threshold
+        ]
+
+    def suggestions(self) -> List[Dict]:
+        """Return the relations trees that would retrieve the flagged N+1
+        patterns using :meth:`Browser.recursive_retrieve
+        <pydent.browser.Browser.recursive_retrieve>`.
+
+        The relations are rooted at the first model class whose
+        relationships were accessed, e.g. accessing the field values of the
+        operations of a plan suggests retrieving
+        `{"operations": {"field_values": {}}}` from the plans.
+
+        :return: list of dictionaries of the model class name and the
+            relations tree to retrieve from models of that class
+        """
+        flagged = {
+            (r["model"], r["relationship"], r["callsite"]) for r in self.n_plus_one()
+        }
+        with self._lock:
+            paths = [self._stats[key]["path"] for key in flagged]
+        trees = {}
+        for path in sorted(paths):
+            tree = trees.setdefault(path[0], {})
+            for name in path[1:]:
+                tree = tree.setdefault(name, {})
+        return [dict(model=model, relations=tree) for model, tree in trees.items()]
+
+    def report(self) -> str:
+        """Return a human readable report of the recorded requests, the N+1
+        patterns and the suggested relations to retrieve."""
+        lines = [
+            "{num} requests ({seconds:.3f}s, {num_bytes} bytes)".format(
+                num=self.num_requests,
+                seconds=sum(r["seconds"] for r in self.records),
+                num_bytes=sum(r["num_bytes"] for r in self.records),
+            )
+        ]
+        for r in self.records:
+            name = r["model"]
+            if r["relationship"] is not None:
+                name = "{}.{}".format(r["model"], r["relationship"])
+            lines.append(
+                "  {num_requests:>6} requests {seconds:8.3f}s {num_bytes:>10} bytes"
+                "  {name} at {callsite}".format(name=name, **r)
+            )
+        for r in self.n_plus_one():
+            lines.append(
+                "N+1: {num_callbacks} callbacks of '{model}.{relationship}' "
+                "at {callsite}".format(**r)
+            )
+        for suggestion in self.suggestions():
+            lines.append(
+                "Suggestion: session.browser.recursive_retrieve("
+                "<{model} models>, {relations})".format(**suggestion)
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        """Clear the recorded requests."""
+        with self._lock:
+            self._stats = {}
+            self._paths = {}
+
+    def __enter__(self) -> "RequestTracker":
+        self.session.hooks.register(self, events=[REQUEST_END])
+        _trackers.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _trackers.remove(self)
+        self.session.hooks.unregister(self)
@@ -1,5 +1,6 @@
 import asyncio
 import itertools
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from functools import wraps
 
@@ -23,7 +24,7 @@ def with_index(fxn):
 
 
 async def exec_async_fxn(
-    fxn, arg_list, kwargs, chunk_size=1, desc="", progress_bar=True
+    fxn, arg_list, kwargs, chunk_size=1, desc="", progress_bar=True, executor=None
 ):
     """Executes an asynchronous function.
 
@@ -39,6 +40,9 @@ async def exec_async_fxn(
     :type desc: basestring
     :param progress_bar: whether to display tqdm progress bar
     :type progress_bar: boolean
+    :param executor: the executor to run the functions in. If None, the default
+        executor of the event loop is used.
+    :type executor: concurrent.futures.Executor
     :return: list of results in same order as arg_list
     :rtype: list
     """
@@ -47,7 +51,7 @@ async def exec_async_fxn(
     loop = asyncio.get_event_loop()
     partial_fxn = partial(with_index(fxn), **kwargs)
     futures = [
-        loop.run_in_executor(None, partial_fxn, i, *args)
+        loop.run_in_executor(executor, partial_fxn, i, *args)
         for i, args in enumerate(arg_list)
     ]
 
@@ -64,7 +68,15 @@ async def exec_async_fxn(
     return [r[1] for r in results]
 
 
-def asyncfunc(fxn, arg_list, kwargs=None, chunk_size=1, progress_bar=True, desc=None):
+def asyncfunc(
+    fxn,
+    arg_list,
+    kwargs=None,
+    chunk_size=1,
+    progress_bar=True,
+    desc=None,
+    max_workers=None,
+):
     """Runs a function asynchronously.
 
     :param fxn: function to run asynchronously
@@ -72,6 +84,9 @@ def asyncfunc(fxn, arg_list, kwargs=None, chunk_size=1, progress_bar=True, desc=
     :param arg_chunks: arguments to apply to the function; suggested to divide list
         into chunks
     :type arg_chunks: list
+    :param max_workers: maximum number of functions to run concurrently. If None,
+        the default executor of the event loop is used.
+    :type max_workers: int
     :return: result
     :rtype: list
     """
@@ -81,16 +96,24 @@ def asyncfunc(fxn, arg_list, kwargs=None, chunk_size=1, progress_bar=True, desc=
     loop = asyncio.get_event_loop()
     if desc is None:
         desc = desc
-    results = loop.run_until_complete(
-        exec_async_fxn(
-            fxn,
-            arg_list,
-            kwargs=kwargs,
-            desc=desc,
-            progress_bar=progress_bar,
-            chunk_size=chunk_size,
+    executor = None
+    if max_workers is not None:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        results = loop.run_until_complete(
+            exec_async_fxn(
+                fxn,
+                arg_list,
+                kwargs=kwargs,
+                desc=desc,
+                progress_bar=progress_bar,
+                chunk_size=chunk_size,
+                executor=executor,
+            )
         )
-    )
+    finally:
+        if executor is not None:
+            executor.shutdown()
     #     loop.close()
     return results
 
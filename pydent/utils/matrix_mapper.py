@@ -71,18 +71,23 @@ class MatrixMapping(Sequence, Generic[T]):
     def _index_view(self):
         return self._index_matrix
 
-    def _iter_indices(self, index: IndexType):
-        indices = self._index_view[index]
-
-        if isinstance(indices, tuple):
-            indices = [[indices]]
+    @staticmethod
+    def _as_range(index: Union[int, slice], size: int) -> Iterable[int]:
+        indices = range(size)[index]
+        if isinstance(indices, int):
+            return (indices,)
+        return indices
 
-        for rc in self._flatten(indices):
-            if isinstance(rc, list):
-                for r, c in rc:
-                    yield r, c
-            else:
-                yield rc
+    def _iter_indices(self, index: IndexType):
+        """Iterate over the (row, column) tuples selected by the index."""
+        nrows, ncols = self.dimensions
+        if isinstance(index, tuple):
+            row_index, col_index = index
+        else:
+            row_index, col_index = index, slice(None)
+        for r in self._as_range(row_index, nrows):
+            for c in self._as_range(col_index, ncols):
+                yield r, c
 
     def iter_flatten(self) -> Generator[T, None, None]:
         for row in self.data:
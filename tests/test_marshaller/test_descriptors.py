@@ -1,5 +1,9 @@
 from pydent.marshaller.base import add_schema
+from pydent.marshaller.descriptors import lazy_deserialization
+from pydent.marshaller.descriptors import Placeholders
 from pydent.marshaller.fields import Field
+from pydent.marshaller.fields import Relationship
+from pydent.marshaller.registry import ModelRegistry
 
 
 def test_marshalling_accessor(base):
@@ -20,3 +24,82 @@ def test_marshalling_accessor(base):
     print(model.field)
     assert type(model.id) is str
     assert model._get_data()["id"] is 50
+
+
+def test_lazy_deserialization(base):
+    @add_schema
+    class Publisher(base):
+        pass
+
+    @add_schema
+    class Book(base):
+        fields = dict(publisher=Relationship("Publisher", "find"))
+
+        def find(self, model_name):
+            raise AssertionError("callback should not be called")
+
+    @add_schema
+    class Author(base):
+        fields = dict(books=Relationship("Book", "find", many=True))
+
+        def find(self, model_name):
+            raise AssertionError("callback should not be called")
+
+    data = {"books": [{"id": 1, "publisher": {"id": 2}}, {"id": 3, "publisher": None}]}
+    with lazy_deserialization():
+        author = Author.load(data)
+
+    # nested data is not deserialized until accessed
+    assert author._get_deserialized_data()["books"] is Placeholders.LAZY
+    assert author._get_data()["books"] is data["books"]
+    assert author.is_deserialized("books")
+
+    books = author.books
+    assert [type(b) for b in books] == [Book, Book]
+    assert author.books is books
+    assert books[0]._get_deserialized_data()["publisher"] is Placeholders.LAZY
+    assert isinstance(books[0].publisher, Publisher)
+    assert books[0].publisher.id == 2
+    assert author.dump(include={"books": "publisher"}) == {
+        "books": [{"id": 1, "publisher": {"id": 2}}, {"id": 3, "publisher": None}]
+    }
+
+    # outside the context, nested data is deserialized eagerly
+    author = Author.load(data)
+    assert isinstance(author._get_deserialized_data()["books"][0], Book)
+
+
+def test_deferred_serialization(base):
+    @add_schema
+    class Book(base):
+        fields = dict(author=Relationship("Author", "find"))
+
+        def find(self, model_name):
+            return None
+
+    @add_schema
+    class Author(base):
+        fields = dict(books=Relationship("Book", "find", many=True))
+
+        def find(self, model_name):
+            return []
+
+    author = Author.load({"id": 1})
+    books = [Book.load({"id": 2}), Book.load({"id": 3})]
+    author.books = books
+    books[0].author = author
+
+    # models are not serialized on assignment
+    data = getattr(author, ModelRegistry._data_key)
+    assert data["books"] is Placeholders.SERIALIZE
+    assert author.books is books
+
+    # circular references are serialized once the data is requested
+    assert author._get_data()["books"] == [books[0]._get_data(), {"id": 3}]
+    assert books[0]._get_data()["author"] is author._get_data()
+    assert author.dump(include="books") == {"id": 1, "books": [{"id": 2}, {"id": 3}]}
+
+    # reassigning raw data replaces the deferred models
+    author.books = books
+    author.books = [{"id": 4}]
+    assert author._get_data()["books"] == [{"id": 4}]
@@ -73,6 +73,28 @@ def fake_response():
     return make_response
 
 
+@pytest.fixture(scope="function")
+def json_server(monkeypatch, fake_response):
+    """Replaces HTTP requests with a fake server. Calling the fixture with a
+    `handler(path, json_data)` function serves the JSON encoded values returned
+    by the handler. Unlike mocking `AqHTTP.post`, the requests go through
+    `AqHTTP.request` and are reported to the session hooks."""
+
+    def serve(handler):
+        class mock_request:
+            @staticmethod
+            def request(method, url, timeout=None, cookies=None, **kwargs):
+                path = url.split("://", 1)[-1].split("/", 1)[-1]
+                body = handler(path, kwargs.get("json", None))
+                response = fake_response(method, url, body, 200)
+                response._content = json.dumps(body).encode()
+                return response
+
+        monkeypatch.setattr("pydent.aqhttp.requests", mock_request)
+
+    return serve
+
+
 @pytest.fixture(autouse=True)
 def no_requests(monkeypatch):
     def dummy(*args, **kwargs):
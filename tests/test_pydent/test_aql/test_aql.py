@@ -0,0 +1,292 @@
+import json
+
+import pytest
+
+from pydent.aql import _aql
+from pydent.aql import _validation_cache
+from pydent.aql import aql
+from pydent.aql import aql_to_ndjson
+from pydent.aql import aql_validator
+from pydent.aql import iter_aql
+from pydent.aql import plan_aql
+from pydent.aql import validate_aql
+from pydent.aqhttp import AqHTTP
+from pydent.exceptions import AquariumQueryLanguageValidationError
+
+
+@pytest.fixture
+def primer_query():
+    return {
+        "__model__": "Sample",
+        "__description__": "Get primer samples",
+        "__query__": {
+            "sample_type": {"__query__": {"name": "Primer"}},
+            "__options__": {"limit": 10},
+        },
+    }
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    """Replaces HTTP requests with canned responses for the primer query."""
+    requests = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append(json_data)
+        if json_data["model"] == "SampleType":
+            return [{"id": 1, "name": "Primer"}]
+        return [
+            {"id": i, "name": "primer{}".format(i), "sample_type_id": 1}
+            for i in range(10)
+        ]
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    return requests
+
+
+def test_validator_is_compiled_once():
+    assert aql_validator() is aql_validator()
+
+
+def test_validation_is_cached(primer_query, monkeypatch):
+    _validation_cache.clear()
+    validate_aql(primer_query)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the document should not be validated again")
+
+    monkeypatch.setattr(aql_validator(), "iter_errors", fail)
+    validate_aql(dict(primer_query))
+
+
+def test_invalid_query_is_not_cached():
+    for _ in range(2):
+        with pytest.raises(AquariumQueryLanguageValidationError):
+            validate_aql({"__model__": "Sample"})
+
+
+def test_aql(fake_session, primer_query, mock_server):
+    samples = aql(fake_session, primer_query)
+    assert len(samples) == 10
+    assert mock_server[1]["arguments"]["sample_type_id"] == [1]
+
+
+@pytest.mark.benchmark
+def test_aql_benchmark(benchmark, fake_session, primer_query, mock_server):
+    """Benchmark the overhead of validating and planning an AQL query,
+    excluding HTTP."""
+    samples = benchmark(aql, fake_session, primer_query)
+    assert len(samples) == 10
+
+
+@pytest.fixture
+def item_server(json_server):
+    """Replaces HTTP requests with canned responses for item queries."""
+    requests = []
+    rows = {
+        "SampleType": [{"id": 1, "name": "Primer"}],
+        "ObjectType": [{"id": 2, "name": "Primer Aliquot"}],
+        "Sample": [
+            {"id": i, "name": "primer{}".format(i), "sample_type_id": 1}
+            for i in range(5)
+        ],
+        "Item": [{"id": i, "sample_id": i % 5, "object_type_id": 2} for i in range(10)],
+    }
+
+    def handler(path, json_data):
+        requests.append(json_data)
+        models = rows[json_data["model"]]
+        if "sample" in (json_data.get("include", None) or {}):
+            samples = {s["id"]: s for s in rows["Sample"]}
+            models = [dict(m, sample=samples[m["sample_id"]]) for m in models]
+        return models
+
+    json_server(handler)
+    return requests
+
+
+@pytest.fixture
+def item_query():
+    return {
+        "__model__": "Item",
+        "__query__": {
+            "sample": {"__query__": {"sample_type": {"__query__": {"name": "Primer"}}}},
+            "object_type": {"__query__": {"name": "Primer Aliquot"}},
+        },
+    }
+
+
+def test_plan_aql(fake_session, item_query):
+    root = plan_aql(fake_session, item_query)
+    assert root.model_name == "Item"
+    assert [node.model_name for node in root.children] == ["Sample", "ObjectType"]
+    assert [node.parent_column for node in root.children] == [
+        "sample_id",
+        "object_type_id",
+    ]
+    assert [[node.model_name for node in level] for level in root.levels()] == [
+        ["SampleType"],
+        ["Sample", "ObjectType"],
+        ["Item"],
+    ]
+
+
+def test_aql_nested_subqueries(fake_session, item_query, item_server):
+    items = aql(fake_session, item_query)
+    assert len(items) == 10
+    models = [r["model"] for r in item_server]
+    assert models[0] == "SampleType"
+    # sibling subqueries are run concurrently
+    assert sorted(models[1:3]) == ["ObjectType", "Sample"]
+    assert models[3] == "Item"
+    sample_request = [r for r in item_server if r["model"] == "Sample"][0]
+    assert sample_request["arguments"] == {"sample_type_id": [1]}
+    assert item_server[-1]["arguments"] == {
+        "sample_id": [0, 1, 2, 3, 4],
+        "object_type_id": [2],
+    }
+
+
+def test_aql_has_many_subquery(fake_session, item_server):
+    query = {
+        "__model__": "Sample",
+        "__query__": {"items": {"__query__": {"object_type_id": 2}}},
+    }
+    samples = aql(fake_session, query)
+    assert len(samples) == 5
+    assert item_server[-1]["arguments"] == {"id": [0, 1, 2, 3, 4]}
+
+
+def test_aql_empty_subquery(fake_session, item_query, monkeypatch):
+    requests = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append(json_data)
+        return []
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    assert aql(fake_session, item_query) == []
+    # no request is made for queries that cannot match any model
+    assert sorted(r["model"] for r in requests) == ["ObjectType", "SampleType"]
+
+
+def test_aql_chunks_oversized_id_lists(fake_session, item_query, item_server):
+    items = _aql(fake_session, item_query, max_ids=2)
+    assert len(items) == 10
+    assert item_server[-1]["arguments"] == (
+        "( sample_id IN (0, 1) OR sample_id IN (2, 3) OR sample_id IN (4) )"
+        ' AND ( object_type_id = "2" )'
+    )
+
+
+def test_aql_explain(fake_session, item_query, item_server):
+    plan = aql(fake_session, item_query, explain=True)
+    assert item_server == []
+    assert plan["model"] == "Item"
+    assert [child["model"] for child in plan["children"]] == ["Sample", "ObjectType"]
+    assert plan["children"][1]["filters"] == {"name": "Primer Aliquot"}
+    assert plan["children"][0]["children"][0]["model"] == "SampleType"
+    assert "stats" not in plan
+
+
+def test_aql_profile(fake_session, item_query, item_server):
+    item_query["__query__"]["__return__"] = {"sample": {}}
+    profile = aql(fake_session, item_query, profile=True)
+    assert len(profile["results"]) == 10
+
+    plan = profile["plan"]
+    assert plan["query"]["object_type_id"] == [2]
+    assert plan["stats"]["num_requests"] == 1
+    assert plan["stats"]["num_rows"] == 10
+    assert plan["stats"]["served_by"] == "server"
+    assert plan["stats"]["num_bytes"] > 0
+
+    sample_type = plan["children"][0]["children"][0]
+    assert sample_type["stats"]["num_requests"] == 1
+    assert sample_type["stats"]["num_rows"] == 1
+
+    assert profile["__return__"]["num_requests"] == 1
+    assert profile["__return__"]["served_by"] == "server"
+    assert len(item_server) == 5
+
+    # requests are no longer recorded after profiling
+    assert not fake_session.hooks.enabled
+
+
+@pytest.mark.parametrize(
+    "strategy,model,include",
+    [("client", "Sample", None), ("include", "Item", {"sample": {}})],
+)
+def test_aql_return_strategy(
+    fake_session, item_query, item_server, strategy, model, include
+):
+    """__return__ relations are retrieved client side unless the include
+    strategy is requested."""
+    item_query["__query__"]["__return__"] = {"sample": {}}
+    items = aql(fake_session, item_query, strategy=strategy)
+    assert [item.sample.id for item in items] == [i % 5 for i in range(10)]
+    assert item_server[-1]["model"] == model
+    assert item_server[-1].get("include", None) == include
+
+
+@pytest.fixture
+def paged_server(monkeypatch):
+    """Replaces HTTP requests with a server of 25 samples that respects the
+    offset and limit options."""
+    requests = []
+    samples = [
+        {"id": i, "name": "primer{}".format(i), "sample_type_id": 1} for i in range(25)
+    ]
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append(json_data)
+        if json_data["model"] == "SampleType":
+            return [{"id": 1, "name": "Primer"}]
+        opts = json_data["options"]
+        offset = max(opts.get("offset", 0), 0)
+        limit = opts.get("limit", -1)
+        if limit < 0:
+            return samples[offset:]
+        return samples[offset : offset + limit]
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    return requests
+
+
+def test_iter_aql(fake_session, primer_query, paged_server):
+    del primer_query["__query__"]["__options__"]
+    primer_query["__json__"] = {"include_uri": False}
+    records = iter_aql(fake_session, primer_query, page_size=10)
+    record = next(records)
+    assert record["id"] == 0
+    assert record["__model__"] == "Sample"
+    assert "__uri__" not in record
+    # only the first page has been requested
+    assert len(paged_server) == 2
+
+    records = [record] + list(records)
+    assert [r["id"] for r in records] == list(range(25))
+    assert [r["options"]["offset"] for r in paged_server[1:]] == [0, 10, 20, 25]
+
+
+def test_aql_to_ndjson(fake_session, primer_query, paged_server, tmpdir):
+    primer_query["__query__"]["__options__"] = {"pageSize": 10}
+    filepath = str(tmpdir.join("samples.ndjson"))
+    assert aql_to_ndjson(fake_session, primer_query, filepath) == 25
+    with open(filepath, "r") as f:
+        lines = f.readlines()
+    assert [json.loads(line)["id"] for line in lines] == list(range(25))
+    assert json.loads(lines[0])["__model__"] == "Sample"
+
+
+def test_aql_to_ndjson_socket(fake_session, primer_query, paged_server):
+    class Socket:
+        def __init__(self):
+            self.data = b""
+
+        def sendall(self, data):
+            self.data += data
+
+    socket = Socket()
+    assert aql_to_ndjson(fake_session, primer_query, socket, page_size=5) == 10
+    assert len(socket.data.decode("utf-8").splitlines()) == 10
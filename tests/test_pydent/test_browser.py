@@ -0,0 +1,261 @@
+import pytest
+
+from pydent.aqhttp import AqHTTP
+from pydent.browser import BrowserException
+
+
+def make_server(num_plans):
+    """Return the rows of a fake server with plans of two operations, each
+    with two field values."""
+    rows = {
+        "Plan": [],
+        "PlanAssociation": [],
+        "Operation": [],
+        "FieldValue": [],
+        "Sample": [],
+    }
+    for plan_id in range(1, num_plans + 1):
+        rows["Plan"].append({"id": plan_id})
+        for k in range(2):
+            op_id = plan_id * 10 + k
+            rows["PlanAssociation"].append(
+                {"id": op_id, "plan_id": plan_id, "operation_id": op_id}
+            )
+            rows["Operation"].append({"id": op_id})
+            for j in range(2):
+                fv_id = op_id * 10 + j
+                rows["FieldValue"].append(
+                    {
+                        "id": fv_id,
+                        "parent_id": op_id,
+                        "parent_class": "Operation",
+                        "child_sample_id": fv_id,
+                    }
+                )
+                rows["Sample"].append({"id": fv_id, "name": "s{}".format(fv_id)})
+    return rows
+
+
+@pytest.fixture
+def plan_server(monkeypatch):
+    """Replaces HTTP requests with a fake server that supports `where` queries
+    and server-side includes of plan operations, field values and samples.
+
+    Requests are recorded in 'plan_server.requests'.
+    """
+    rows = make_server(5)
+
+    def where(model, args):
+        def match(row):
+            for k, v in args.items():
+                if isinstance(v, list):
+                    if row.get(k, None) not in v:
+                        return False
+                elif row.get(k, None) != v:
+                    return False
+            return True
+
+        return [dict(row) for row in rows[model] if match(row)]
+
+    nested = {
+        ("Plan", "operations"): (
+            "Operation",
+            lambda row: where(
+                "Operation",
+                {
+                    "id": [
+                        pa["operation_id"]
+                        for pa in where("PlanAssociation", {"plan_id": row["id"]})
+                    ]
+                },
+            ),
+        ),
+        ("Operation", "field_values"): (
+            "FieldValue",
+            lambda row: where("FieldValue", {"parent_id": row["id"]}),
+        ),
+        ("FieldValue", "sample"): (
+            "Sample",
+            lambda row: where("Sample", {"id": row["child_sample_id"]})[0],
+        ),
+    }
+
+    def include(model, model_rows, included):
+        for name, sub_include in included.items():
+            nested_model, fxn = nested[(model, name)]
+            for row in model_rows:
+                row[name] = fxn(row)
+                nested_rows = row[name]
+                if not isinstance(nested_rows, list):
+                    nested_rows = [nested_rows]
+                include(nested_model, nested_rows, sub_include.get("include", {}))
+        return model_rows
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        mock_post.requests.append(json_data)
+        model_rows = where(json_data["model"], json_data["arguments"])
+        included = json_data.get("include", None)
+        if isinstance(included, dict):
+            include(json_data["model"], model_rows, included)
+        return model_rows
+
+    mock_post.requests = []
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    return mock_post
+
+
+@pytest.fixture
+def plans(fake_session):
+    return [fake_session.Plan.load({"id": i}) for i in range(1, 6)]
+
+
+def test_server_include(fake_session):
+    include = fake_session.browser.server_include(
+        "Plan", {"operations": {"field_values": ["sample", "operation"]}, "wires": {}}
+    )
+    # relationships with custom callbacks cannot be included
+    assert include == {
+        "operations": {"include": {"field_values": {"include": {"sample": {}}}}}
+    }
+
+
+def check_plans(plans):
+    for plan in plans:
+        assert len(plan.operations) == 2
+        for op in plan.operations:
+            assert len(op.field_values) == 2
+            for fv in op.field_values:
+                assert fv.sample.id == fv.child_sample_id
+
+
+@pytest.mark.parametrize("strategy,num_requests", [("client", 4), ("include", 1)])
+def test_recursive_retrieve_strategies(
+    fake_session, plans, plan_server, strategy, num_requests
+):
+    relations = {"operations": {"field_values": "sample"}}
+    models_by_attr = fake_session.browser.recursive_retrieve(
+        plans, relations, strategy=strategy
+    )
+    assert len(plan_server.requests) == num_requests
+
+    assert len(models_by_attr["operations"]) == 10
+    assert len(models_by_attr["field_values"]) == 20
+    assert len(models_by_attr["sample"]) == 20
+    check_plans(plans)
+    assert len(plan_server.requests) == num_requests
+
+
+def test_include_retrieve_falls_back_to_client(fake_session, plans, plan_server):
+    """Relations that cannot be included are retrieved after the include."""
+    relations = {"operations": {"field_values": ["sample", "operation"]}}
+    fake_session.browser.include_retrieve(plans, relations)
+    # the field value operations were cached by the include
+    assert [r["model"] for r in plan_server.requests] == ["Plan"]
+    check_plans(plans)
+    for plan in plans:
+        for op in plan.operations:
+            for fv in op.field_values:
+                assert fv.is_deserialized("operation")
+                assert fv.operation.id == op.id
+    assert len(plan_server.requests) == 1
+
+
+def test_include_retrieve_uses_cached_instances(fake_session, plans, plan_server):
+    """Included models of every level should be the browser's cached
+    instances."""
+    browser = fake_session.browser
+    (op,) = browser.where({"id": [11]}, "Operation")
+    plan_server.requests.clear()
+
+    browser.include_retrieve(plans, {"operations": {"field_values": "sample"}})
+    assert len(plan_server.requests) == 1
+    assert any(o is op for o in plans[0].operations)
+    for plan in plans:
+        for o in plan.operations:
+            assert browser.model_cache["Operation"][o.id] is o
+            for fv in o.field_values:
+                assert browser.model_cache["FieldValue"][fv.id] is fv
+                assert browser.model_cache["Sample"][fv.sample.id] is fv.sample
+
+
+def test_include_retrieve_rejected_include(fake_session, plans, monkeypatch):
+    """If the server does not return the models of the include, relations
+    are retrieved by the client."""
+    rows = make_server(5)
+    requests = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append(json_data)
+        if json_data.get("include", None):
+            return None
+        return [
+            row
+            for row in rows[json_data["model"]]
+            if row["plan_id"] in json_data["arguments"]["plan_id"]
+        ]
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    fake_session.browser.include_retrieve(plans, "plan_associations")
+    assert len(requests) == 2
+    assert [len(plan.plan_associations) for plan in plans] == [2] * 5
+
+
+def test_include_retrieve_skips_retrieved(fake_session, plans, plan_server):
+    relations = {"operations": {"field_values": "sample"}}
+    fake_session.browser.include_retrieve(plans, relations)
+    fake_session.browser.include_retrieve(plans, relations)
+    assert len(plan_server.requests) == 1
+
+    fake_session.browser.include_retrieve(plans, relations, force_refresh=True)
+    assert len(plan_server.requests) == 2
+
+
+def test_unknown_strategy(fake_session, plans):
+    with pytest.raises(BrowserException):
+        fake_session.browser.recursive_retrieve(plans, "operations", strategy="x")
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("strategy", ["client", "include"])
+def test_recursive_retrieve_benchmark(benchmark, fake_session, plan_server, strategy):
+    """Benchmark the client and include strategies of `recursive_retrieve`,
+    excluding HTTP.
+
+    The number of requests per retrieve is reported in the benchmark's
+    'extra_info'.
+    """
+    relations = {"operations": {"field_values": "sample"}}
+
+    def retrieve():
+        plans = [fake_session.Plan.load({"id": i}) for i in range(1, 6)]
+        fake_session.browser.recursive_retrieve(plans, relations, strategy=strategy)
+        return plans
+
+    plan_server.requests.clear()
+    check_plans(benchmark(retrieve))
+    if benchmark.stats:
+        benchmark.extra_info["requests_per_retrieve"] = len(plan_server.requests) / len(
+            benchmark.stats.stats.data
+        )
+
+
+@pytest.mark.benchmark
+def test_retrieve_links_benchmark(benchmark, fake_session, monkeypatch):
+    """Benchmark retrieving the samples of 50k field values, excluding
+    HTTP."""
+    num_links = 50000
+    sample_rows = [{"id": i, "name": "s{}".format(i)} for i in range(500)]
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        return [dict(row) for row in sample_rows]
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    field_values = [
+        fake_session.FieldValue.load({"id": i, "child_sample_id": i % 500})
+        for i in range(num_links)
+    ]
+
+    benchmark(fake_session.browser.retrieve, field_values, "sample")
+    for fv in field_values[:10]:
+        assert fv.sample.id == fv.child_sample_id
+    assert field_values[0].dump(include="sample")["sample"]["id"] == 0
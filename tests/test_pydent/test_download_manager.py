@@ -0,0 +1,111 @@
+import pytest
+import requests
+
+from pydent.aqhttp import AqHTTP
+from pydent.download_manager import DownloadManager
+from pydent.exceptions import AquariumModelNotFound
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+def test_download(fake_session, monkeypatch, tmp_path):
+    """Urls should be resolved with a single query, complete files should be
+    skipped if requested and partial files should be resumed."""
+    contents = {1: b"new file", 2: b"existing file", 3: b"partial file"}
+    uploads = [
+        fake_session.Upload.load(
+            {"id": i, "upload_file_name": "file.txt", "upload_file_size": len(c)}
+        )
+        for i, c in contents.items()
+    ]
+    (tmp_path / "2_file.txt").write_bytes(contents[2])
+    (tmp_path / "3_file.txt").write_bytes(contents[3][:4])
+
+    queries = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        queries.append(json_data)
+        return [
+            {"id": i, "expiring_url": "http://fake/{}".format(i)}
+            for i in json_data["arguments"]["id"]
+        ]
+
+    def mock_get(self, url, headers=None, **kwargs):
+        content = contents[int(url.split("/")[-1])]
+        if headers.get("Range"):
+            start = int(headers["Range"][len("bytes=") : -1])
+            return FakeResponse(content[start:], status_code=206)
+        return FakeResponse(content)
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+
+    manager = DownloadManager(fake_session, chunk_size=3)
+    filepaths = manager.download(uploads, outdir=str(tmp_path), skip_existing=True)
+
+    assert len(queries) == 1
+    assert sorted(queries[0]["arguments"]["id"]) == [1, 3]
+    for filepath, content in zip(filepaths, contents.values()):
+        with open(filepath, "rb") as f:
+            assert f.read() == content
+
+    metrics = manager.metrics
+    assert metrics["num_downloaded"] == 2
+    assert metrics["num_resumed"] == 1
+    assert metrics["num_skipped"] == 1
+    assert metrics["num_bytes"] == len(contents[1]) + len(contents[3]) - 4
+
+    # by default, overwriting downloads existing files again
+    manager = DownloadManager(fake_session)
+    manager.download(uploads, outdir=str(tmp_path))
+    assert sorted(queries[1]["arguments"]["id"]) == [1, 2, 3]
+    assert manager.metrics["num_skipped"] == 0
+
+    manager = DownloadManager(fake_session)
+    manager.download(uploads, outdir=str(tmp_path), overwrite=False)
+    assert manager.metrics["num_skipped"] == 3
+
+
+def test_download_with_missing_urls(fake_session, monkeypatch, tmp_path):
+    """Uploads without a resolved url should be reported after the other
+    files are downloaded."""
+    uploads = [
+        fake_session.Upload.load({"id": i, "upload_file_name": "file.txt"})
+        for i in range(1, 4)
+    ]
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        return [
+            {"id": 1, "expiring_url": "http://fake/1"},
+            {"id": 2, "expiring_url": None},
+        ]
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    monkeypatch.setattr(
+        requests.Session, "get", lambda self, url, **kwargs: FakeResponse(b"data")
+    )
+
+    manager = DownloadManager(fake_session)
+    assert manager.resolve_urls(uploads) == {1: "http://fake/1"}
+    with pytest.raises(AquariumModelNotFound) as e:
+        manager.download(uploads, outdir=str(tmp_path))
+    assert "[2, 3]" in str(e.value)
+    assert (tmp_path / "1_file.txt").read_bytes() == b"data"
+    assert manager.metrics["num_downloaded"] == 1
@@ -0,0 +1,175 @@
+import pytest
+
+from pydent.aqhttp import AqHTTP
+from pydent.hooks import HookException
+from pydent.hooks import Histogram
+from pydent.hooks import MetricsAggregator
+
+
+@pytest.fixture
+def mock_requests(monkeypatch, fake_response):
+    """Replaces requests with a fake server that responds with an empty JSON
+    object, or raises a ConnectionError for the 'down' path."""
+
+    class mock_request:
+        @staticmethod
+        def request(method, url, timeout=None, cookies=None, **kwargs):
+            if url.endswith("down"):
+                raise ConnectionError("server is down")
+            response = fake_response(method, url, {}, 200)
+            response._content = b"{}"
+            return response
+
+    monkeypatch.setattr("pydent.aqhttp.requests", mock_request)
+
+
+def test_histogram_percentiles():
+    histogram = Histogram((1, 2, 4))
+    for value in [0.5, 1.5, 1.5, 3, 10]:
+        histogram.observe(value)
+    assert histogram.count == 5
+    assert histogram.sum == 16.5
+    assert histogram.cumulative_counts() == [1, 3, 4, 5]
+    assert histogram.percentile(20) == 1
+    assert histogram.percentile(40) == 1.5
+    assert histogram.percentile(70) == 3
+    # percentiles beyond the last bucket return the last bound
+    assert histogram.percentile(99) == 4
+    assert Histogram((1,)).percentile(50) is None
+
+
+def test_register_and_unregister(fake_session):
+    events = []
+    hook = fake_session.hooks.register(
+        lambda event, data: events.append(event), events=["cache_hit"]
+    )
+    assert fake_session.hooks.enabled
+    fake_session.hooks.emit("cache_hit", {})
+    fake_session.hooks.emit("cache_miss", {})
+    assert events == ["cache_hit"]
+
+    fake_session.hooks.unregister(hook)
+    assert not fake_session.hooks.enabled
+    fake_session.hooks.emit("cache_hit", {})
+    assert events == ["cache_hit"]
+
+    with pytest.raises(HookException):
+        fake_session.hooks.register(hook, events=["not_an_event"])
+
+
+def test_request_hooks(fake_session, mock_requests):
+    events = []
+    fake_session.hooks.register(lambda event, data: events.append((event, data)))
+    assert fake_session._aqhttp.post("json", json_data={"model": "Sample"}) == {}
+    with pytest.raises(ConnectionError):
+        fake_session._aqhttp.get("down")
+
+    assert [e[0] for e in events] == [
+        "request_start",
+        "request_end",
+        "request_start",
+        "request_end",
+    ]
+    assert events[0][1] == dict(method="POST", path="json", model="Sample")
+    end = events[1][1]
+    assert end["status"] == 200
+    assert end["num_bytes"] == 2
+    assert end["error"] is None
+    assert end["seconds"] >= 0
+    assert end["model"] == "Sample"
+    end = events[3][1]
+    assert end["model"] is None
+    assert end["status"] is None
+    assert end["error"] == "ConnectionError"
+
+
+def test_no_hooks(fake_session, mock_requests, monkeypatch):
+    """Without hooks, requests skip building events."""
+
+    def hooked_request(*args, **kwargs):
+        raise AssertionError("hooks are not registered")
+
+    monkeypatch.setattr(AqHTTP, "_hooked_request", hooked_request)
+    assert fake_session._aqhttp.post("json", json_data={}) == {}
+
+
+def test_browser_hooks(fake_session, monkeypatch):
+    rows = {
+        "Sample": [{"id": i, "sample_type_id": 1} for i in range(1, 4)],
+        "SampleType": [{"id": 1}],
+    }
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        ids = json_data["arguments"]["id"]
+        if not isinstance(ids, list):
+            ids = [ids]
+        return [row for row in rows[json_data["model"]] if row["id"] in ids]
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    metrics = fake_session.hooks.register(MetricsAggregator())
+
+    browser = fake_session.browser
+    samples = browser.where({"id": [1, 2]}, "Sample")
+    browser.where({"id": [1, 2, 3]}, "Sample")
+    browser.retrieve(samples, "sample_type")
+
+    summary = metrics.summary()
+    assert summary["cache_hits_total"] == [dict(model="Sample", value=2)]
+    assert summary["cache_misses_total"] == [
+        dict(model="Sample", value=3),
+        dict(model="SampleType", value=1),
+    ]
+    assert summary["cache_models"] == [
+        dict(model="Sample", value=3),
+        dict(model="SampleType", value=1),
+    ]
+    (batch,) = summary["retrieve_batch_size"]
+    assert batch["model"] == "Sample"
+    assert batch["relationship"] == "sample_type"
+    assert batch["count"] == 1
+    assert batch["sum"] == 2
+
+
+def test_find_cache_miss(fake_session, monkeypatch):
+    """Cache misses of find count the models returned by the server."""
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        if json_data["id"] == 1:
+            return {"id": 1}
+        return None
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    events = []
+    fake_session.hooks.register(
+        lambda event, data: events.append(data["num_models"]), events=["cache_miss"]
+    )
+
+    browser = fake_session.browser
+    assert browser.find(1, "Sample").id == 1
+    assert browser.find(2, "Sample") is None
+    assert events == [1, 0]
+
+
+def test_to_prometheus(fake_session, mock_requests):
+    metrics = MetricsAggregator(latency_buckets=(1, 10))
+    fake_session.hooks.register(metrics)
+    fake_session._aqhttp.post("json", json_data={})
+    fake_session._aqhttp.post("json", json_data={})
+    metrics("cache_hit", {"model": 'a"b', "num_models": 1})
+
+    text = metrics.to_prometheus()
+    lines = text.splitlines()
+    assert "# TYPE pydent_requests_total counter" in lines
+    assert 'pydent_requests_total{method="POST",status="200"} 2' in lines
+    assert 'pydent_response_bytes_total{method="POST"} 4' in lines
+    assert "# TYPE pydent_request_duration_seconds histogram" in lines
+    assert 'pydent_request_duration_seconds_bucket{method="POST",le="1"} 2' in lines
+    assert 'pydent_request_duration_seconds_bucket{method="POST",le="+Inf"} 2' in lines
+    assert 'pydent_request_duration_seconds_count{method="POST"} 2' in lines
+    assert 'pydent_cache_hits_total{model="a\\"b"} 1' in lines
+    # metrics without observations are not exported
+    assert "pydent_retrieve_batch_size" not in text
+    assert text.endswith("\n")
+
+    metrics.reset()
+    assert metrics.to_prometheus() == ""
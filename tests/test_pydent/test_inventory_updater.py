@@ -0,0 +1,109 @@
+import itertools
+
+import pytest
+
+from pydent.browser import Browser
+from pydent.interfaces import UtilityInterface
+from pydent.inventory_updater import dependency_levels
+from pydent.inventory_updater import models_to_graph
+from pydent.inventory_updater import save_inventory
+from pydent.inventory_updater import to_node
+from pydent.models import Item
+from pydent.models import Sample
+
+
+@pytest.fixture(scope="function")
+def inventory(fake_session):
+    """An unsaved item of a fragment which uses a primer."""
+    ot = fake_session.ObjectType.load({"id": 1, "rows": None})
+    primer = fake_session.Sample.load({"name": "primer"})
+    fragment = fake_session.Sample.load({"name": "fragment"})
+    fv = fake_session.FieldValue.load({"name": "Forward Primer", "role": None})
+    fv.sample = primer
+    fragment.field_values = [fv]
+    primer.field_values = []
+    item = fake_session.Item.load({"object_type_id": 1})
+    item.object_type = ot
+    item.sample = fragment
+    return item, fragment, primer
+
+
+def test_models_to_graph(fake_session, inventory):
+    """Unsaved samples and items are visited through their deserialized
+    relationships."""
+    item, fragment, primer = inventory
+    graph = models_to_graph(fake_session, [item])
+    assert set(graph.nodes) == {to_node(item), to_node(fragment), to_node(primer)}
+    assert set(graph.edges) == {
+        (to_node(item), to_node(fragment)),
+        (to_node(fragment), to_node(primer)),
+    }
+
+
+def test_models_to_graph_retrieves_levels(fake_session, monkeypatch):
+    """Relationships of saved models are retrieved once per level."""
+    ot = fake_session.ObjectType.load({"id": 1, "rows": None})
+    calls = []
+
+    def retrieve(self, models, relationship_name, *args, **kwargs):
+        calls.append((relationship_name, len(models)))
+        for m in models:
+            setattr(m, relationship_name, ot)
+        return [ot]
+
+    monkeypatch.setattr(Browser, "retrieve", retrieve)
+
+    items = [
+        fake_session.Item.load({"id": i, "object_type_id": 1, "sample_id": None})
+        for i in range(1, 11)
+    ]
+    graph = models_to_graph(fake_session, items)
+    assert len(graph.nodes) == 10
+    assert calls == [("object_type", 10)]
+
+
+def test_dependency_levels(fake_session, inventory):
+    item, fragment, primer = inventory
+    other = fake_session.Sample.load({"name": "other"})
+    graph = models_to_graph(fake_session, [item, other])
+    levels = dependency_levels(graph)
+    assert [sorted(level) for level in levels] == [
+        sorted([to_node(primer), to_node(other)]),
+        [to_node(fragment)],
+        [to_node(item)],
+    ]
+
+
+def test_save_inventory(fake_session, inventory, monkeypatch):
+    item, fragment, primer = inventory
+    other = fake_session.Sample.load({"name": "other"})
+    ids = itertools.count(1)
+    saved = []
+
+    def create_samples(self, samples):
+        saved.append([s.name for s in samples])
+        for s in samples:
+            s.id = next(ids)
+        return samples
+
+    def save_item(self):
+        saved.append(["item"])
+        self.id = next(ids)
+
+    monkeypatch.setattr(UtilityInterface, "create_samples", create_samples)
+    monkeypatch.setattr(Sample, "is_savable", lambda self, do_raise: (True, []))
+    monkeypatch.setattr(Item, "save", save_item)
+
+    progress = []
+    new_inventory = save_inventory(
+        fake_session, [item, other], chunk_size=10, callback=progress.append
+    )
+    assert len(new_inventory) == 4
+    assert [sorted(names) for names in saved] == [
+        ["other", "primer"],
+        ["fragment"],
+        ["item"],
+    ]
+    assert [p["num_saved"] for p in progress] == [2, 3, 4]
+    assert all(p["num_models"] == 4 for p in progress)
+    assert all(m.id for m in new_inventory)
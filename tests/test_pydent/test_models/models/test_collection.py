@@ -1,4 +1,215 @@
-from pydent.models import Collection
+import pytest
 
+from pydent.aqhttp import AqHTTP
+from pydent.models import Collection
 
 # TODO: mock tests for Collections and Parts
+
+
+@pytest.fixture
+def example_collection(fake_session):
+    return fake_session.Collection.load(
+        {
+            "id": 1,
+            "dimensions": [2, 3],
+            "part_associations": [
+                {"id": 2, "row": 0, "column": 1, "part": {"id": 3, "sample_id": 7}},
+                {"id": 4, "row": 1, "column": 2, "part": {"id": 5, "sample_id": 8}},
+            ],
+        }
+    )
+
+
+def test_sample_id_matrix(example_collection):
+    assert isinstance(example_collection, Collection)
+    assert example_collection.matrix[:, :] == [[None, 7, None], [None, None, 8]]
+    assert example_collection[1, 2] == 8
+    assert example_collection.part(0, 1).id == 3
+
+
+def test_matrix_views_are_cached(example_collection):
+    mapping = example_collection._mapping
+    assert example_collection._mapping is mapping
+
+    example_collection._reset_mapping()
+    assert example_collection._mapping is not mapping
+
+
+def test_matrix_cache_is_reset_with_new_part_associations(example_collection):
+    assert example_collection[0, 1] == 7
+    example_collection.part_associations = [
+        example_collection.session.PartAssociation.load(
+            {"id": 6, "row": 0, "column": 0, "part": {"id": 7, "sample_id": 9}}
+        )
+    ]
+    assert example_collection.matrix[:, :] == [[9, None, None], [None, None, None]]
+
+
+def test_retrieve_collections(fake_session, monkeypatch):
+    """Part associations, parts, samples and data associations of many
+    collections should be retrieved with one query each."""
+    collections = [
+        fake_session.Collection.load({"id": i, "dimensions": [1, 2]})
+        for i in range(1, 4)
+    ]
+    server = {
+        "PartAssociation": [
+            {"id": 10 + i, "collection_id": i, "part_id": 20 + i, "row": 0, "column": 1}
+            for i in range(1, 4)
+        ],
+        "Item": [{"id": 20 + i, "sample_id": 30 + i} for i in range(1, 4)],
+        "Sample": [{"id": 30 + i, "name": "s{}".format(i)} for i in range(1, 4)],
+        "DataAssociation": [
+            {
+                "id": 40 + i,
+                "parent_id": 20 + i,
+                "parent_class": "Item",
+                "key": "key",
+                "object": '{"key": %d}' % i,
+            }
+            for i in range(1, 4)
+        ],
+    }
+    requests = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append(json_data["model"])
+        return server[json_data["model"]]
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    fake_session.browser.retrieve_collections(collections)
+    assert sorted(requests) == ["DataAssociation", "Item", "PartAssociation", "Sample"]
+
+    for i, collection in enumerate(collections, 1):
+        assert collection.sample_id_matrix[:, :] == [[None, 30 + i]]
+        assert collection.sample_matrix[0, 1].name == "s{}".format(i)
+        assert collection.data_matrix[0, 1] == {"key": i}
+    assert len(requests) == 4
+
+
+@pytest.fixture
+def buffered_collection(fake_session, monkeypatch):
+    """A saved collection with a server that records requests in
+    'collection.requests'."""
+    collection = fake_session.Collection.load(
+        {
+            "id": 1,
+            "dimensions": [1, 3],
+            "part_associations": [
+                {"id": 2, "row": 0, "column": 0, "part": {"id": 3, "sample_id": 7}},
+                {"id": 4, "row": 0, "column": 1, "part": {"id": 5, "sample_id": 8}},
+            ],
+        }
+    )
+    requests = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append(path)
+        if path == "json" and json_data["method"] == "where":
+            return [
+                {
+                    "id": 50,
+                    "parent_id": 5,
+                    "parent_class": "Item",
+                    "key": "a",
+                    "object": '{"a": 2}',
+                }
+            ]
+        elif path == "json/save":
+            return dict(json_data, id=60)
+        return {}
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    monkeypatch.setattr(
+        Collection, "refresh", lambda self: requests.append("refresh") or self
+    )
+    collection.requests = requests
+    return collection
+
+
+def test_write_buffer(buffered_collection):
+    collection = buffered_collection
+    with collection.write_buffer() as buffer:
+        collection.assign_sample(9, [(0, 0)])
+        collection.assign_sample(9, [(0, 2)])
+        collection.remove_sample([(0, 1)])
+        collection.data_matrix[0, :2] = {"a": 2}
+        assert collection.requests == []
+
+    assert sorted(collection.requests) == [
+        "collections/1/assign_sample",
+        "collections/1/delete_selection",
+        "json",
+        "json/save",
+        "refresh",
+    ]
+    assert buffer.num_requests == 5
+    assert buffer.num_unbuffered_requests == 11
+    assert buffer.requests_saved == 6
+    assert collection.part(0, 0).get("a") == 2
+
+
+def test_write_buffer_assign_then_associate(buffered_collection, monkeypatch):
+    """Data assigned to a location whose sample is assigned in the same buffer
+    should be saved after the new part is created."""
+    collection = buffered_collection
+    requests = collection.requests
+
+    def refresh(self):
+        requests.append("refresh")
+        self.part_associations = self.part_associations + [
+            self.session.PartAssociation.load(
+                {"id": 6, "row": 0, "column": 2, "part": {"id": 7, "sample_id": 9}}
+            )
+        ]
+        return self
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append(path)
+        if path == "json/save":
+            return dict(json_data, id=60)
+        return [] if path == "json" else {}
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    monkeypatch.setattr(Collection, "refresh", refresh)
+    with collection.write_buffer() as buffer:
+        collection.assign_sample(9, [(0, 2)])
+        collection.data_matrix[0, 2] = {"a": 3}
+        assert buffer.diff() == [
+            {"row": 0, "column": 2, "key": "sample_id", "old": None, "new": 9},
+            {"row": 0, "column": 2, "key": "a", "old": None, "new": 3},
+        ]
+        assert requests == []
+
+    assert requests == [
+        "collections/1/assign_sample",
+        "refresh",
+        "json",
+        "json/save",
+    ]
+    assert buffer.num_requests == 4
+    assert collection.part(0, 2).get("a") == 3
+
+
+def test_write_buffer_associate_without_sample(buffered_collection):
+    collection = buffered_collection
+    with pytest.raises(ValueError):
+        with collection.write_buffer():
+            collection.data_matrix[0, 2] = {"a": 3}
+
+
+def test_write_buffer_dry_run(buffered_collection):
+    collection = buffered_collection
+    with collection.write_buffer(dry_run=True) as buffer:
+        collection.assign_sample(7, [(0, 0)])
+        collection.remove_sample([(0, 1)])
+        collection.associate_to("a", 3, 0, 1)
+
+    assert buffer.diff() == [
+        {"row": 0, "column": 1, "key": "sample_id", "old": 8, "new": None},
+        {"row": 0, "column": 1, "key": "a", "old": 2, "new": 3},
+    ]
+    # the data associations of the part are loaded once to compare them
+    assert collection.requests == ["json"]
+    assert len(buffer.diff()) == 2
+    assert collection.requests == ["json"]
@@ -0,0 +1,54 @@
+from pydent.aqhttp import AqHTTP
+
+
+def test_object_is_decoded_lazily(fake_session):
+    da = fake_session.DataAssociation.load({"id": 1, "key": "a", "object": '{"a": 1}'})
+    assert not da.is_deserialized("object")
+    assert da.dump()["object"] == '{"a": 1}'
+
+    assert da.value == 1
+    assert da.is_deserialized("object")
+    assert da.object == {"a": 1}
+
+
+def test_set_object(fake_session):
+    da = fake_session.DataAssociation.load({"id": 1, "key": "a", "object": "{}"})
+    da.value = 2
+    assert da.object == {"a": 2}
+    assert da.dump()["object"] == '{"a": 2}'
+
+
+def test_save_data_associations(fake_session, monkeypatch):
+    """Existing data associations should be retrieved with one query per
+    model class and changed associations should be saved."""
+    items = [fake_session.Item.load({"id": i}) for i in range(1, 3)]
+    operation = fake_session.Operation.load({"id": 3})
+    requests = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append(path)
+        if path == "json/save":
+            return dict(json_data, id=json_data.get("id", None) or 100)
+        if json_data["arguments"]["parent_class"] == ["Item"]:
+            return [
+                {
+                    "id": 10,
+                    "parent_id": 1,
+                    "parent_class": "Item",
+                    "key": "a",
+                    "object": '{"a": 0}',
+                }
+            ]
+        return []
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    associations = fake_session.utils.save_data_associations(
+        [(items[0], "a", 1), (items[1], "a", 2), (operation, "b", 3)]
+    )
+
+    assert requests.count("json") == 2
+    assert requests.count("json/save") == 3
+    assert [a.value for a in associations] == [1, 2, 3]
+    assert associations[0].id == 10
+    assert [a.parent_id for a in associations] == [1, 2, 3]
+    assert items[1].data_associations == [associations[1]]
@@ -1,5 +1,7 @@
 import pytest
 
+from pydent.aqhttp import AqHTTP
+from pydent.exceptions import AquariumModelError
 from pydent.models import Plan
 
 
@@ -79,6 +81,105 @@ def test_wire(fake_plan):
     print(p.wires)
 
 
+def test_validate(fake_plan):
+    p, src, dest = fake_plan
+
+    p.add_operations([src.operation, dest.operation])
+    p.wire(src, dest)
+    assert p.validate() == []
+
+
+def test_validate_missing_operation(fake_plan):
+    p, src, dest = fake_plan
+
+    p.add_operation(src.operation)
+    p.wire(src, dest)
+    assert len(p.validate(raise_error=False)) == 1
+    with pytest.raises(AquariumModelError):
+        p.validate()
+
+
+def test_validate_incremental_detects_removed_operation(fake_plan):
+    """Incremental validation should skip validated wires, but still catch
+    wires whose operations were removed since the last validation."""
+    p, src, dest = fake_plan
+
+    p.add_operations([src.operation, dest.operation])
+    p.wire(src, dest)
+    assert p.validate(incremental=True) == []
+    assert p.validate(incremental=True) == []
+
+    p.operations = [src.operation]
+    assert len(p.validate(raise_error=False, incremental=True)) == 1
+
+
+def test_validate_incremental_walks_changed_operations(fake_plan, monkeypatch):
+    """Incremental validation should only walk the field values of
+    operations that changed since the last validation."""
+    p, src, dest = fake_plan
+    op1, op2 = src.operation, dest.operation
+
+    p.add_operations([op1, op2])
+    p.wire(src, dest)
+    assert p.validate(incremental=True) == []
+
+    walked = []
+    operation_state = Plan._operation_state
+
+    def record_state(op):
+        walked.append(op)
+        return operation_state(op)
+
+    monkeypatch.setattr(Plan, "_operation_state", staticmethod(record_state))
+    assert p.validate(incremental=True) == []
+    assert walked == []
+
+    # resizing the field values of an operation
+    op2.field_values.pop()
+    assert len(p.validate(raise_error=False, incremental=True)) == 1
+    op2.field_values.append(dest)
+
+    # replacing a field value in place requires marking the operation dirty
+    walked.clear()
+    assert p.validate(incremental=True) == []
+    assert walked == [op1, op2]
+    walked.clear()
+    op1.field_values[0] = dest.copy()
+    op1.mark_dirty()
+    assert len(p.validate(raise_error=False, incremental=True)) == 1
+    assert walked[0] is op1
+
+
+def test_to_save_json_runs_full_validation(fake_plan):
+    """Saving should catch field values replaced in place, which incremental
+    validation does not detect."""
+    p, src, dest = fake_plan
+    op2 = dest.operation
+
+    p.add_operations([src.operation, op2])
+    p.wire(src, dest)
+    assert p.validate(incremental=True) == []
+
+    op2.field_values[0] = dest.copy()
+    with pytest.raises(AquariumModelError):
+        p.to_save_json()
+
+
+def test_to_save_json_removes_redundant_wires(fake_plan):
+    p, src, dest = fake_plan
+
+    p.add_operations([src.operation, dest.operation])
+    p.wire(src, dest)
+    p.wire(src, dest)
+    assert len(p.wires) == 2
+
+    save_json = p.to_save_json()
+    assert len(save_json["operations"]) == 2
+    assert len(save_json["wires"]) == 1
+    assert save_json["wires"][0]["from"]["rid"] == src.rid
+    assert save_json["wires"][0]["to"]["rid"] == dest.rid
+
+
 def test_plan_copy(example_plan):
     """Copying plans should anonymize operations and wires."""
 
@@ -212,3 +313,43 @@ def test_plan_copy(example_plan):
 #         if op.operation_type.name == "Make PCR Fragment":
 #             op.set_input('Template', item=session.Item.find(57124))
 #             newplan.patch(newplan.to_save_json())
+
+
+def test_all_data_associations(fake_session, monkeypatch):
+    """Data associations should be retrieved with one query per model
+    class."""
+    plan = fake_session.Plan.load(
+        {
+            "id": 1,
+            "operations": [
+                {
+                    "id": 2,
+                    "field_values": [
+                        {"id": 4, "child_item_id": 3, "item": {"id": 3}},
+                        {"id": 5, "child_item_id": None, "item": None},
+                    ],
+                }
+            ],
+        }
+    )
+    requests = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append(json_data)
+        args = json_data["arguments"]
+        return [
+            {
+                "id": 10 + parent_id,
+                "parent_id": parent_id,
+                "parent_class": args["parent_class"][0],
+                "key": "key",
+                "object": "{}",
+            }
+            for parent_id in args["parent_id"]
+        ]
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    das = plan.all_data_associations()
+    assert [da.id for da in das] == [11, 12, 13]
+    assert len(requests) == 3
+    assert plan.data_associations == [das[0]]
@@ -1,5 +1,10 @@
 import pytest
 
+from pydent.aqhttp import AqHTTP
+from pydent.exceptions import AquariumModelError
+from pydent.interfaces import UtilityInterface
+from pydent.models import Sample
+
 
 def test_update_properties(example_sample):
     """Tests if sample properties can be updated and reset."""
@@ -79,3 +84,170 @@ def test_copy_sample(example_sample):
     assert not id(copied.properties["Reverse Primer"]) == id(
         example_sample.properties["Reverse Primer"]
     )
+
+
+@pytest.fixture(scope="function")
+def make_sample(fake_session):
+    """Returns a function that creates new samples of a sample type without
+    properties."""
+
+    def make_sample(name, sample_type_id=4, sample_id=None):
+        return fake_session.Sample.load(
+            {
+                "id": sample_id,
+                "name": name,
+                "project": "project",
+                "description": "description",
+                "sample_type_id": sample_type_id,
+                "sample_type": {
+                    "id": sample_type_id,
+                    "name": "Primer",
+                    "field_types": [],
+                },
+                "field_values": [],
+            }
+        )
+
+    return make_sample
+
+
+def test_merge_samples(fake_session, make_sample, monkeypatch):
+    """Existing samples should be found with a single query, new samples
+    should be created with a single request and existing samples should be
+    merged."""
+    existing = make_sample("existing", sample_id=10)
+    requests = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        requests.append((path, json_data))
+        if path == "json":
+            return [
+                existing.dump(
+                    include={"sample_type": "field_types", "field_values": {}}
+                )
+            ]
+        elif path == "browser/create_samples":
+            return {
+                "samples": [
+                    dict(s, id=i + 1) for i, s in enumerate(json_data["samples"])
+                ]
+            }
+
+    updated = []
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    monkeypatch.setattr(
+        UtilityInterface,
+        "update_samples",
+        lambda self, samples: updated.extend(s.id for s in samples),
+    )
+
+    to_merge = make_sample("existing")
+    to_merge.description = "merged description"
+    to_create = [make_sample("new1"), make_sample("new2")]
+
+    results = fake_session.utils.merge_samples([to_merge] + to_create)
+    assert results == [True, False, False]
+    assert [r[0] for r in requests] == ["json", "browser/create_samples"]
+    assert sorted(requests[0][1]["arguments"]["name"]) == ["existing", "new1", "new2"]
+    assert updated == [10]
+    assert to_merge.id == 10
+    assert to_merge.description == "merged description"
+    assert [s.id for s in to_create] == [1, 2]
+
+
+def test_merge_samples_with_duplicate_new_names(fake_session, make_sample, monkeypatch):
+    """New samples sharing a name within the batch should be created once and
+    the later duplicates merged into the first one."""
+    created = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        if path == "json":
+            return []
+        elif path == "browser/create_samples":
+            created.extend(s["name"] for s in json_data["samples"])
+            return {
+                "samples": [
+                    dict(s, id=i + 1) for i, s in enumerate(json_data["samples"])
+                ]
+            }
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    monkeypatch.setattr(UtilityInterface, "update_samples", lambda self, s: None)
+
+    first = make_sample("new")
+    duplicate = make_sample("new")
+    duplicate.description = "duplicate description"
+    other = make_sample("other")
+
+    results = fake_session.utils.merge_samples([first, duplicate, other])
+    assert results == [False, True, False]
+    assert created == ["new", "other"]
+    assert first.id == duplicate.id == 1
+    assert first.description == duplicate.description == "duplicate description"
+    assert other.id == 2
+
+
+def test_merge_samples_with_duplicate_new_names_of_different_sample_type(
+    fake_session, make_sample, monkeypatch
+):
+    monkeypatch.setattr(AqHTTP, "post", lambda *args, **kwargs: [])
+
+    with pytest.raises(AquariumModelError):
+        fake_session.utils.merge_samples(
+            [make_sample("new"), make_sample("new", sample_type_id=5)]
+        )
+
+
+def test_merge_samples_with_different_sample_type(
+    fake_session, make_sample, monkeypatch
+):
+    existing = make_sample("existing", sample_type_id=5, sample_id=10)
+    monkeypatch.setattr(AqHTTP, "post", lambda *args, **kwargs: [existing.dump()])
+
+    with pytest.raises(AquariumModelError):
+        make_sample("existing").merge()
+
+
+def test_update_samples(fake_session, make_sample, monkeypatch):
+    """Field values of all samples should be saved and the server field
+    values that no longer belong to a sample should be found with a single
+    query and detached."""
+    samples = [make_sample("s1", sample_id=1), make_sample("s2", sample_id=2)]
+    for i, sample in enumerate(samples):
+        sample.field_values = [
+            fake_session.FieldValue.load(
+                {"id": 100 + i, "parent_id": sample.id, "parent_class": "Sample"}
+            )
+        ]
+
+    queries = []
+
+    def mock_post(self, path, json_data=None, **kwargs):
+        queries.append(json_data)
+        return [
+            {"id": 100, "parent_id": 1, "parent_class": "Sample"},
+            {"id": 101, "parent_id": 2, "parent_class": "Sample"},
+            {"id": 102, "parent_id": 2, "parent_class": "Sample"},
+        ]
+
+    saved = []
+
+    def json_save(self, model_name, model_data, *args, **kwargs):
+        saved.append((model_name, model_data["id"], model_data.get("parent_id")))
+        return model_data
+
+    monkeypatch.setattr(AqHTTP, "post", mock_post)
+    monkeypatch.setattr(UtilityInterface, "json_save", json_save)
+
+    with pytest.warns(UserWarning):
+        assert fake_session.utils.update_samples(samples) == samples
+
+    assert len(queries) == 1
+    assert queries[0]["arguments"]["parent_id"] == [1, 2]
+    assert sorted(saved) == [
+        ("FieldValue", 100, 1),
+        ("FieldValue", 101, 2),
+        ("FieldValue", 102, None),
+        ("Sample", 1, None),
+        ("Sample", 2, None),
+    ]
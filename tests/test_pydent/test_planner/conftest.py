@@ -0,0 +1,68 @@
+import pytest
+
+from pydent.planner import Planner
+
+
+@pytest.fixture(autouse=True)
+def no_planner_cache(monkeypatch):
+    """Planners normally cache their plans using the browser, which requires
+    a server.
+
+    Here, only collect the wires from the field values.
+    """
+
+    def cache(self):
+        plan = self.plan
+        wire_dict = {}
+        for op in plan.operations or []:
+            for fv in op.field_values or []:
+                for w in (fv.wires_as_dest or []) + (fv.wires_as_source or []):
+                    wire_dict.setdefault(w._primary_key, w)
+        if plan.is_deserialized("wires"):
+            for w in plan.wires:
+                wire_dict.setdefault(w._primary_key, w)
+        plan.wires = list(wire_dict.values())
+
+    monkeypatch.setattr(Planner, "cache", cache)
+
+
+@pytest.fixture(scope="function")
+def make_chain(fake_session):
+    """Returns a function that adds a new chain of 'num_ops' wired operations to
+    a plan."""
+
+    def make_chain(plan, num_ops):
+        ops = []
+        for _ in range(num_ops):
+            op = fake_session.Operation.load({"operation_type_id": 1})
+            fvs = [
+                fake_session.FieldValue.load(
+                    {"name": "in", "role": "input", "parent_class": "Operation"}
+                ),
+                fake_session.FieldValue.load(
+                    {"name": "out", "role": "output", "parent_class": "Operation"}
+                ),
+            ]
+            for fv in fvs:
+                fv.operation = op
+                fv.wires_as_dest = []
+                fv.wires_as_source = []
+            op.field_values = fvs
+            plan.add_operation(op)
+            ops.append(op)
+        for op1, op2 in zip(ops[:-1], ops[1:]):
+            plan.wire(op1.outputs[0], op2.inputs[0])
+        return ops
+
+    return make_chain
+
+
+@pytest.fixture(scope="function")
+def offline_planner(fake_session, make_chain):
+    """A planner with three independent chains of 2, 3 and 4 operations."""
+    plan = fake_session.Plan.new()
+    plan.operations = []
+    plan.wires = []
+    for num_ops in [2, 3, 4]:
+        make_chain(plan, num_ops)
+    return Planner(plan)
@@ -0,0 +1,54 @@
+import pytest
+
+from pydent.planner.planner import AFTMatcher
+
+
+@pytest.fixture(scope="function")
+def make_field_type(fake_session):
+    def make_field_type(role, keys, part=False):
+        ft = fake_session.FieldType.load({"name": "ft", "role": role, "part": part})
+        ft.allowable_field_types = [
+            fake_session.AllowableFieldType.load(
+                {"sample_type_id": st_id, "object_type_id": ot_id}
+            )
+            for st_id, ot_id in keys
+        ]
+        return ft
+
+    return make_field_type
+
+
+def test_find_matching_afts(make_field_type):
+    src = make_field_type("output", [(1, 1), (1, 2), (2, 2)])
+    dest = make_field_type("input", [(2, 2), (3, 3), (1, 1)])
+
+    pairs = AFTMatcher._find_matching_afts(src, dest)
+    keys = [
+        (src_aft.sample_type_id, src_aft.object_type_id, dest_aft.sample_type_id)
+        for src_aft, dest_aft in pairs
+    ]
+    assert keys == [(2, 2, 2), (1, 1, 1)]
+
+
+def test_find_matching_afts_part(make_field_type):
+    src = make_field_type("output", [(1, 1)], part=True)
+    dest = make_field_type("input", [(1, 1)], part=False)
+    assert AFTMatcher._find_matching_afts(src, dest) == []
+
+    dest = make_field_type("input", [(1, 1)], part=True)
+    assert len(AFTMatcher._find_matching_afts(src, dest)) == 1
+
+
+def test_aft_index_is_cached(fake_session, make_field_type):
+    ft = make_field_type("output", [(1, 1), (1, 1), (2, 2)])
+    index = AFTMatcher._aft_index(ft)
+    assert len(index[(1, 1, False)]) == 2
+    assert AFTMatcher._aft_index(ft) is index
+
+    # the index is rebuilt if the allowable field types change
+    ft.allowable_field_types.append(
+        fake_session.AllowableFieldType.load({"sample_type_id": 3, "object_type_id": 3})
+    )
+    new_index = AFTMatcher._aft_index(ft)
+    assert new_index is not index
+    assert (3, 3, False) in new_index
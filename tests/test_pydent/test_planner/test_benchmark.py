@@ -0,0 +1,25 @@
+import pytest
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("num_ops", [100, 1000])
+def test_plan_save_json_benchmark(benchmark, fake_session, make_chain, num_ops):
+    """Benchmark the serialization of a plan for saving.
+
+    The mean time per 1000 operations is reported in the benchmark's
+    'extra_info'.
+    """
+    plan = fake_session.Plan.new()
+    plan.operations = []
+    plan.wires = []
+    for _ in range(num_ops // 10):
+        make_chain(plan, 10)
+
+    save_json = benchmark(plan.to_save_json)
+    assert len(save_json["operations"]) == num_ops
+    assert len(save_json["wires"]) == num_ops - num_ops // 10
+
+    if benchmark.stats:
+        benchmark.extra_info["seconds_per_1k_operations"] = (
+            benchmark.stats.stats.mean * 1000.0 / num_ops
+        )
@@ -0,0 +1,114 @@
+import itertools
+
+import pytest
+
+from pydent.interfaces import UtilityInterface
+
+
+@pytest.fixture(scope="function")
+def saved_planner(offline_planner, monkeypatch):
+    """An offline planner that pretends to be saved on the server.
+
+    Requests are recorded in 'planner.requests'.
+    """
+    planner = offline_planner
+    ids = itertools.count(1)
+    planner.plan.id = next(ids)
+    for op in planner.plan.operations:
+        op.id = next(ids)
+        for fv in op.field_values:
+            fv.id = next(ids)
+    for wire in planner.plan.wires:
+        wire.id = next(ids)
+    planner.plan.mark_clean()
+
+    requests = []
+
+    def json_save(self, model_name, model_data, *args, **kwargs):
+        requests.append(("save", model_name, model_data))
+        if model_name == "Wire" and "id" not in model_data:
+            return dict(model_data, id=next(ids))
+        return model_data
+
+    def json_delete(self, model_name, model_data, *args, **kwargs):
+        requests.append(("delete", model_name, model_data))
+
+    def save():
+        requests.append(("save", "Plan", None))
+
+    monkeypatch.setattr(UtilityInterface, "json_save", json_save)
+    monkeypatch.setattr(UtilityInterface, "json_delete", json_delete)
+    monkeypatch.setattr(planner.plan, "save", save)
+    planner.requests = requests
+    return planner
+
+
+def test_no_changes(saved_planner):
+    assert saved_planner.plan.get_changes() == {
+        "field_values": [],
+        "wires": [],
+        "removed_wires": [],
+    }
+    saved_planner.save()
+    assert saved_planner.requests == []
+
+
+def test_never_marked_clean(offline_planner):
+    assert offline_planner.plan.get_changes() is None
+
+
+def test_save_changed_field_value(saved_planner):
+    fv = saved_planner.plan.operations[0].field_values[0]
+    fv.value = 5
+    changes = saved_planner.plan.get_changes()
+    assert changes["field_values"] == [fv]
+
+    saved_planner.save()
+    assert len(saved_planner.requests) == 1
+    method, model_name, model_data = saved_planner.requests[0]
+    assert (method, model_name) == ("save", "FieldValue")
+    assert model_data["id"] == fv.id
+    assert model_data["value"] == 5
+
+    # the plan is clean again
+    assert saved_planner.plan.get_changes()["field_values"] == []
+
+
+def test_save_added_and_removed_wires(saved_planner):
+    ops = saved_planner.plan.operations
+    removed_wire = saved_planner.plan.wires[0]
+    saved_planner.remove_wire(removed_wire.source, removed_wire.destination)
+    new_wire = saved_planner.plan.wire(ops[1].outputs[0], ops[2].inputs[0])
+
+    changes = saved_planner.plan.get_changes()
+    assert changes["wires"] == [new_wire]
+    assert changes["removed_wires"] == [removed_wire]
+
+    saved_planner.save()
+    assert [r[:2] for r in saved_planner.requests] == [
+        ("delete", "Wire"),
+        ("save", "Wire"),
+    ]
+    assert saved_planner.requests[0][2] == {"id": removed_wire.id}
+    assert new_wire.id is not None
+
+
+def test_full_save_on_new_operation(saved_planner, make_chain):
+    make_chain(saved_planner.plan, 1)
+    assert saved_planner.plan.get_changes() is None
+    saved_planner.save()
+    assert saved_planner.requests == [("save", "Plan", None)]
+
+
+def test_full_save_on_many_changes(saved_planner):
+    for op in saved_planner.plan.operations:
+        for fv in op.field_values:
+            fv.value = 1
+    saved_planner.save()
+    assert saved_planner.requests == [("save", "Plan", None)]
+
+
+def test_full_save_when_not_differential(saved_planner):
+    saved_planner.plan.operations[0].field_values[0].value = 5
+    saved_planner.save(differential=False)
+    assert saved_planner.requests == [("save", "Plan", None)]
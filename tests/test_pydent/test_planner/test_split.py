@@ -0,0 +1,38 @@
+from pydent.planner.utils import UnionFind
+
+
+def test_union_find():
+    uf = UnionFind(range(6))
+    assert len(uf) == 6
+    uf.union(0, 1)
+    uf.union(2, 3)
+    uf.union(1, 3)
+    assert uf.find(0) == uf.find(2)
+    assert uf.find(4) != uf.find(5)
+    assert len(uf) == 3
+    groups = sorted(sorted(g) for g in uf.groups().values())
+    assert groups == [[0, 1, 2, 3], [4], [5]]
+
+
+def test_union_find_adds_missing_nodes():
+    uf = UnionFind()
+    uf.union("a", "b")
+    assert uf.find("a") == uf.find("b")
+    assert uf.find("c") == "c"
+
+
+def test_split(offline_planner):
+    assert len(offline_planner.plan.operations) == 9
+    assert len(offline_planner.plan.wires) == 6
+
+    planners = offline_planner.split()
+    assert sorted(len(p.plan.operations) for p in planners) == [2, 3, 4]
+    assert sorted(len(p.plan.wires) for p in planners) == [1, 2, 3]
+
+    for p in planners:
+        fv_rids = {fv.rid for op in p.plan.operations for fv in op.field_values}
+        for wire in p.plan.wires:
+            assert wire.source.rid in fv_rids
+            assert wire.destination.rid in fv_rids
+        for op in p.plan.operations:
+            assert op.id is None
@@ -0,0 +1,61 @@
+from pydent.planner import Planner
+from pydent.planner import PlanTemplate
+
+
+def test_template_from_plan(offline_planner):
+    template = offline_planner.to_template()
+    assert len(template) == 9
+    assert len(template.wires) == 6
+
+
+def test_instantiate_template(offline_planner):
+    ot = offline_planner.session.OperationType.load({"id": 1, "name": "MyOT"})
+    sample = offline_planner.session.Sample.load({"id": 5, "name": "MySample"})
+    for op in offline_planner.plan.operations:
+        op.operation_type = ot
+        op.field_values[0].sample = sample
+
+    template = PlanTemplate.from_plan(offline_planner.plan)
+    operations, wires = template.instantiate(offline_planner.session)
+    assert len(operations) == 9
+    assert len(wires) == 6
+
+    old_rids = {op.rid for op in offline_planner.plan.operations}
+    for op in operations:
+        assert op.rid not in old_rids
+        assert op.id is None
+        # metatypes and inventory are shared by reference
+        assert op.operation_type is ot
+        assert op.field_values[0].sample is sample
+        assert op.field_values[0].child_sample_id == 5
+        for fv in op.field_values:
+            assert fv.operation is op
+            assert fv.id is None
+
+    fv_rids = {fv.rid for op in operations for fv in op.field_values}
+    for wire in wires:
+        assert wire.source.rid in fv_rids
+        assert wire.destination.rid in fv_rids
+        assert wire in wire.source.wires_as_source
+        assert wire in wire.destination.wires_as_dest
+
+
+def test_multiply_planner(offline_planner):
+    multiplied = offline_planner * 4
+    assert len(multiplied.plan.operations) == 4 * 9
+    assert len(multiplied.plan.wires) == 4 * 6
+    assert len(multiplied.split()) == 4 * 3
+
+
+def test_combine_planners(offline_planner):
+    combined = Planner.combine(offline_planner.split())
+    assert len(combined.plan.operations) == 9
+    assert len(combined.plan.wires) == 6
+
+
+def test_add_from_template(offline_planner):
+    template = offline_planner.to_template()
+    added = offline_planner.add_from_template(template, num=2)
+    assert len(added) == 18
+    assert len(offline_planner.plan.operations) == 27
+    assert len(offline_planner.plan.wires) == 18
@@ -0,0 +1,99 @@
+import pytest
+
+
+@pytest.fixture
+def fv_server(json_server):
+    """Replaces HTTP requests with a fake server of operations with two field
+    values, each with a sample."""
+    rows = {"FieldValue": [], "Sample": []}
+    for op_id in range(1, 11):
+        for j in range(2):
+            fv_id = op_id * 10 + j
+            rows["FieldValue"].append(
+                {
+                    "id": fv_id,
+                    "parent_id": op_id,
+                    "parent_class": "Operation",
+                    "child_sample_id": fv_id,
+                }
+            )
+            rows["Sample"].append({"id": fv_id, "name": "s{}".format(fv_id)})
+
+    def handler(path, json_data):
+        model_rows = rows[json_data["model"]]
+        if "id" in json_data:
+            return [row for row in model_rows if row["id"] == json_data["id"]][0]
+        args = json_data["arguments"]
+
+        def match(row):
+            for k, v in args.items():
+                if isinstance(v, list):
+                    if row.get(k, None) not in v:
+                        return False
+                elif row.get(k, None) != v:
+                    return False
+            return True
+
+        return [row for row in model_rows if match(row)]
+
+    json_server(handler)
+
+
+@pytest.fixture
+def operations(fake_session):
+    return [fake_session.Operation.load({"id": i}) for i in range(1, 11)]
+
+
+def test_track_n_plus_one(fake_session, fv_server, operations):
+    with fake_session.track_requests() as tracker:
+        for op in operations:
+            for fv in op.field_values:
+                assert fv.sample.id == fv.child_sample_id
+    assert tracker.num_requests == 30
+
+    records = {(r["model"], r["relationship"]): r for r in tracker.records}
+    assert set(records) == {("Operation", "field_values"), ("FieldValue", "sample")}
+    record = records[("FieldValue", "sample")]
+    assert record["num_callbacks"] == 20
+    assert record["num_requests"] == 20
+    assert record["num_bytes"] > 0
+    assert record["callsite"].startswith(__file__)
+    assert record["callsite"].endswith("in test_track_n_plus_one")
+
+    assert {r["relationship"] for r in tracker.n_plus_one()} == {
+        "field_values",
+        "sample",
+    }
+    assert tracker.suggestions() == [
+        dict(model="Operation", relations={"field_values": {"sample": {}}})
+    ]
+    assert "N+1" in tracker.report()
+
+    # requests are not recorded once the tracker exits
+    operations[0].field_values = None
+    operations[0].field_values
+    assert tracker.num_requests == 30
+    assert not fake_session.hooks.enabled
+
+
+def test_track_retrieve(fake_session, fv_server, operations):
+    """Retrieving the suggested relations from the browser makes no
+    callbacks."""
+    with fake_session.track_requests() as tracker:
+        fake_session.browser.recursive_retrieve(
+            operations, {"field_values": {"sample": {}}}
+        )
+        for op in operations:
+            for fv in op.field_values:
+                assert fv.sample.id == fv.child_sample_id
+    assert tracker.num_requests == 2
+    assert [r["model"] for r in tracker.records] == ["FieldValue", "Sample"]
+    assert tracker.n_plus_one() == []
+    assert tracker.suggestions() == []
+
+
+def test_track_threshold(fake_session, fv_server, operations):
+    with fake_session.track_requests(threshold=11) as tracker:
+        for op in operations:
+            op.field_values
+    assert tracker.n_plus_one() == []
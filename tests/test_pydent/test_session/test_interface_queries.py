@@ -71,3 +71,42 @@ def find_by_name_with_invalid_raises_value_error(fake_session):
     for invalid_name in invalid_names:
         with pytest.raises(ValueError):
             fake_session.Sample.find_by_name(invalid_name)
+
+
+def test_create_items_returns_items_in_order(monkeypatch, fake_session):
+    """Items are created with one 'items/make' request per item. The
+    responses, or the loaded items, are returned in the same order as the
+    items were given."""
+    urls = []
+
+    def mock_get(self, path, *args, **kwargs):
+        urls.append(path)
+        sample_id, object_type_id = path.split("/")[-2:]
+        return {
+            "item": {
+                "id": len(urls),
+                "sample_id": int(sample_id),
+                "object_type_id": int(object_type_id),
+            }
+        }
+
+    monkeypatch.setattr(AqHTTP, "get", mock_get)
+
+    keys = [(1, 1), (2, 1), (1, 1), (1, 2), (2, 1), (1, 1)] * 5
+    items = [
+        fake_session.Item.load({"sample_id": sid, "object_type_id": otid})
+        for sid, otid in keys
+    ]
+    responses = fake_session.utils.create_items(items, chunk_size=2, max_workers=3)
+    assert len(urls) == len(keys)
+    assert [
+        (r["item"]["sample_id"], r["item"]["object_type_id"]) for r in responses
+    ] == keys
+    assert all(item.id is None for item in items)
+
+    created = fake_session.utils.create_items(
+        items, chunk_size=2, max_workers=3, load=True
+    )
+    assert created == items
+    assert len({item.id for item in created}) == len(keys)
+    assert [(i.sample_id, i.object_type_id) for i in created] == keys
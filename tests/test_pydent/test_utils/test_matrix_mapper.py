@@ -0,0 +1,47 @@
+import pytest
+
+from pydent.utils.matrix_mapper import MatrixMapping
+from pydent.utils.matrix_mapper import MatrixMappingFactory
+
+
+@pytest.fixture
+def matrix():
+    return [[1, 2, 3], [4, 5, 6]]
+
+
+def test_getitem(matrix):
+    m = MatrixMapping(matrix, getter=lambda x: x * 10)
+    assert m[0, 1] == 20
+    assert m[1] == [40, 50, 60]
+    assert m[:, 1] == [20, 50]
+    assert m[0, 1:] == [20, 30]
+    assert m[:, :] == [[10, 20, 30], [40, 50, 60]]
+    assert m[-1, -1] == 60
+
+
+@pytest.mark.parametrize(
+    "index,expected",
+    [
+        ((0, 1), [(0, 1)]),
+        (1, [(1, 0), (1, 1), (1, 2)]),
+        ((slice(None), 2), [(0, 2), (1, 2)]),
+        ((slice(None), slice(1, None)), [(0, 1), (0, 2), (1, 1), (1, 2)]),
+        ((-1, -1), [(1, 2)]),
+    ],
+)
+def test_iter_indices(matrix, index, expected):
+    assert list(MatrixMapping(matrix)._iter_indices(index)) == expected
+
+
+def test_setitem(matrix):
+    m = MatrixMapping(matrix)
+    m[:, 0] = 0
+    assert m[:, :] == [[0, 2, 3], [0, 5, 6]]
+
+
+def test_factory_views_share_data(matrix):
+    factory = MatrixMappingFactory(matrix)
+    factory.new("value")
+    factory.new("double", getter=lambda x: x * 2)
+    factory["value"][0, 0] = 0
+    assert factory["double"][0, :] == [0, 4, 6]